@@ -0,0 +1,102 @@
+"""marketplace_query_indexes
+
+Revision ID: 3f9c1d7e2b54
+Revises: a600464b4575
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1d7e2b54'
+down_revision: Union[str, None] = 'a600464b4575'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns) of the b-tree indexes backing the CRUD list queries
+BTREE_INDEXES = [
+    ('ix_agents_owner_id_created_at', 'agents', ['owner_id', 'created_at', 'id']),
+    ('ix_agents_creator_id_created_at', 'agents', ['creator_id', 'created_at', 'id']),
+    ('ix_agents_category_created_at', 'agents', ['category', 'created_at', 'id']),
+    ('ix_agents_status_created_at', 'agents', ['status', 'created_at', 'id']),
+    ('ix_agents_category_price', 'agents', ['category', 'price']),
+    ('ix_agents_created_at', 'agents', ['created_at', 'id']),
+    ('ix_reviews_agent_id_created_at', 'reviews', ['agent_id', 'created_at', 'id']),
+    ('ix_reviews_reviewer_id_created_at', 'reviews', ['reviewer_id', 'created_at', 'id']),
+    ('ix_reviews_agent_creator_id_created_at', 'reviews', ['agent_creator_id', 'created_at', 'id']),
+    ('ix_transactions_buyer_id_created_at', 'transactions', ['buyer_id', 'created_at', 'id']),
+    ('ix_transactions_seller_id_created_at', 'transactions', ['seller_id', 'created_at', 'id']),
+    ('ix_transactions_status', 'transactions', ['status']),
+    ('ix_training_jobs_agent_id_created_at', 'training_jobs', ['agent_id', 'created_at', 'id']),
+    ('ix_training_jobs_status', 'training_jobs', ['status']),
+    ('ix_ai_models_model_type_created_at', 'ai_models', ['model_type', 'created_at', 'id']),
+]
+
+# (name, table, column) of the pg_trgm GIN indexes backing ilike '%q%' searches
+TRIGRAM_INDEXES = [
+    ('ix_agents_name_trgm', 'agents', 'name'),
+    ('ix_agents_description_trgm', 'agents', 'description'),
+    ('ix_users_username_trgm', 'users', 'username'),
+    ('ix_users_wallet_address_trgm', 'users', 'wallet_address'),
+]
+
+
+def upgrade() -> None:
+    # The reviews model was never part of the initial migration
+    if not sa.inspect(op.get_bind()).has_table('reviews'):
+        op.create_table('reviews',
+        sa.Column('agent_id', sa.Integer(), nullable=True),
+        sa.Column('reviewer_id', sa.Integer(), nullable=True),
+        sa.Column('agent_creator_id', sa.Integer(), nullable=True),
+        sa.Column('rating', sa.Numeric(precision=2, scale=1), nullable=True),
+        sa.Column('comment', sa.String(length=1000), nullable=True),
+        sa.Column('is_verified_purchase', sa.Boolean(), nullable=True),
+        sa.Column('is_edited', sa.Boolean(), nullable=True),
+        sa.Column('usage_duration', sa.Integer(), nullable=True),
+        sa.Column('usage_context', sa.String(length=200), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ),
+        sa.ForeignKeyConstraint(['reviewer_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['agent_creator_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_reviews_id'), 'reviews', ['id'], unique=False)
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Build concurrently so live tables keep taking writes
+    with op.get_context().autocommit_block():
+        for name, table, columns in BTREE_INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name, table, [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(TRIGRAM_INDEXES + BTREE_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True
+            )
+    # pg_trgm and the reviews table are left in place
@@ -0,0 +1,30 @@
+"""agent_rating_aggregates
+
+Revision ID: 8d2e4a6b1c90
+Revises: 3f9c1d7e2b54
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4a6b1c90'
+down_revision: Union[str, None] = '3f9c1d7e2b54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows are filled in by scripts/rebuild_agent_ratings.py
+    op.add_column('agents', sa.Column('rating_sum', sa.Numeric(precision=12, scale=1), server_default='0', nullable=True))
+    op.add_column('agents', sa.Column('rating_histogram', postgresql.ARRAY(sa.Integer()), server_default='{0,0,0,0,0,0}', nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('agents', 'rating_histogram')
+    op.drop_column('agents', 'rating_sum')
@@ -0,0 +1,65 @@
+"""marketplace_rollups
+
+Revision ID: b71e5c3a9d28
+Revises: 8d2e4a6b1c90
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e5c3a9d28'
+down_revision: Union[str, None] = '8d2e4a6b1c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _key_columns() -> list:
+    return [
+        sa.Column('granularity', sa.String(length=10), nullable=False),
+        sa.Column('dimension', sa.String(length=20), nullable=False),
+        sa.Column('dimension_value', sa.String(length=100), nullable=False),
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    # Existing rows are rolled up by scripts/rebuild_rollups.py
+    op.create_table('transaction_rollups',
+        *_key_columns(),
+        sa.Column('transactions', sa.Integer(), nullable=False),
+        sa.Column('volume', sa.Numeric(precision=28, scale=8), nullable=False),
+        sa.PrimaryKeyConstraint('granularity', 'dimension', 'dimension_value', 'bucket')
+    )
+    op.create_table('training_rollups',
+        *_key_columns(),
+        sa.Column('jobs', sa.Integer(), nullable=False),
+        sa.Column('compute_time', sa.BigInteger(), nullable=False),
+        sa.Column('timed_jobs', sa.Integer(), nullable=False),
+        sa.Column('accuracy_sum', sa.Float(), nullable=False),
+        sa.Column('scored_jobs', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('granularity', 'dimension', 'dimension_value', 'bucket')
+    )
+    op.create_table('model_rollups',
+        *_key_columns(),
+        sa.Column('models', sa.Integer(), nullable=False),
+        sa.Column('accuracy_sum', sa.Float(), nullable=False),
+        sa.Column('scored_models', sa.Integer(), nullable=False),
+        sa.Column('initializing', sa.Integer(), nullable=False),
+        sa.Column('training', sa.Integer(), nullable=False),
+        sa.Column('validating', sa.Integer(), nullable=False),
+        sa.Column('ready', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('granularity', 'dimension', 'dimension_value', 'bucket')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('model_rollups')
+    op.drop_table('training_rollups')
+    op.drop_table('transaction_rollups')
@@ -0,0 +1,63 @@
+"""agent_search_vector
+
+Revision ID: c4a8f2e61b37
+Revises: b71e5c3a9d28
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8f2e61b37'
+down_revision: Union[str, None] = 'b71e5c3a9d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Weighted search document of an agent row; app.core.search.SEARCH_CONFIG must match
+SEARCH_DOCUMENT = """
+    setweight(to_tsvector('english', coalesce({row}name, '')), 'A')
+    || setweight(json_to_tsvector('english', coalesce({row}capabilities, '[]'::json), '["string"]'), 'B')
+    || setweight(to_tsvector('english', coalesce({row}description, '')), 'C')
+    || setweight(to_tsvector('english', replace(coalesce({row}category::text, ''), '_', ' ')), 'D')
+"""
+
+
+def upgrade() -> None:
+    op.add_column('agents', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION agents_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_DOCUMENT.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER agents_search_vector_update
+        BEFORE INSERT OR UPDATE OF name, description, capabilities, category ON agents
+        FOR EACH ROW EXECUTE FUNCTION agents_search_vector_update()
+    """)
+    op.execute(f"UPDATE agents SET search_vector = {SEARCH_DOCUMENT.format(row='')}")
+
+    # Build concurrently so the table keeps taking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_agents_search_vector', 'agents', ['search_vector'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_agents_search_vector', table_name='agents')
+    op.execute('DROP TRIGGER IF EXISTS agents_search_vector_update ON agents')
+    op.execute('DROP FUNCTION IF EXISTS agents_search_vector_update()')
+    op.drop_column('agents', 'search_vector')
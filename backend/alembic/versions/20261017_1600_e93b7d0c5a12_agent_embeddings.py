@@ -0,0 +1,35 @@
+"""agent_embeddings
+
+Revision ID: e93b7d0c5a12
+Revises: c4a8f2e61b37
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e93b7d0c5a12'
+down_revision: Union[str, None] = 'c4a8f2e61b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'agent_embeddings',
+        sa.Column('agent_id', sa.Integer(), nullable=False),
+        sa.Column('model', sa.String(length=200), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('vector', sa.LargeBinary(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('agent_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('agent_embeddings')
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.deps import get_db, get_current_user
 from app.core.security import create_nonce, create_access_token, verify_wallet_ownership
+from app.crud.user import user as user_crud
 from app.models.user import User
 from app.schemas.user import UserCreate, UserInDB
 from typing import Any
@@ -19,23 +21,20 @@ class SignatureRequest(BaseModel):
 @router.post("/nonce", response_model=dict)
 async def get_nonce(
     request: WalletRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
     Get a nonce for wallet signature.
     """
-    # Create or get user
-    user = db.query(User).filter(User.wallet_address == request.wallet_address).first()
+    # Create or get user; creating through the CRUD layer caches the new
+    # wallet and tells every worker's Bloom filter about it
+    user = await user_crud.get_by_wallet(db, wallet_address=request.wallet_address, trust_bloom=False)
     if not user:
-        user = User(wallet_address=request.wallet_address)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        user = await user_crud.create_with_wallet(db, wallet_address=request.wallet_address)
     
     # Create new nonce
     nonce = create_nonce()
-    user.nonce = nonce
-    db.commit()
+    await user_crud.update_nonce(db, user_id=user.id, nonce=nonce)
     
     return {
         "nonce": nonce,
@@ -45,12 +44,12 @@ async def get_nonce(
 @router.post("/verify", response_model=dict)
 async def verify_signature(
     request: SignatureRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
     Verify wallet signature and return JWT token.
     """
-    user = db.query(User).filter(User.wallet_address == request.wallet_address).first()
+    user = await db.scalar(select(User).where(User.wallet_address == request.wallet_address))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -71,8 +70,7 @@ async def verify_signature(
     access_token = create_access_token(subject=user.wallet_address)
     
     # Clear nonce after successful verification
-    user.nonce = None
-    db.commit()
+    await user_crud.update_nonce(db, user_id=user.id, nonce=None)
     
     return {
         "access_token": access_token,
@@ -81,7 +79,7 @@ async def verify_signature(
 
 @router.get("/me", response_model=UserInDB)
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """
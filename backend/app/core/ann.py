@@ -0,0 +1,188 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+
+class IVFIndex:
+    """
+    In-process approximate nearest-neighbour index over unit-length vectors,
+    scored by dot product (cosine similarity). Vectors are kept in a float16
+    matrix; an inverted file of k-means centroids limits a search to the
+    rows of the nprobe lists closest to the query. Until it is trained, or
+    while it holds fewer rows than lists, every search is exact.
+    """
+
+    def __init__(self, dimension: int, capacity: int = 1024):
+        self.dimension = dimension
+        self.ready = False
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self._size = 0
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._vectors = np.zeros((capacity, self.dimension), dtype=np.float16)
+        self._assigned = np.full(capacity, -1, dtype=np.int32)
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[Set[int]] = []
+        # Slot arrays of the lists, rebuilt when a list changes
+        self._list_arrays: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _grow(self, capacity: int) -> None:
+        def resized(array: np.ndarray, fill) -> np.ndarray:
+            grown = np.full((capacity, *array.shape[1:]), fill, dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        self._ids = resized(self._ids, 0)
+        self._alive = resized(self._alive, False)
+        self._vectors = resized(self._vectors, 0)
+        self._assigned = resized(self._assigned, -1)
+
+    def _slot(self, id: int) -> int:
+        slot = self._slots.get(id)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._size == len(self._ids):
+                self._grow(max(2 * len(self._ids), 1024))
+            slot = self._size
+            self._size += 1
+        self._slots[id] = slot
+        self._ids[slot] = id
+        self._alive[slot] = True
+        return slot
+
+    def _unassign(self, slot: int) -> None:
+        list_no = self._assigned[slot]
+        if list_no >= 0:
+            self._lists[list_no].discard(slot)
+            self._list_arrays.pop(list_no, None)
+            self._assigned[slot] = -1
+
+    def _assign(self, slots: np.ndarray) -> None:
+        """Put slots in the list of their nearest centroid"""
+        if self.centroids is None or not len(slots):
+            return
+        nearest = np.argmax(self._vectors[slots].astype(np.float32) @ self.centroids.T, axis=1)
+        for slot, list_no in zip(slots.tolist(), nearest.tolist()):
+            self._unassign(slot)
+            self._assigned[slot] = list_no
+            self._lists[list_no].add(slot)
+            self._list_arrays.pop(list_no, None)
+
+    def upsert(self, ids: Iterable[int], vectors: np.ndarray) -> None:
+        """Insert or replace the vectors of ids, one row each"""
+        slots = np.array([self._slot(id) for id in ids], dtype=np.int64)
+        if not len(slots):
+            return
+        self._vectors[slots] = vectors
+        self._assign(slots)
+
+    def remove(self, ids: Iterable[int]) -> None:
+        """Drop ids; unknown ones are ignored"""
+        for id in ids:
+            slot = self._slots.pop(id, None)
+            if slot is None:
+                continue
+            self._alive[slot] = False
+            self._unassign(slot)
+            self._free.append(slot)
+
+    def vector(self, id: int) -> Optional[np.ndarray]:
+        slot = self._slots.get(id)
+        return None if slot is None else self._vectors[slot].astype(np.float32)
+
+    def train(self, lists: int, iterations: int = 10, sample: int = 50_000, seed: int = 0) -> None:
+        """
+        Cluster a sample of the stored vectors into lists k-means centroids
+        (spherical: centroids are renormalized) and assign every row.
+        """
+        slots = np.flatnonzero(self._alive[:self._size])
+        if len(slots) < lists or lists < 1:
+            self.centroids = None
+            self._lists, self._list_arrays = [], {}
+            self._assigned[:] = -1
+            return
+        rng = np.random.default_rng(seed)
+        training = self._vectors[rng.choice(slots, size=min(sample, len(slots)), replace=False)].astype(np.float32)
+        centroids = training[rng.choice(len(training), size=lists, replace=False)]
+        for _ in range(iterations):
+            nearest = np.argmax(training @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, nearest, training)
+            # An empty list keeps its previous centroid
+            filled = np.bincount(nearest, minlength=lists) > 0
+            centroids[filled] = sums[filled]
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        self.centroids = centroids
+        self._lists = [set() for _ in range(lists)]
+        self._list_arrays = {}
+        self._assigned[:] = -1
+        # Assign in blocks to bound the size of the score matrix
+        for start in range(0, len(slots), 65536):
+            self._assign(slots[start:start + 65536])
+
+    def load(self, ids: List[int], vectors: np.ndarray, lists: int) -> None:
+        """Replace the contents with ids and their vectors, train, and mark the index ready"""
+        self._allocate(max(1024, 2 * len(ids)))
+        self.upsert(ids, vectors)
+        self.train(lists)
+        self.ready = True
+
+    def _list_slots(self, list_no: int) -> np.ndarray:
+        array = self._list_arrays.get(list_no)
+        if array is None:
+            array = np.fromiter(self._lists[list_no], dtype=np.int64, count=len(self._lists[list_no]))
+            self._list_arrays[list_no] = array
+        return array
+
+    def _top(self, slots: np.ndarray, query: np.ndarray, k: int, exclude: Iterable[int]) -> Tuple[List[int], List[float]]:
+        excluded = [self._slots[id] for id in exclude if id in self._slots]
+        if excluded:
+            slots = slots[~np.isin(slots, excluded)]
+        if not len(slots) or k < 1:
+            return [], []
+        # Score in blocks so only one block is ever widened to float32
+        scores = np.empty(len(slots), dtype=np.float32)
+        for start in range(0, len(slots), 65536):
+            block = slots[start:start + 65536]
+            scores[start:start + len(block)] = self._vectors[block].astype(np.float32) @ query
+        k = min(k, len(slots))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return self._ids[slots[best]].tolist(), scores[best].tolist()
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        *,
+        nprobe: int = 8,
+        exclude: Iterable[int] = ()
+    ) -> Tuple[List[int], List[float]]:
+        """Ids and similarities of the approximate k nearest rows, best first"""
+        query = np.asarray(query, dtype=np.float32)
+        if self.centroids is None:
+            return self.exact_search(query, k, exclude=exclude)
+        nprobe = min(nprobe, len(self.centroids))
+        closest = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        slots = np.concatenate([self._list_slots(list_no) for list_no in closest.tolist()])
+        return self._top(slots, query, k, exclude)
+
+    def exact_search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        *,
+        exclude: Iterable[int] = ()
+    ) -> Tuple[List[int], List[float]]:
+        """Ids and similarities of the exact k nearest rows, by brute force"""
+        query = np.asarray(query, dtype=np.float32)
+        return self._top(np.flatnonzero(self._alive[:self._size]), query, k, exclude)
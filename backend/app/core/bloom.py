@@ -0,0 +1,43 @@
+import hashlib
+import math
+from typing import Iterable
+
+class BloomFilter:
+    """
+    In-process Bloom filter over strings.
+    A negative answer is definite; a positive one may be wrong with
+    probability error_rate once capacity items have been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        # Only answer "absent" once the filter has been loaded from the database
+        self.ready = False
+
+    def _positions(self, value: str) -> Iterable[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def clear(self) -> None:
+        """Forget every value and answer "maybe" until reloaded"""
+        self.ready = False
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def might_contain(self, value: str) -> bool:
+        """False only if value was definitely never added (and the filter is loaded)"""
+        return not self.ready or value in self
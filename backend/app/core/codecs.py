@@ -0,0 +1,113 @@
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+import json
+import zlib
+from typing import Any, Dict, Optional
+import msgpack
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # lz4 is optional; zlib is always available
+    lz4_frame = None
+
+# msgpack extension type codes
+EXT_DECIMAL = 1
+EXT_DATETIME = 2
+EXT_DATE = 3
+
+# First byte of every stored payload, naming the compression applied to the rest
+RAW = b"\x00"
+ZLIB = b"\x01"
+LZ4 = b"\x02"
+
+class Codec:
+    """Turns cached values into bytes and back"""
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+class JSONCodec(Codec):
+    """Plain JSON; Decimal and datetime values come back as strings"""
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=str).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+class MsgpackCodec(Codec):
+    """Compact binary encoding that round-trips Decimal, datetime and date"""
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, Decimal):
+            return msgpack.ExtType(EXT_DECIMAL, str(value).encode())
+        if isinstance(value, datetime):
+            return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+        if isinstance(value, date):
+            return msgpack.ExtType(EXT_DATE, value.isoformat().encode())
+        if isinstance(value, Enum):
+            return value.value
+        if isinstance(value, (set, frozenset, tuple)):
+            return list(value)
+        raise TypeError(f"Cannot serialize {type(value).__name__} for the cache")
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> Any:
+        if code == EXT_DECIMAL:
+            return Decimal(data.decode())
+        if code == EXT_DATETIME:
+            return datetime.fromisoformat(data.decode())
+        if code == EXT_DATE:
+            return date.fromisoformat(data.decode())
+        return msgpack.ExtType(code, data)
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False)
+
+class CompressedCodec(Codec):
+    """Wraps a codec, compressing payloads of at least min_size bytes"""
+
+    def __init__(self, codec: Codec, compression: Optional[str] = "zlib", min_size: int = 1024):
+        if compression == "lz4" and lz4_frame is None:
+            print("lz4 is not installed, falling back to zlib cache compression")
+            compression = "zlib"
+        self.codec = codec
+        self.compression = compression
+        self.min_size = min_size
+
+    def encode(self, value: Any) -> bytes:
+        data = self.codec.encode(value)
+        if self.compression is None or len(data) < self.min_size:
+            return RAW + data
+        if self.compression == "lz4":
+            return LZ4 + lz4_frame.compress(data)
+        return ZLIB + zlib.compress(data)
+
+    def decode(self, data: bytes) -> Any:
+        header, payload = data[:1], data[1:]
+        if header == ZLIB:
+            payload = zlib.decompress(payload)
+        elif header == LZ4:
+            payload = lz4_frame.decompress(payload)
+        return self.codec.decode(payload)
+
+CODECS: Dict[str, type] = {
+    "json": JSONCodec,
+    "msgpack": MsgpackCodec,
+}
+
+def get_codec(name: str, compression: Optional[str] = None, min_size: int = 1024) -> Codec:
+    """Build the configured codec, e.g. get_codec("msgpack", "lz4")"""
+    if name not in CODECS:
+        raise ValueError(f"Unknown cache codec: {name}")
+    if compression in (None, "", "none"):
+        compression = None
+    return CompressedCodec(CODECS[name](), compression=compression, min_size=min_size)
@@ -21,6 +21,13 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = "5436"
     DATABASE_URL: str | None = None
 
+    # Read replicas for list, search and stats queries, as postgresql:// URLs.
+    # Writes, and reads after a write in the same session, use the primary
+    DATABASE_REPLICA_URLS: List[str] = []
+    DATABASE_REPLICA_CHECK_INTERVAL: int = 5
+    DATABASE_REPLICA_CHECK_TIMEOUT: float = 2.0
+    DATABASE_REPLICA_MAX_LAG: float = 10.0  # seconds behind the primary
+
     # Security
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
@@ -45,6 +52,93 @@ class Settings(BaseSettings):
     REDIS_URL: str | None = None
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    REDIS_POOL_SIZE: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    REDIS_CONNECT_TIMEOUT: float = 2.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
+    # In-process cache in front of Redis for hot single-row lookups
+    CACHE_L1_MAX_SIZE: int = 10000
+    CACHE_L1_TTL: int = 30
+    CACHE_L1_PATTERNS: List[str] = [
+        "synthr:*:id:*",
+        "synthr:user:wallet:*",
+    ]
+    CACHE_INVALIDATION_CHANNEL: str = "synthr:cache:invalidate"
+
+    # Serialization of cached values: "msgpack" or "json", compressed with
+    # "zlib", "lz4" or "none" once a payload reaches the minimum size
+    CACHE_CODEC: str = "msgpack"
+    CACHE_COMPRESSION: str = "zlib"
+    CACHE_COMPRESSION_MIN_SIZE: int = 1024
+
+    # Lookup misses are cached this long; known wallet addresses and token
+    # ids are tracked in Bloom filters so unknown ones skip Redis entirely
+    CACHE_NEGATIVE_TTL: int = 30
+    CACHE_BLOOM_CAPACITY: int = 1_000_000
+    CACHE_BLOOM_ERROR_RATE: float = 0.01
+    CACHE_BLOOM_CHANNEL: str = "synthr:cache:lookups"
+
+    # Per-value row counters behind estimated counts are reseeded this often
+    CACHE_COUNTER_TTL: int = 86400
+
+    # Rows per cached search result window; any page inside it is a cache hit
+    CACHE_SEARCH_WINDOW: int = 200
+
+    # Stampede protection for expensive aggregate caches
+    CACHE_TTL_JITTER: float = 0.1  # +/- fraction applied to freshness windows
+    CACHE_STALE_TTL: int = 300  # seconds a stale value is served while refreshing
+    CACHE_LOCK_TIMEOUT: int = 10
+
+    # Buffer each request's cache writes and flush them in one pipeline
+    CACHE_WRITE_BEHIND: bool = True
+
+    # bulk_create inserts this many rows per statement and cache pipeline,
+    # loading through COPY once a call has at least BULK_COPY_THRESHOLD rows
+    BULK_CHUNK_SIZE: int = 1000
+    BULK_COPY_THRESHOLD: int = 10000
+
+    # Unfiltered-by-text agent searches and facet counts are answered from an
+    # in-process columnar index, reloaded in full every AGENT_INDEX_RELOAD_INTERVAL
+    # seconds in case a worker missed a change event
+    AGENT_INDEX_ENABLED: bool = True
+    AGENT_INDEX_CHANNEL: str = "synthr:agent_index"
+    AGENT_INDEX_RELOAD_INTERVAL: int = 600
+
+    # Type-ahead: prefixes up to SUGGEST_SHORT_PREFIX characters keep their
+    # SUGGEST_PREFIX_SIZE best names in a ranked set; longer ones rank the
+    # first SUGGEST_SCAN_LIMIT lexicographic matches
+    SUGGEST_SHORT_PREFIX: int = 3
+    SUGGEST_PREFIX_SIZE: int = 50
+    SUGGEST_SCAN_LIMIT: int = 1000
+    SUGGEST_MAX_WORDS: int = 6
+
+    # "Agents like this one": agents are embedded in the background with a
+    # small CPU encoder, in batches of up to EMBEDDING_BATCH_SIZE gathered over
+    # EMBEDDING_BATCH_DELAY seconds, and searched through an IVF index that
+    # scans its EMBEDDING_IVF_PROBES nearest lists; 0 lists means about sqrt(rows)
+    EMBEDDING_ENABLED: bool = True
+    EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_DIMENSION: int = 384
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_BATCH_DELAY: float = 1.0
+    EMBEDDING_IVF_LISTS: int = 0
+    EMBEDDING_IVF_PROBES: int = 8
+    EMBEDDING_RELOAD_INTERVAL: int = 3600
+    EMBEDDING_CHANNEL: str = "synthr:agent_embeddings"
+
+    # Precomputed agent leaderboards, overall and per category, kept in Redis
+    # sorted sets: trending (completed purchase volume, halving in weight every
+    # LEADERBOARD_TRENDING_HALF_LIFE seconds), top rated (the mean rating pulled
+    # toward LEADERBOARD_PRIOR_RATING by LEADERBOARD_PRIOR_VOTES reviews) and
+    # most used. One worker rebuilds them from the database every
+    # LEADERBOARD_RECONCILE_INTERVAL seconds
+    LEADERBOARD_ENABLED: bool = True
+    LEADERBOARD_TRENDING_HALF_LIFE: int = 86400
+    LEADERBOARD_TRENDING_WINDOW: int = 14 * 86400
+    LEADERBOARD_PRIOR_RATING: float = 3.0
+    LEADERBOARD_PRIOR_VOTES: int = 10
+    LEADERBOARD_RECONCILE_INTERVAL: int = 3600
     
     PINATA_API_KEY: str
     PINATA_SECRET_KEY: str
@@ -68,6 +162,19 @@ class Settings(BaseSettings):
         if not self.REDIS_URL and self.REDIS_HOST:
             self.REDIS_URL = f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/0"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """DATABASE_URL for the asyncpg driver"""
+        return self.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    @property
+    def ASYNC_REPLICA_URLS(self) -> List[str]:
+        """DATABASE_REPLICA_URLS for the asyncpg driver"""
+        return [
+            url.replace("postgresql://", "postgresql+asyncpg://", 1)
+            for url in self.DATABASE_REPLICA_URLS
+        ]
+
     @property
     def is_development(self) -> bool:
         return self.APP_ENV == "development"
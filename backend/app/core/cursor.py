@@ -0,0 +1,24 @@
+import base64
+from typing import Any, Tuple
+from app.core.codecs import MsgpackCodec
+
+_codec = MsgpackCodec()
+
+class InvalidCursor(ValueError):
+    """A cursor that is malformed or was issued for a different ordering"""
+
+def encode_cursor(order_by: str, order_desc: bool, value: Any, id: int) -> str:
+    """Opaque token for the position after the row with (value, id)"""
+    data = _codec.encode([order_by, order_desc, value, id])
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str, order_by: str, order_desc: bool) -> Tuple[Any, int]:
+    """The (value, id) position in a cursor, checked against the requested ordering"""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_order_by, cursor_desc, value, id = _codec.decode(data)
+    except Exception as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if cursor_order_by != order_by or cursor_desc != order_desc:
+        raise InvalidCursor("Cursor was issued for a different ordering")
+    return value, id
@@ -0,0 +1,210 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+class FacetIndex:
+    """
+    In-process columnar index answering filtered, sorted, paginated id queries
+    and facet counts without SQL. Numeric columns are float64 arrays with NaN
+    for NULL; categorical columns keep one boolean bitmap per value plus the
+    value codes for counting. Rows are addressed by id; removed rows are
+    tombstoned and their slots reused.
+    """
+
+    def __init__(self, numeric: Sequence[str], categorical: Sequence[str], capacity: int = 1024):
+        self.numeric = tuple(numeric)
+        self.categorical = tuple(categorical)
+        self.ready = False
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self._size = 0
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._columns = {name: np.full(capacity, np.nan) for name in self.numeric}
+        self._codes = {name: np.full(capacity, -1, dtype=np.int32) for name in self.categorical}
+        self._values: Dict[str, List[Any]] = {name: [] for name in self.categorical}
+        self._value_codes: Dict[str, Dict[Any, int]] = {name: {} for name in self.categorical}
+        self._bitmaps: Dict[str, List[np.ndarray]] = {name: [] for name in self.categorical}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _grow(self, capacity: int) -> None:
+        """Resize every array to capacity slots"""
+        def resized(array: np.ndarray, fill: Any) -> np.ndarray:
+            grown = np.full(capacity, fill, dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        self._ids = resized(self._ids, 0)
+        self._alive = resized(self._alive, False)
+        for name in self.numeric:
+            self._columns[name] = resized(self._columns[name], np.nan)
+        for name in self.categorical:
+            self._codes[name] = resized(self._codes[name], -1)
+            self._bitmaps[name] = [resized(bitmap, False) for bitmap in self._bitmaps[name]]
+
+    def _code(self, name: str, value: Any) -> int:
+        """Code of a categorical value, adding a bitmap for new values"""
+        code = self._value_codes[name].get(value)
+        if code is None:
+            code = len(self._values[name])
+            self._value_codes[name][value] = code
+            self._values[name].append(value)
+            self._bitmaps[name].append(np.zeros(len(self._ids), dtype=bool))
+        return code
+
+    def _slot(self, id: int) -> int:
+        slot = self._slots.get(id)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._size == len(self._ids):
+                self._grow(max(2 * len(self._ids), 1024))
+            slot = self._size
+            self._size += 1
+        self._slots[id] = slot
+        self._ids[slot] = id
+        self._alive[slot] = True
+        return slot
+
+    def upsert(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Insert or replace rows given as dicts with an id and every indexed column"""
+        for row in rows:
+            slot = self._slot(row["id"])
+            for name in self.numeric:
+                value = row.get(name)
+                self._columns[name][slot] = np.nan if value is None else float(value)
+            for name in self.categorical:
+                old = self._codes[name][slot]
+                if old >= 0:
+                    self._bitmaps[name][old][slot] = False
+                code = self._code(name, row.get(name))
+                self._codes[name][slot] = code
+                self._bitmaps[name][code][slot] = True
+
+    def remove(self, ids: Iterable[int]) -> None:
+        """Tombstone rows; unknown ids are ignored"""
+        for id in ids:
+            slot = self._slots.pop(id, None)
+            if slot is None:
+                continue
+            self._alive[slot] = False
+            for name in self.categorical:
+                code = self._codes[name][slot]
+                if code >= 0:
+                    self._bitmaps[name][code][slot] = False
+                self._codes[name][slot] = -1
+            self._free.append(slot)
+
+    def load(self, rows: Iterable[Dict[str, Any]], capacity: int = 1024) -> None:
+        """Replace the contents with rows and mark the index ready"""
+        self._allocate(capacity)
+        self.upsert(rows)
+        self.ready = True
+
+    def _mask(
+        self,
+        equals: Optional[Dict[str, Any]],
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]],
+        skip_column: Optional[str] = None
+    ) -> np.ndarray:
+        """Live rows matching equality filters and inclusive [low, high] ranges; NULL never matches"""
+        mask = self._alive[:self._size].copy()
+        for name, value in (equals or {}).items():
+            if name == skip_column or value is None:
+                continue
+            if name in self._bitmaps:
+                code = self._value_codes[name].get(value)
+                if code is None:
+                    mask[:] = False
+                    break
+                mask &= self._bitmaps[name][code][:self._size]
+            else:
+                mask &= self._columns[name][:self._size] == float(value)
+        for name, (low, high) in (ranges or {}).items():
+            column = self._columns[name][:self._size]
+            if low is not None:
+                mask &= column >= float(low)
+            if high is not None:
+                mask &= column <= float(high)
+        return mask
+
+    def search(
+        self,
+        *,
+        equals: Optional[Dict[str, Any]] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        order_by: str = "id",
+        descending: bool = True,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[List[int], int]:
+        """
+        Ids of one page of matching rows and the number of matches, ordered
+        like SQL: id breaks ties, NULLs sort last ascending and first descending.
+        """
+        slots = np.flatnonzero(self._mask(equals, ranges))
+        total = len(slots)
+        end = min(skip + limit, total)
+        if skip >= end:
+            return [], total
+
+        ids = self._ids[slots].astype(np.float64)
+        if order_by == "id":
+            key = ids
+        else:
+            key = self._columns[order_by][slots]
+            key = np.where(np.isnan(key), np.inf, key)
+        if descending:
+            key, ids = -key, -ids
+
+        # Only rows that can reach the page need a full sort; keep every tie at its edge
+        candidates = np.arange(total)
+        if end < total:
+            kth = np.partition(key, end - 1)[end - 1]
+            candidates = np.flatnonzero(key <= kth)
+        order = candidates[np.lexsort((ids[candidates], key[candidates]))][skip:end]
+        return self._ids[slots[order]].tolist(), total
+
+    def counts(
+        self,
+        column: str,
+        *,
+        equals: Optional[Dict[str, Any]] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None
+    ) -> Dict[Any, int]:
+        """
+        Matching rows per value of a categorical column, ignoring the filter on
+        that column; NULL is not counted.
+        """
+        codes = self._codes[column][:self._size][self._mask(equals, ranges, skip_column=column)]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self._values[column]))
+        return {
+            value: int(count)
+            for value, count in zip(self._values[column], counts)
+            if count and value is not None
+        }
+
+    def histogram(
+        self,
+        column: str,
+        *,
+        bins: int = 10,
+        equals: Optional[Dict[str, Any]] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None
+    ) -> List[Dict[str, float]]:
+        """Equal-width histogram of a numeric column over the matching non-NULL rows"""
+        values = self._columns[column][:self._size][self._mask(equals, ranges)]
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return []
+        counts, edges = np.histogram(values, bins=bins)
+        return [
+            {"min": float(low), "max": float(high), "count": int(count)}
+            for low, high, count in zip(edges[:-1], edges[1:], counts)
+        ]
@@ -0,0 +1,44 @@
+from decimal import Decimal, InvalidOperation
+from enum import Enum
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+def normalize_text(value: Optional[str]) -> Optional[str]:
+    """Case-fold and collapse whitespace; blank text counts as no filter"""
+    if value is None:
+        return None
+    value = " ".join(value.split()).casefold()
+    return value or None
+
+def normalize_value(value: Any) -> Any:
+    """Canonical form of a filter value, so equivalent inputs compare equal"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (Decimal, float, int)):
+        try:
+            # 1.50, 1.5 and Decimal("1.500") all become "1.5"
+            return format(Decimal(str(value)).normalize(), "f")
+        except InvalidOperation:
+            return str(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sorted(normalize_value(item) for item in value)
+    return str(value)
+
+def canonical_filters(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize every filter and drop the unset ones"""
+    canonical = {}
+    for name, value in filters.items():
+        value = normalize_value(value)
+        if value is not None:
+            canonical[name] = value
+    return canonical
+
+def fingerprint(filters: Dict[str, Any]) -> str:
+    """Fixed-size hash of the canonical filters, for use in cache keys"""
+    payload = json.dumps(canonical_filters(filters), sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from fnmatch import translate
+import re
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache with per-entry TTL.
+    Sits in front of Redis for hot single-row keys; values are shared between
+    callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_size: int, ttl: int, patterns: Iterable[str]):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        patterns = list(patterns)
+        self._pattern = re.compile("|".join(translate(p) for p in patterns)) if patterns else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def accepts(self, key: str) -> bool:
+        """Whether key is eligible for the local tier"""
+        return self.max_size > 0 and self._pattern is not None and bool(self._pattern.match(key))
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live value, counting the hit or miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, expire: int) -> None:
+        """Store value for at most the local TTL, evicting the least recently used entry"""
+        self._entries[key] = (time.monotonic() + min(expire, self.ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def evict(self, *keys: str) -> None:
+        """Drop keys if present"""
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and size counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_size": self.max_size
+        }
@@ -1,60 +1,1030 @@
-from redis import Redis
+from redis.asyncio import ConnectionPool, Redis
 from app.core.config import settings
+from app.core.codecs import get_codec
+from app.core.local_cache import LocalCache
+from app.core.suggest import suggest_key, suggest_prefixes, suggest_terms
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
 import json
-from typing import Any, Optional
+import random
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+TAG_PREFIX = "synthr:tag:"
+COUNTER_PREFIX = "synthr:counter:"
+SUGGEST_PREFIX = "synthr:suggest:"
+LEADERBOARD_PREFIX = "synthr:leaderboard:"
+LEADERBOARD_META = f"{LEADERBOARD_PREFIX}meta"
+
+# Drop every key indexed under the given tag sets, then the sets themselves.
+# Runs server-side so a write costs one round trip and never scans the keyspace.
+# Returns the removed keys so the local tier can drop them as well, and
+# publishes them (ARGV: channel, origin) so the other workers do the same.
+INVALIDATE_TAGS_SCRIPT = """
+local removed = {}
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 500 do
+        redis.call('UNLINK', unpack(members, i, math.min(i + 499, #members)))
+    end
+    for _, member in ipairs(members) do
+        removed[#removed + 1] = member
+    end
+    redis.call('UNLINK', tag)
+end
+if ARGV[1] ~= '' and #removed > 0 then
+    redis.call('PUBLISH', ARGV[1], cjson.encode({origin = ARGV[2], keys = removed}))
+end
+return removed
+"""
+
+# Release a lock only if it is still held by the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Apply row-count deltas (KEYS: counter hashes, ARGV: field, delta per key) to
+# counters that have been seeded; unseeded ones are filled from the database later.
+INCR_COUNTERS_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('HINCRBY', key, ARGV[2 * i - 1], ARGV[2 * i])
+    end
+end
+return 0
+"""
+
+# Field marking a seeded counter hash, so a seeded but empty counter still exists
+COUNTER_SEEDED = "__seeded__"
+
+# Best members of a type-ahead index for a prefix, with their scores and labels.
+# KEYS: the prefix's ranked set, the lexicographic term set, the label and score
+# hashes. ARGV: prefix, limit, scan limit, and "1" to read the ranked set; otherwise
+# the first scan-limit terms starting with the prefix are ranked by score.
+SUGGEST_TOP_SCRIPT = """
+local limit = tonumber(ARGV[2])
+local members, scores = {}, {}
+if ARGV[4] == '1' then
+    local ranked = redis.call('ZREVRANGE', KEYS[1], 0, limit - 1, 'WITHSCORES')
+    for i = 1, #ranked, 2 do
+        members[#members + 1] = ranked[i]
+        scores[#scores + 1] = ranked[i + 1]
+    end
+else
+    local terms = redis.call(
+        'ZRANGEBYLEX', KEYS[2], '[' .. ARGV[1], '[' .. ARGV[1] .. '\\255', 'LIMIT', 0, tonumber(ARGV[3])
+    )
+    local candidates, seen = {}, {}
+    for _, term in ipairs(terms) do
+        local member = string.match(term, '%z(.*)$')
+        if member and not seen[member] then
+            seen[member] = true
+            candidates[#candidates + 1] = member
+        end
+    end
+    if #candidates == 0 then
+        return {}
+    end
+    local weights = redis.call('HMGET', KEYS[4], unpack(candidates))
+    local order = {}
+    for i = 1, #candidates do
+        order[i] = i
+    end
+    table.sort(order, function(a, b)
+        return (tonumber(weights[a]) or 0) > (tonumber(weights[b]) or 0)
+    end)
+    for i = 1, math.min(limit, #order) do
+        members[i] = candidates[order[i]]
+        scores[i] = weights[order[i]] or '0'
+    end
+end
+if #members == 0 then
+    return {}
+end
+local labels = redis.call('HMGET', KEYS[3], unpack(members))
+local result = {}
+for i = 1, #members do
+    result[#result + 1] = members[i]
+    result[#result + 1] = scores[i]
+    result[#result + 1] = labels[i] or ''
+end
+return result
+"""
+
+class CacheEntry(NamedTuple):
+    """One value for a pipelined multi-set"""
+    key: str
+    value: Any
+    expire: int = 3600
+    tags: Iterable[str] = ()
+
+# Write-behind batch collecting the cache mutations of the current unit of work
+_current_batch: ContextVar[Optional["CacheBatch"]] = ContextVar("cache_batch", default=None)
+
+class TTLBound:
+    """
+    Upper bound on the TTL of the cache writes made in a context, e.g. of
+    results read from a replica that may trail the primary. Unbounded until
+    limit() is called; background tasks started in the context share it.
+    """
+
+    def __init__(self):
+        self.seconds: Optional[int] = None
+
+    def limit(self, seconds: int) -> None:
+        self.seconds = seconds if self.seconds is None else min(self.seconds, seconds)
+
+    def apply(self, expire: int) -> int:
+        return expire if self.seconds is None else max(1, min(expire, self.seconds))
+
+_ttl_bound: ContextVar[Optional[TTLBound]] = ContextVar("cache_ttl_bound", default=None)
+
+@contextmanager
+def ttl_bound() -> Iterator[TTLBound]:
+    """Bound the TTL of cache writes in this context; nested uses share the outermost bound"""
+    bound = _ttl_bound.get()
+    if bound is not None:
+        yield bound
+        return
+    bound = TTLBound()
+    token = _ttl_bound.set(bound)
+    try:
+        yield bound
+    finally:
+        _ttl_bound.reset(token)
+
+def current_ttl_bound() -> Optional[TTLBound]:
+    return _ttl_bound.get()
+
+def _bounded(expire: int) -> int:
+    bound = _ttl_bound.get()
+    return expire if bound is None else bound.apply(expire)
+
+class CacheBatch:
+    """
+    Buffers cache sets and deletes and flushes them in a single MULTI/EXEC
+    pipeline, so a write costs one Redis round trip after the database
+    commit instead of several.
+
+        async with redis_client.batch():
+            await crud.agent.list_agent(db, agent_id=1, price=price)
+
+    Tag invalidations are not buffered: they run at once, so later reads in
+    the block miss the invalidated lists, and they drop the buffered sets
+    under the same tags, which hold values read before the write.
+
+    The batch flushes when the block exits (flush_on_exit=False leaves that
+    to explicit flush() calls, e.g. once per chunk in a background job). If
+    the block raises, only deletes are flushed. Nested batches join the
+    outermost one.
+    """
+
+    def __init__(self, client: "RedisClient", flush_on_exit: bool = True, transaction: bool = True):
+        self.client = client
+        self.flush_on_exit = flush_on_exit
+        self.transaction = transaction
+        self._ops: List[tuple] = []
+        self._pending: Dict[str, Any] = {}
+        self._deleted: Set[str] = set()
+        self._token = None
+        self._joined = False
+
+    def queue_set(self, key: str, value: Any, expire: int, tags: Iterable[str]) -> None:
+        self._ops.append(("set", key, value, expire, list(tags)))
+        self._pending[key] = value
+        self._deleted.discard(key)
+
+    def queue_delete(self, key: str) -> None:
+        self._ops.append(("delete", key))
+        self._pending.pop(key, None)
+        self._deleted.add(key)
+
+    def is_deleted(self, key: str) -> bool:
+        """Whether key was deleted earlier in this batch, so Redis still holds the old value"""
+        return key in self._deleted
+
+    def discard_tagged(self, tags: Iterable[str]) -> None:
+        """Drop buffered sets registered under any of tags, which are being invalidated"""
+        tags = set(tags)
+        kept = []
+        for op in self._ops:
+            if op[0] == "set" and tags.intersection(op[4]):
+                self._pending.pop(op[1], None)
+            else:
+                kept.append(op)
+        self._ops = kept
+
+    def pending_value(self, key: str) -> Optional[Any]:
+        """A value set earlier in this batch and not yet flushed"""
+        return self._pending.get(key)
+
+    async def flush(self, include_sets: bool = True) -> bool:
+        """Send every buffered mutation in one pipeline"""
+        ops, self._ops = self._ops, []
+        self._pending.clear()
+        self._deleted.clear()
+        if not include_sets:
+            ops = [op for op in ops if op[0] != "set"]
+        if not ops:
+            return True
+
+        client = self.client
+        local_keys = []
+        try:
+            async with client.redis.pipeline(transaction=self.transaction) as pipe:
+                for op in ops:
+                    if op[0] == "set":
+                        _, key, value, expire, tags = op
+                        client._queue_set(pipe, key, value, expire, tags)
+                    else:
+                        pipe.delete(op[1])
+                    if client.local.accepts(op[1]):
+                        local_keys.append(op[1])
+                if local_keys:
+                    pipe.publish(
+                        settings.CACHE_INVALIDATION_CHANNEL,
+                        client._invalidation_message(local_keys)
+                    )
+                await pipe.execute()
+        except Exception as e:
+            print(f"Redis batch flush error: {e}")
+            client.local.evict(*local_keys)
+            return False
+
+        for op in ops:
+            if op[0] == "set" and client.local.accepts(op[1]):
+                client.local.set(op[1], op[2], op[3])
+            elif op[0] == "delete":
+                client.local.evict(op[1])
+        return True
+
+    async def __aenter__(self) -> "CacheBatch":
+        outer = _current_batch.get()
+        if outer is not None:
+            self._joined = True
+            return outer
+        self._token = _current_batch.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._joined:
+            return
+        _current_batch.reset(self._token)
+        if exc_type is not None:
+            await self.flush(include_sets=False)
+        elif self.flush_on_exit:
+            await self.flush()
 
 class RedisClient:
     def __init__(self):
-        self.redis = Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            db=0,
-            decode_responses=True
+        # One pool shared by every coroutine in the worker; commands are awaited
+        # so a cache round trip never blocks the event loop.
+        self.pool = ConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_POOL_SIZE,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL
         )
+        self.redis = Redis(connection_pool=self.pool)
+        self._invalidate_tags = self.redis.register_script(INVALIDATE_TAGS_SCRIPT)
+        self._release_lock = self.redis.register_script(RELEASE_LOCK_SCRIPT)
+        self._incr_counters = self.redis.register_script(INCR_COUNTERS_SCRIPT)
+        self._suggest_top = self.redis.register_script(SUGGEST_TOP_SCRIPT)
+        self.codec = get_codec(
+            settings.CACHE_CODEC,
+            settings.CACHE_COMPRESSION,
+            settings.CACHE_COMPRESSION_MIN_SIZE
+        )
+
+        # In-process tier for hot rows, kept coherent across workers over pub/sub
+        self.local = LocalCache(
+            max_size=settings.CACHE_L1_MAX_SIZE,
+            ttl=settings.CACHE_L1_TTL,
+            patterns=settings.CACHE_L1_PATTERNS
+        )
+        self.instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        # Handlers for cross-worker events, keyed by pub/sub channel
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        # Called each time the listener (re)subscribes, after which no event is missed
+        self._subscribe_handlers: List[Callable[[], None]] = []
+        # Recomputations running in this worker, keyed by cache key: those
+        # callers await, and background refreshes of stale values, which
+        # return None when another worker holds the lock
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get_tag_key(self, tag: str) -> str:
+        """Generate the key of the set indexing a tag"""
+        return f"{TAG_PREFIX}{tag}"
+
+    def _invalidation_message(self, keys: List[str]) -> str:
+        """Payload telling the other workers to drop keys from their local tier"""
+        return json.dumps({"origin": self.instance_id, "keys": keys})
+
+    def batch(self, flush_on_exit: bool = True, transaction: bool = True) -> CacheBatch:
+        """Buffer cache mutations until the unit of work ends; see CacheBatch"""
+        return CacheBatch(self, flush_on_exit=flush_on_exit, transaction=transaction)
+
+    def _invalidation_args(self) -> List[str]:
+        """Channel and origin the invalidation script publishes removed keys with"""
+        channel = settings.CACHE_INVALIDATION_CHANNEL if self.local.max_size > 0 else ""
+        return [channel, self.instance_id]
+
+    def _queue_set(self, pipe, key: str, value: Any, expire: int, tags: Iterable[str]) -> None:
+        """Queue a SETEX plus its tag registrations on a pipeline"""
+        pipe.setex(key, expire, self.codec.encode(value))
+        for tag in tags:
+            tag_key = self._get_tag_key(tag)
+            pipe.sadd(tag_key, key)
+            # Keep the index alive as long as its longest-lived member
+            pipe.expire(tag_key, expire, nx=True)
+            pipe.expire(tag_key, expire, gt=True)
         
     async def get(self, key: str) -> Optional[Any]:
-        """ Get value from redis """
+        """ Get value from the local tier, falling back to redis """
+        batch = _current_batch.get()
+        if batch is not None:
+            if batch.pending_value(key) is not None:
+                return batch.pending_value(key)
+            if batch.is_deleted(key):
+                return None
+
+        local = self.local.accepts(key)
+        if local:
+            value = self.local.get(key)
+            if value is not None:
+                return value
+
         try:
-            data = self.redis.get(key)
-            return json.loads(data) if data else None
+            data = await self.redis.get(key)
         except Exception as e:
             print(f"Redis get error: {e}")
             return None
+
+        if not data:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        value = self.codec.decode(data)
+        if local:
+            self.local.set(key, value, settings.CACHE_L1_TTL)
+        return value
     
-    async def set(self, key: str, value: Any, expire: int = 3600) -> bool:
-        """Set value in Redis with expiration"""
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expire: int = 3600,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """Set value in Redis with expiration, registering it under tags"""
+        expire = _bounded(expire)
+        batch = _current_batch.get()
+        if batch is not None:
+            batch.queue_set(key, value, expire, tags or ())
+            return True
+
+        local = self.local.accepts(key)
         try:
-            return self.redis.setex(key, expire, json.dumps(value))
+            if not tags and not local:
+                return await self.redis.setex(key, expire, self.codec.encode(value))
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                self._queue_set(pipe, key, value, expire, tags or ())
+                if local:
+                    pipe.publish(
+                        settings.CACHE_INVALIDATION_CHANNEL,
+                        self._invalidation_message([key])
+                    )
+                results = await pipe.execute()
         except Exception as e:
             print(f"Redis set error: {e}")
+            self.local.evict(key)
+            return False
+
+        if local:
+            self.local.set(key, value, expire)
+        return bool(results[0])
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[Any]]:
+        """Get several values with one MGET, in the order of keys"""
+        values: List[Optional[Any]] = [None] * len(keys)
+        remote = []
+        batch = _current_batch.get()
+        for index, key in enumerate(keys):
+            # Like get(): values buffered in this batch first, then its deletes
+            if batch is not None:
+                pending = batch.pending_value(key)
+                if pending is not None:
+                    values[index] = pending
+                    continue
+                if batch.is_deleted(key):
+                    continue
+            if self.local.accepts(key):
+                values[index] = self.local.get(key)
+            if values[index] is None:
+                remote.append(index)
+
+        if not remote:
+            return values
+
+        try:
+            found = await self.redis.mget([keys[index] for index in remote])
+        except Exception as e:
+            print(f"Redis mget error: {e}")
+            return values
+
+        for index, data in zip(remote, found):
+            if not data:
+                self.misses += 1
+                continue
+            self.hits += 1
+            values[index] = self.codec.decode(data)
+            if self.local.accepts(keys[index]):
+                self.local.set(keys[index], values[index], settings.CACHE_L1_TTL)
+        return values
+
+    async def set_many(self, entries: Iterable[CacheEntry]) -> bool:
+        """Set several values, each with its own TTL and tags, in one pipeline"""
+        entries = [entry._replace(expire=_bounded(entry.expire)) for entry in entries]
+        if not entries:
+            return True
+
+        batch = _current_batch.get()
+        if batch is not None:
+            for entry in entries:
+                batch.queue_set(entry.key, entry.value, entry.expire, entry.tags)
+            return True
+
+        local_keys = [entry.key for entry in entries if self.local.accepts(entry.key)]
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for entry in entries:
+                    self._queue_set(pipe, entry.key, entry.value, entry.expire, entry.tags)
+                if local_keys:
+                    pipe.publish(
+                        settings.CACHE_INVALIDATION_CHANNEL,
+                        self._invalidation_message(local_keys)
+                    )
+                await pipe.execute()
+        except Exception as e:
+            print(f"Redis set many error: {e}")
+            self.local.evict(*local_keys)
             return False
+
+        for entry in entries:
+            if self.local.accepts(entry.key):
+                self.local.set(entry.key, entry.value, entry.expire)
+        return True
     
     async def delete(self, key: str) -> bool:
         """Delete key from Redis"""
+        batch = _current_batch.get()
+        if batch is not None:
+            batch.queue_delete(key)
+            return True
+
+        self.local.evict(key)
         try:
-            return bool(self.redis.delete(key))
+            if not self.local.accepts(key):
+                return bool(await self.redis.delete(key))
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(key)
+                pipe.publish(
+                    settings.CACHE_INVALIDATION_CHANNEL,
+                    self._invalidation_message([key])
+                )
+                results = await pipe.execute()
+            return bool(results[0])
         except Exception as e:
             print(f"Redis delete error: {e}")
             return False
         
+    async def set_flag(self, key: str, expire: int) -> bool:
+        """Set a marker key that expires on its own, straight away rather than through a batch"""
+        try:
+            return bool(await self.redis.set(key, 1, ex=expire))
+        except Exception as e:
+            print(f"Redis flag error: {e}")
+            return False
+
     async def exists(self, key: str) -> bool:
         """Check if key exists in Redis"""
         try:
-            return bool(self.redis.exists(key))
+            return bool(await self.redis.exists(key))
         except Exception as e:
             print(f"Redis exists error: {e}")
             return False
         
-    async def clear_cache(self, pattern: str) -> bool:
-        """Clear all keys matching pattern"""
+    async def invalidate_tags(self, *tags: str) -> bool:
+        """Delete every key registered under any of the given tags"""
+        if not tags:
+            return True
+
+        # Applied at once even inside a batch, so the rest of the unit of work
+        # never reads an invalidated entry; only the batch's own stale sets wait
+        batch = _current_batch.get()
+        if batch is not None:
+            batch.discard_tagged(tags)
+
+        try:
+            # The script publishes the removed keys to the other workers itself
+            removed = await self._invalidate_tags(
+                keys=[self._get_tag_key(tag) for tag in set(tags)],
+                args=self._invalidation_args()
+            )
+            self.local.evict(*(key.decode() for key in removed))
+            return True
+        except Exception as e:
+            print(f"Redis invalidate tags error: {e}")
+            return False
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        *,
+        expire: int = 1800,
+        tags: Optional[Iterable[str]] = None,
+        refresh: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Any:
+        """
+        Get a value, recomputing it at most once across all workers on a miss.
+        After its (jittered) freshness window the value is still served for
+        CACHE_STALE_TTL seconds while one worker refreshes it in the background
+        using refresh, which defaults to compute.
+        """
+        envelope = await self.get(key)
+        if isinstance(envelope, dict) and "fresh_until" in envelope and "value" in envelope:
+            stale = envelope["fresh_until"] <= time.time()
+            if stale and key not in self._inflight and key not in self._refreshing:
+                self._start_recompute(key, refresh or compute, expire, tags, wait=False)
+            return envelope["value"]
+
+        # Only share a recomputation that waits for the value; a background
+        # refresh may give up to another worker and return None
+        task = self._inflight.get(key) or self._start_recompute(key, compute, expire, tags, wait=True)
+        return await asyncio.shield(task)
+
+    def _start_recompute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expire: int,
+        tags: Optional[Iterable[str]],
+        wait: bool
+    ) -> asyncio.Task:
+        """Run one recomputation of key in this worker"""
+        # Recomputed values are written directly, never into the caller's batch
+        context = copy_context()
+        context.run(_current_batch.set, None)
+        task = asyncio.create_task(
+            self._recompute(key, compute, expire, tags, wait),
+            context=context
+        )
+        running = self._inflight if wait else self._refreshing
+        running[key] = task
+        task.add_done_callback(lambda done: self._finish_recompute(running, key, done))
+        return task
+
+    def _finish_recompute(self, running: Dict[str, asyncio.Task], key: str, task: asyncio.Task) -> None:
+        """Forget a finished recomputation, reporting background failures"""
+        if running.get(key) is task:
+            del running[key]
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Cache recompute error for {key}: {task.exception()}")
+
+    async def _recompute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        expire: int,
+        tags: Optional[Iterable[str]],
+        wait: bool
+    ) -> Any:
+        """Recompute key under a cross-worker lock"""
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis.set(
+                lock_key, token, nx=True, ex=settings.CACHE_LOCK_TIMEOUT
+            )
+        except Exception as e:
+            print(f"Redis lock error: {e}")
+            acquired = False
+
+        if not acquired:
+            if not wait:
+                # Another worker is already refreshing the stale value
+                return None
+            deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                envelope = await self.get(key)
+                if isinstance(envelope, dict) and "value" in envelope:
+                    return envelope["value"]
+            # The lock holder is too slow or gone; compute locally
+
         try:
-            keys = self.redis.keys(pattern)
-            if keys:
-                return bool(self.redis.delete(*keys))
+            value = await compute()
+            ttl = expire * random.uniform(
+                1 - settings.CACHE_TTL_JITTER, 1 + settings.CACHE_TTL_JITTER
+            )
+            await self.set(
+                key,
+                {"value": value, "fresh_until": time.time() + ttl},
+                expire=int(ttl) + settings.CACHE_STALE_TTL,
+                tags=tags
+            )
+            return value
+        finally:
+            if acquired:
+                try:
+                    await self._release_lock(keys=[lock_key], args=[token])
+                except Exception as e:
+                    print(f"Redis unlock error: {e}")
+
+    async def get_counter(self, name: str, field: str) -> Optional[int]:
+        """Value of a row counter, 0 for an unseen field, or None if the counter is not seeded"""
+        key = f"{COUNTER_PREFIX}{name}"
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.exists(key)
+                pipe.hget(key, field)
+                seeded, value = await pipe.execute()
+        except Exception as e:
+            print(f"Redis counter get error: {e}")
+            return None
+        if not seeded:
+            return None
+        return int(value or 0)
+
+    async def seed_counter(self, name: str, counts: Mapping[str, int], expire: int) -> bool:
+        """Replace a row counter with counts taken from the database"""
+        key = f"{COUNTER_PREFIX}{name}"
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping={**counts, COUNTER_SEEDED: 0})
+                # Drift from increments racing the seed heals on the next reseed
+                pipe.expire(key, expire)
+                await pipe.execute()
             return True
         except Exception as e:
-            print(f"Redis clear cache error: {e}")
+            print(f"Redis counter seed error: {e}")
             return False
 
+    async def incr_counters(self, deltas: Mapping[Tuple[str, str], int]) -> bool:
+        """Apply {(counter name, field): delta} to the seeded row counters"""
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return True
+        args = []
+        for (_, field), delta in deltas.items():
+            args += [field, delta]
+        try:
+            await self._incr_counters(
+                keys=[f"{COUNTER_PREFIX}{name}" for name, _ in deltas],
+                args=args
+            )
+            return True
+        except Exception as e:
+            print(f"Redis counter increment error: {e}")
+            return False
+
+    def _suggest_keys(self, index: str) -> Dict[str, str]:
+        """Keys of a type-ahead index besides its ranked prefix sets"""
+        base = f"{SUGGEST_PREFIX}{index}"
+        return {
+            "lex": f"{base}:lex",
+            "labels": f"{base}:labels",
+            "scores": f"{base}:scores",
+            "prefixes": f"{base}:prefixes"
+        }
+
+    def _suggest_prefix_key(self, index: str, prefix: str) -> str:
+        return f"{SUGGEST_PREFIX}{index}:prefix:{prefix}"
+
+    def _queue_suggest_remove(self, pipe, index: str, member: str, label: str) -> None:
+        """Queue removing a member from the terms and ranked sets of label"""
+        keys = self._suggest_keys(index)
+        terms = [f"{term}\0{member}" for term in suggest_terms(label)]
+        if terms:
+            pipe.zrem(keys["lex"], *terms)
+        for prefix in suggest_prefixes(label):
+            pipe.zrem(self._suggest_prefix_key(index, prefix), member)
+
+    async def suggest_add(
+        self,
+        index: str,
+        entries: Mapping[str, Tuple[str, float]],
+        *,
+        only_new: bool = False
+    ) -> bool:
+        """
+        Add or re-score members of a type-ahead index, given as
+        {member: (label, score)}. A member whose label changed leaves the
+        prefixes of the old one; only_new leaves existing members untouched.
+        Each ranked prefix set keeps its SUGGEST_PREFIX_SIZE best members.
+        """
+        entries = {member: entry for member, entry in entries.items() if suggest_key(entry[0])}
+        if not entries:
+            return True
+        keys = self._suggest_keys(index)
+        members = list(entries)
+        try:
+            old_labels = await self.redis.hmget(keys["labels"], members)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for member, old_label in zip(members, old_labels):
+                    label, score = entries[member]
+                    if old_label is not None:
+                        if only_new:
+                            continue
+                        old_label = old_label.decode()
+                        if suggest_key(old_label) != suggest_key(label):
+                            self._queue_suggest_remove(pipe, index, member, old_label)
+
+                    pipe.zadd(keys["lex"], {f"{term}\0{member}": 0 for term in suggest_terms(label)})
+                    for prefix in suggest_prefixes(label):
+                        prefix_key = self._suggest_prefix_key(index, prefix)
+                        pipe.zadd(prefix_key, {member: score})
+                        pipe.zremrangebyrank(prefix_key, 0, -(settings.SUGGEST_PREFIX_SIZE + 1))
+                        pipe.sadd(keys["prefixes"], prefix_key)
+                    pipe.hset(keys["labels"], member, label)
+                    pipe.hset(keys["scores"], member, score)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Redis suggest add error: {e}")
+            return False
+
+    async def suggest_remove(self, index: str, members: Sequence[str]) -> bool:
+        """Remove members from a type-ahead index"""
+        if not members:
+            return True
+        keys = self._suggest_keys(index)
+        try:
+            labels = await self.redis.hmget(keys["labels"], list(members))
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for member, label in zip(members, labels):
+                    if label is not None:
+                        self._queue_suggest_remove(pipe, index, member, label.decode())
+                pipe.hdel(keys["labels"], *members)
+                pipe.hdel(keys["scores"], *members)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Redis suggest remove error: {e}")
+            return False
+
+    async def suggest_top(
+        self,
+        indexes: Sequence[str],
+        prefix: str,
+        limit: int
+    ) -> Dict[str, List[Tuple[str, str, float]]]:
+        """
+        Best (member, label, score) of each index for a typed prefix, in one
+        round trip. Prefixes longer than SUGGEST_SHORT_PREFIX rank the first
+        SUGGEST_SCAN_LIMIT matching terms, so very common ones are approximate.
+        """
+        prefix = suggest_key(prefix)
+        results = {index: [] for index in indexes}
+        if not prefix:
+            return results
+        limit = max(1, min(limit, settings.SUGGEST_PREFIX_SIZE))
+        ranked = "1" if len(prefix) <= settings.SUGGEST_SHORT_PREFIX else "0"
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for index in indexes:
+                    keys = self._suggest_keys(index)
+                    await self._suggest_top(
+                        keys=[
+                            self._suggest_prefix_key(index, prefix),
+                            keys["lex"],
+                            keys["labels"],
+                            keys["scores"]
+                        ],
+                        args=[prefix, limit, settings.SUGGEST_SCAN_LIMIT, ranked],
+                        client=pipe
+                    )
+                replies = await pipe.execute()
+        except Exception as e:
+            print(f"Redis suggest error: {e}")
+            return results
+        for index, reply in zip(indexes, replies):
+            results[index] = [
+                (reply[i].decode(), reply[i + 2].decode(), float(reply[i + 1]))
+                for i in range(0, len(reply), 3)
+            ]
+        return results
+
+    async def suggest_clear(self, index: str) -> bool:
+        """Drop a type-ahead index, e.g. before rebuilding it"""
+        keys = self._suggest_keys(index)
+        try:
+            prefix_keys = list(await self.redis.smembers(keys["prefixes"]))
+            for start in range(0, len(prefix_keys), 500):
+                await self.redis.unlink(*prefix_keys[start:start + 500])
+            await self.redis.unlink(*keys.values())
+            return True
+        except Exception as e:
+            print(f"Redis suggest clear error: {e}")
+            return False
+
+    async def claim(self, key: str, expire: int) -> bool:
+        """True for the one caller that claims key until it expires, e.g. to run a periodic job once"""
+        try:
+            return bool(await self.redis.set(key, self.instance_id, nx=True, ex=expire))
+        except Exception as e:
+            print(f"Redis claim error: {e}")
+            return False
+
+    def _leaderboard_key(self, board: str) -> str:
+        return f"{LEADERBOARD_PREFIX}{board}"
+
+    async def leaderboard_update(
+        self,
+        scores: Iterable[Tuple[str, str, Optional[float]]] = (),
+        increments: Iterable[Tuple[str, str, float]] = ()
+    ) -> bool:
+        """
+        Set (board, member, score) entries, removing members whose score is
+        None, and add (board, member, delta) increments, in one round trip.
+        """
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for board, member, score in scores:
+                    if score is None:
+                        pipe.zrem(self._leaderboard_key(board), member)
+                    else:
+                        pipe.zadd(self._leaderboard_key(board), {member: score})
+                for board, member, delta in increments:
+                    pipe.zincrby(self._leaderboard_key(board), delta, member)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Redis leaderboard update error: {e}")
+            return False
+
+    async def leaderboard_meta(self) -> Optional[Dict[str, str]]:
+        """Fields the last rebuild stored, or None if the leaderboards were never built"""
+        try:
+            meta = await self.redis.hgetall(LEADERBOARD_META)
+        except Exception as e:
+            print(f"Redis leaderboard meta error: {e}")
+            return None
+        return {field.decode(): value.decode() for field, value in meta.items()} or None
+
+    async def leaderboard_top(
+        self,
+        board: str,
+        limit: int
+    ) -> Tuple[List[Tuple[str, float]], Optional[Dict[str, str]]]:
+        """The best (member, score) of a board and the leaderboards' meta fields, in one round trip"""
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zrevrange(self._leaderboard_key(board), 0, max(limit, 1) - 1, withscores=True)
+                pipe.hgetall(LEADERBOARD_META)
+                entries, meta = await pipe.execute()
+        except Exception as e:
+            print(f"Redis leaderboard error: {e}")
+            return [], None
+        meta = {field.decode(): value.decode() for field, value in meta.items()} or None
+        return [(member.decode(), float(score)) for member, score in entries], meta
+
+    async def leaderboard_replace(
+        self,
+        boards: Mapping[str, Mapping[str, float]],
+        meta: Mapping[str, Any]
+    ) -> bool:
+        """
+        Swap in rebuilt boards: each is written to a staging key, then every
+        staging key is renamed over its board, empty boards are dropped and
+        the meta fields replaced in one transaction, so readers never see a
+        half-built board. Increments racing the rebuild heal on the next one.
+        """
+        token = uuid.uuid4().hex
+        staged: Dict[str, str] = {}
+        try:
+            for board, scores in boards.items():
+                if not scores:
+                    continue
+                staging = f"{self._leaderboard_key(board)}:rebuild:{token}"
+                staged[board] = staging
+                items = list(scores.items())
+                for start in range(0, len(items), 10000):
+                    await self.redis.zadd(staging, dict(items[start:start + 10000]))
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for board in boards:
+                    if board in staged:
+                        pipe.rename(staged[board], self._leaderboard_key(board))
+                    else:
+                        pipe.unlink(self._leaderboard_key(board))
+                pipe.delete(LEADERBOARD_META)
+                pipe.hset(LEADERBOARD_META, mapping=dict(meta))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Redis leaderboard replace error: {e}")
+            if staged:
+                try:
+                    await self.redis.unlink(*staged.values())
+                except Exception:
+                    pass
+            return False
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss counters per tier, for sizing the local cache"""
+        return {
+            "local": self.local.stats(),
+            "redis": {"hits": self.hits, "misses": self.misses}
+        }
+
+    async def _listen_for_invalidations(self) -> None:
+        """Evict keys other workers have written or invalidated"""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                channels = [settings.CACHE_INVALIDATION_CHANNEL, *self._handlers]
+                await pubsub.subscribe(*channels)
+                unconfirmed = len(channels)
+                async for message in pubsub.listen():
+                    if message["type"] == "subscribe":
+                        unconfirmed -= 1
+                        if not unconfirmed:
+                            # Every channel is live; no event is missed from here on
+                            for handler in self._subscribe_handlers:
+                                handler()
+                        continue
+                    if message["type"] != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload["origin"] == self.instance_id:
+                        continue
+                    channel = message["channel"].decode()
+                    if channel == settings.CACHE_INVALIDATION_CHANNEL:
+                        self.local.evict(*payload["keys"])
+                    else:
+                        self._handlers[channel](payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Messages may have been missed while disconnected
+                print(f"Redis invalidation listener error: {e}")
+                self.local.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def add_listener(self, channel: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Call handler with events other workers publish on channel; register before startup"""
+        self._handlers[channel] = handler
+
+    def add_subscribe_handler(self, handler: Callable[[], None]) -> None:
+        """
+        Call handler whenever the listener subscribes, at startup and after a
+        reconnect, e.g. to reload state that events may have been missed for
+        """
+        self._subscribe_handlers.append(handler)
+
+    async def publish_event(self, channel: str, payload: Dict[str, Any]) -> bool:
+        """Publish an event to the other workers' listeners"""
+        try:
+            await self.redis.publish(channel, json.dumps({**payload, "origin": self.instance_id}))
+            return True
+        except Exception as e:
+            print(f"Redis publish error: {e}")
+            return False
+
+    def start_invalidation_listener(self) -> None:
+        """Subscribe this worker to cross-worker local cache invalidations"""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen_for_invalidations())
+
+    async def close(self) -> None:
+        """Close the client and disconnect every pooled connection"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        for task in [*self._inflight.values(), *self._refreshing.values()]:
+            task.cancel()
+        await self.redis.aclose()
+        await self.pool.disconnect()
+
 redis_client = RedisClient()
-            
\ No newline at end of file
@@ -0,0 +1,59 @@
+import html
+import re
+from typing import Any, Optional
+from sqlalchemy import cast, func, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+# Text search configuration of agents.search_vector; its trigger uses the same one
+SEARCH_CONFIG = "english"
+
+# Private-use characters ts_headline wraps matches in; render_headline turns
+# them into <mark> tags after HTML-escaping the user-supplied text
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+
+# ts_headline options for search snippets
+HEADLINE_OPTIONS = (
+    f"StartSel=\"{HIGHLIGHT_START}\", StopSel=\"{HIGHLIGHT_STOP}\", MaxWords=35, MinWords=15, "
+    "MaxFragments=2, FragmentDelimiter=\" ... \""
+)
+
+def search_config() -> Any:
+    """SEARCH_CONFIG as a regconfig argument"""
+    return cast(literal(SEARCH_CONFIG), REGCONFIG)
+
+def prefix_query_text(query: str) -> Optional[str]:
+    """to_tsquery text matching every word, the last one as a prefix, e.g. 'sentiment & ana:*'"""
+    words = re.findall(r"[^\W_]+", query)
+    if not words:
+        return None
+    return " & ".join(words[:-1] + [f"{words[-1]}:*"])
+
+def ts_query(query: str, prefix: bool = False) -> Any:
+    """
+    tsquery of a search: web search syntax ("quoted phrases", or, -excluded),
+    or for type-ahead, all words with the last one still being typed.
+    """
+    text = prefix_query_text(query) if prefix else None
+    if text:
+        return func.to_tsquery(search_config(), text)
+    return func.websearch_to_tsquery(search_config(), query)
+
+def headline(document: Any, tsquery: Any) -> Any:
+    """
+    document with the query's matches between the highlight sentinels, cut
+    down to its best fragments; pass the result through render_headline
+    """
+    # Sentinels typed into the document itself are dropped, so only ts_headline's become tags
+    document = func.translate(func.coalesce(document, ""), HIGHLIGHT_START + HIGHLIGHT_STOP, "")
+    return func.ts_headline(search_config(), document, tsquery, HEADLINE_OPTIONS)
+
+def render_headline(text: Optional[str]) -> Optional[str]:
+    """A headline as safe HTML: the text escaped, matches wrapped in <mark>"""
+    if text is None:
+        return None
+    return (
+        html.escape(text)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
@@ -0,0 +1,23 @@
+import re
+from typing import List, Optional, Set
+from app.core.config import settings
+
+def suggest_key(text: Optional[str]) -> str:
+    """Case-folded words of a name or typed prefix, joined by single spaces"""
+    return " ".join(re.findall(r"[^\W_]+", (text or "").casefold()))
+
+def suggest_terms(label: str) -> List[str]:
+    """
+    Indexed forms of a name: the name from each of its first words on, so
+    'GPT Trading Bot' is suggested for 'gpt t', 'trading' and 'bot'
+    """
+    words = suggest_key(label).split()[:settings.SUGGEST_MAX_WORDS]
+    return [" ".join(words[start:]) for start in range(len(words))]
+
+def suggest_prefixes(label: str) -> Set[str]:
+    """Prefixes up to SUGGEST_SHORT_PREFIX characters, which keep ranked sets of their own"""
+    return {
+        term[:length]
+        for term in suggest_terms(label)
+        for length in range(1, min(len(term), settings.SUGGEST_SHORT_PREFIX) + 1)
+    }
@@ -1,19 +1,32 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func
-from decimal import Decimal
-from fastapi.encoders import jsonable_encoder
+import math
+from collections import Counter
+from typing import List, Optional, Dict, Any, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, case, desc, func, select, text, update
+from decimal import Decimal, ROUND_HALF_UP
 
+from app.crud.agent_embeddings import agent_embeddings
+from app.crud.agent_index import INDEX_ORDER_COLUMNS, agent_index, mark_agents_changed
+from app.crud.agent_leaderboards import BOARDS, agent_leaderboards
 from app.crud.base import CRUDBase
-from app.models.agent import Agent, AgentStatus, AgentCategory
+from app.db.replicas import replica_read
+from app.models.agent import Agent, AgentStatus, AgentCategory, RATING_BUCKETS
 from app.schemas.agent import AgentCreate, AgentUpdate
 from app.models.user import User
-from app.core.redis import redis_client
+from app.core.config import settings
+from app.core.fingerprint import fingerprint, normalize_text
+from app.core.search import headline, render_headline, ts_query
+from app.core.suggest import suggest_key
+from app.core.redis import CacheEntry, redis_client
 
 class CRUDAgent(CRUDBase[Agent, AgentCreate, AgentUpdate]):
+    lookup_fields = {"token": "token_id"}
+    bloom_lookups = ("token",)
+    counted_fields = ("category", "status")
+
     async def create_with_owner(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         *, 
         obj_in: AgentCreate, 
         owner_id: int
@@ -22,34 +35,27 @@ class CRUDAgent(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         obj_in_data = obj_in.model_dump()
         db_obj = Agent(**obj_in_data, owner_id=owner_id)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Cache the new agent
         await self._update_agent_caches(db_obj)
         
         return db_obj
 
-    async def get_by_token_id(self, db: Session, *, token_id: str) -> Optional[Agent]:
+    async def get_by_token_id(self, db: AsyncSession, *, token_id: str) -> Optional[Agent]:
         """Get an agent by token ID with caching."""
-        cache_key = self._get_cache_key(f"token:{token_id}")
-        
-        cached_data = await redis_client.get(cache_key)
-        if cached_data:
-            return Agent(**cached_data)
-        
-        db_obj = db.query(Agent).filter(Agent.token_id == token_id).first()
-        if db_obj:
-            await redis_client.set(
-                cache_key,
-                jsonable_encoder(db_obj),
-                expire=3600
-            )
-        return db_obj
+        return await self._cached_lookup(
+            db,
+            "token",
+            token_id,
+            lambda: db.scalar(select(Agent).where(Agent.token_id == token_id))
+        )
 
+    @replica_read
     async def get_multi_by_owner(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         *, 
         owner_id: int, 
         skip: int = 0, 
@@ -60,27 +66,47 @@ class CRUDAgent(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            return [Agent(**item) for item in cached_data]
+            return [self._from_cache(item) for item in cached_data]
         
-        agents = (
-            db.query(Agent)
-            .filter(Agent.owner_id == owner_id)
+        agents = (await db.scalars(
+            select(Agent)
+            .where(Agent.owner_id == owner_id)
             .offset(skip)
             .limit(limit)
-            .all()
-        )
+        )).all()
         
         if agents:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(agents),
-                expire=1800
+                self._to_cache_many(agents),
+                expire=1800,
+                tags=[self._get_tag(f"owner:{owner_id}")]
             )
         return agents
 
+    @replica_read
+    async def get_page_by_owner(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[List[Agent], Optional[str]]:
+        """Cursor-paginated agents of an owner, newest first."""
+        return await self._keyset_page(
+            db,
+            select(Agent).where(Agent.owner_id == owner_id),
+            cursor=cursor,
+            limit=limit,
+            cache_key=self._get_cache_key(f"owner_page:{owner_id}"),
+            tags=[self._get_tag(f"owner:{owner_id}")]
+        )
+
+    @replica_read
     async def get_multi_by_category(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         *, 
         category: AgentCategory, 
         skip: int = 0, 
@@ -91,33 +117,33 @@ class CRUDAgent(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            return [Agent(**item) for item in cached_data]
+            return [self._from_cache(item) for item in cached_data]
         
-        agents = (
-            db.query(Agent)
-            .filter(Agent.category == category)
+        agents = (await db.scalars(
+            select(Agent)
+            .where(Agent.category == category)
             .offset(skip)
             .limit(limit)
-            .all()
-        )
+        )).all()
         
         if agents:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(agents),
-                expire=1800
+                self._to_cache_many(agents),
+                expire=1800,
+                tags=[self._get_tag(f"category:{AgentCategory(category).value}")]
             )
         return agents
 
     async def list_agent(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         *, 
         agent_id: int, 
         price: Decimal
     ) -> Optional[Agent]:
         """List an agent for sale."""
-        db_obj = await self.get(db, id=agent_id)
+        db_obj = await self.get_db_obj(db, id=agent_id)
         if not db_obj:
             return None
 
@@ -125,34 +151,35 @@ class CRUDAgent(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         db_obj.price = price
         db_obj.status = AgentStatus.LISTED
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Update caches
         await self._update_agent_caches(db_obj)
         
         return db_obj
 
-    async def delist_agent(self, db: Session, *, agent_id: int) -> Optional[Agent]:
+    async def delist_agent(self, db: AsyncSession, *, agent_id: int) -> Optional[Agent]:
         """Remove an agent from sale."""
-        db_obj = await self.get(db, id=agent_id)
+        db_obj = await self.get_db_obj(db, id=agent_id)
         if not db_obj:
             return None
 
         db_obj.is_listed = False
         db_obj.status = AgentStatus.DELISTED
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Update caches
         await self._update_agent_caches(db_obj)
         
         return db_obj
 
+    @replica_read
     async def search_agents(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         query: Optional[str] = None,
         category: Optional[AgentCategory] = None,
@@ -162,30 +189,267 @@ class CRUDAgent(CRUDBase[Agent, AgentCreate, AgentUpdate]):
         creator_id: Optional[int] = None,
         skip: int = 0,
         limit: int = 100,
-        order_by: str = "created_at",
+        order_by: Optional[str] = None,
         order_desc: bool = True
     ) -> List[Agent]:
-        """Search agents with caching."""
-        # Create unique cache key based on search parameters
-        cache_key = self._get_cache_key(
-            f"search:{query}:{category}:{min_price}:{max_price}:"
-            f"{status}:{creator_id}:{skip}:{limit}:{order_by}:{order_desc}"
+        """
+        Search agents with caching.
+        A text query matches the full-text search document; results are ordered
+        by relevance unless order_by names a column.
+        Without a text query, searches sorted by an indexed column are answered
+        from the in-process agent index and only the page's rows are fetched.
+        Other searches share one fingerprinted cache key, and results are
+        cached in fixed windows so any skip/limit page inside a window is
+        served from the same entry.
+        """
+        query = normalize_text(query)
+        if order_by in (None, "relevance"):
+            order_by = "relevance" if query else "created_at"
+        elif order_by not in self.cache_columns:
+            order_by = "created_at"
+
+        if not query and order_by in INDEX_ORDER_COLUMNS and agent_index.ready:
+            equals, ranges = self._index_filters(category, min_price, max_price, status, creator_id)
+            ids, _ = agent_index.index.search(
+                equals=equals,
+                ranges=ranges,
+                order_by=order_by,
+                descending=order_desc,
+                skip=skip,
+                limit=limit
+            )
+            return await self.get_by_ids(db, ids=ids)
+
+        search_filters = {
+            "query": query,
+            "category": category,
+            "min_price": min_price,
+            "max_price": max_price,
+            "status": status,
+            "creator_id": creator_id,
+            "order_by": order_by,
+            "order_desc": order_desc
+        }
+        search_key = fingerprint(search_filters)
+
+        window = settings.CACHE_SEARCH_WINDOW
+        first = skip // window
+        last = (skip + max(limit, 1) - 1) // window
+        window_keys = [
+            self._get_cache_key(f"search:{search_key}:{index}")
+            for index in range(first, last + 1)
+        ]
+        windows = await redis_client.get_many(window_keys)
+        
+        missing = [index for index, rows in enumerate(windows) if rows is None]
+        if missing:
+            # Build filters
+            filters = self._search_conditions(
+                query, category, min_price, max_price, status, creator_id
+            )
+
+            # Base query
+            db_query = select(Agent)
+            
+            # Apply filters
+            if filters:
+                db_query = db_query.where(and_(*filters))
+                
+            # Apply ordering, with id as tie-breaker so windows never overlap
+            if order_by == "relevance":
+                order_col = func.ts_rank_cd(Agent.search_vector, ts_query(query))
+            else:
+                order_col = getattr(Agent, order_by)
+            id_col = Agent.id
+            if order_desc:
+                order_col, id_col = desc(order_col), desc(id_col)
+            db_query = db_query.order_by(order_col, id_col)
+            
+            # One query for the span of missing windows
+            span_start = (first + missing[0]) * window
+            span_end = (first + missing[-1] + 1) * window
+            rows = self._to_cache_many((await db.scalars(
+                db_query.offset(span_start).limit(span_end - span_start)
+            )).all())
+            
+            # A category-scoped search only goes stale when that category changes
+            search_tag = f"category:{AgentCategory(category).value}" if category else "search"
+            entries = []
+            for index in missing:
+                offset = (first + index) * window - span_start
+                windows[index] = rows[offset:offset + window]
+                entries.append(CacheEntry(
+                    window_keys[index],
+                    windows[index],
+                    expire=300,
+                    tags=[self._get_tag(search_tag)]
+                ))
+            await redis_client.set_many(entries)
+        
+        offset = skip - first * window
+        rows = [row for rows in windows for row in rows][offset:offset + limit]
+        return [self._from_cache(row) for row in rows]
+
+    @replica_read
+    async def search_agents_page(
+        self,
+        db: AsyncSession,
+        *,
+        query: Optional[str] = None,
+        category: Optional[AgentCategory] = None,
+        min_price: Optional[Decimal] = None,
+        max_price: Optional[Decimal] = None,
+        status: Optional[AgentStatus] = None,
+        creator_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_desc: bool = True
+    ) -> Tuple[List[Agent], Optional[str]]:
+        """
+        Cursor-paginated search_agents: the rows and the cursor of the next page.
+        Only non-null columns can be ordered by; others fall back to created_at.
+        """
+        query = normalize_text(query)
+        order_by = self._keyset_order(order_by)
+        filters = self._search_conditions(
+            query, category, min_price, max_price, status, creator_id
+        )
+        search_key = fingerprint({
+            "query": query,
+            "category": category,
+            "min_price": min_price,
+            "max_price": max_price,
+            "status": status,
+            "creator_id": creator_id
+        })
+        search_tag = f"category:{AgentCategory(category).value}" if category else "search"
+        return await self._keyset_page(
+            db,
+            select(Agent).where(and_(*filters)) if filters else select(Agent),
+            cursor=cursor,
+            limit=limit,
+            order_by=order_by,
+            order_desc=order_desc,
+            cache_key=self._get_cache_key(f"search_page:{search_key}"),
+            tags=[self._get_tag(search_tag)],
+            expire=300
         )
+
+    @replica_read
+    async def search_agents_ranked(
+        self,
+        db: AsyncSession,
+        *,
+        query: str,
+        category: Optional[AgentCategory] = None,
+        min_price: Optional[Decimal] = None,
+        max_price: Optional[Decimal] = None,
+        status: Optional[AgentStatus] = None,
+        creator_id: Optional[int] = None,
+        prefix: bool = False,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search ordered by relevance. Each hit holds the agent, its
+        rank, and its name and a description snippet as escaped HTML with the
+        matches in <mark> tags.
+        prefix=True treats the last word as a prefix, for type-ahead.
+        """
+        query = normalize_text(query)
+        if not query:
+            return []
+        search_key = fingerprint({
+            "query": query,
+            "category": category,
+            "min_price": min_price,
+            "max_price": max_price,
+            "status": status,
+            "creator_id": creator_id,
+            "prefix": prefix,
+            "skip": skip,
+            "limit": limit
+        })
+        # "html" keys hold escaped highlights; entries from before escaping are never read
+        cache_key = self._get_cache_key(f"ranked:html:{search_key}")
         
-        cached_data = await redis_client.get(cache_key)
-        if cached_data:
-            return [Agent(**item) for item in cached_data]
+        hits = await redis_client.get(cache_key)
+        if hits is None:
+            rows = (await db.execute(self._ranked_search_query(
+                query, category, min_price, max_price, status, creator_id,
+                prefix=prefix, skip=skip, limit=limit
+            ))).all()
+            hits = [
+                {
+                    "agent": self._to_cache(agent),
+                    "rank": rank,
+                    "name_highlight": render_headline(name_highlight),
+                    "snippet": render_headline(snippet)
+                }
+                for agent, rank, name_highlight, snippet in rows
+            ]
+            search_tag = f"category:{AgentCategory(category).value}" if category else "search"
+            await redis_client.set(cache_key, hits, expire=300, tags=[self._get_tag(search_tag)])
         
-        # Build filters
+        return [{**hit, "agent": self._from_cache(hit["agent"])} for hit in hits]
+
+    def _ranked_search_query(
+        self,
+        query: str,
+        category: Optional[AgentCategory],
+        min_price: Optional[Decimal],
+        max_price: Optional[Decimal],
+        status: Optional[AgentStatus],
+        creator_id: Optional[int],
+        *,
+        prefix: bool,
+        skip: int,
+        limit: int
+    ) -> Any:
+        """
+        Rank every match through the GIN index, then build highlights for the
+        requested page only, since ts_headline re-parses each document.
+        """
+        tsquery = ts_query(query, prefix)
+        filters = self._search_conditions(
+            query, category, min_price, max_price, status, creator_id, prefix=prefix
+        )
+        rank = func.ts_rank_cd(Agent.search_vector, tsquery).label("rank")
+        page = (
+            select(Agent.id, rank)
+            .where(and_(*filters))
+            .order_by(desc(rank), desc(Agent.id))
+            .offset(skip)
+            .limit(limit)
+            .subquery()
+        )
+        return (
+            select(
+                Agent,
+                page.c.rank,
+                headline(Agent.name, tsquery).label("name_highlight"),
+                headline(Agent.description, tsquery).label("snippet")
+            )
+            .join(page, Agent.id == page.c.id)
+            .order_by(desc(page.c.rank), desc(Agent.id))
+        )
+
+    def _search_conditions(
+        self,
+        query: Optional[str],
+        category: Optional[AgentCategory],
+        min_price: Optional[Decimal],
+        max_price: Optional[Decimal],
+        status: Optional[AgentStatus],
+        creator_id: Optional[int],
+        prefix: bool = False
+    ) -> List[Any]:
+        """WHERE clauses of an agent search"""
         filters = []
         
         if query:
-            filters.append(
-                or_(
-                    Agent.name.ilike(f"%{query}%"),
-                    Agent.description.ilike(f"%{query}%")
-                )
-            )
+            filters.append(Agent.search_vector.bool_op("@@")(ts_query(query, prefix)))
         
         if category:
             filters.append(Agent.category == category)
@@ -201,96 +465,491 @@ class CRUDAgent(CRUDBase[Agent, AgentCreate, AgentUpdate]):
             
         if creator_id:
             filters.append(Agent.creator_id == creator_id)
+        return filters
 
-        # Base query
-        query = db.query(Agent)
-        
-        # Apply filters
-        if filters:
-            query = query.filter(and_(*filters))
-            
-        # Apply ordering
-        order_col = getattr(Agent, order_by, Agent.created_at)
-        if order_desc:
-            order_col = desc(order_col)
-        query = query.order_by(order_col)
-        
-        results = query.offset(skip).limit(limit).all()
-        
-        if results:
-            await redis_client.set(
-                cache_key,
-                jsonable_encoder(results),
-                expire=300
-            )
-        
-        return results
+    async def suggest(self, *, prefix: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Type-ahead suggestions for a partly typed name: the best agents by
+        usage and rating, and the most used capability tags. Served from
+        Redis alone; prefix is echoed in its normalized form so a client
+        can drop replies to keystrokes it has already moved past.
+        """
+        found = await redis_client.suggest_top(("agents", "capabilities"), prefix, limit)
+        return {
+            "prefix": suggest_key(prefix),
+            "agents": [
+                {"id": int(member), "name": label, "score": score}
+                for member, label, score in found["agents"]
+            ],
+            "capabilities": [
+                {"tag": label, "agents": int(score)}
+                for _, label, score in found["capabilities"]
+            ]
+        }
 
-    async def get_agent_stats(self, db: Session, *, agent_id: int) -> Dict[str, Any]:
+    @replica_read
+    async def similar_agents(
+        self,
+        db: AsyncSession,
+        *,
+        agent_id: int,
+        limit: int = 10,
+        exact: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Agents most similar to one agent by the embedding of their name,
+        description and capabilities, best first, as dicts of the agent and
+        its cosine similarity. Empty until the agent has been embedded.
+        """
+        if not agent_embeddings.ready:
+            return []
+        vector = agent_embeddings.index.vector(agent_id)
+        if vector is None:
+            return []
+        ids, scores = agent_embeddings.search(vector, limit, exact=exact, exclude=[agent_id])
+        return await self._with_similarity(db, ids, scores)
+
+    @replica_read
+    async def semantic_search(
+        self,
+        db: AsyncSession,
+        *,
+        query: str,
+        limit: int = 10,
+        exact: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Agents whose embedding is nearest a free-text description, like similar_agents"""
+        query = normalize_text(query)
+        if not query or not agent_embeddings.ready:
+            return []
+        vector = (await agent_embeddings.encoder().encode_async([query]))[0]
+        ids, scores = agent_embeddings.search(vector, limit, exact=exact)
+        return await self._with_similarity(db, ids, scores)
+
+    async def _with_similarity(
+        self,
+        db: AsyncSession,
+        ids: List[int],
+        scores: List[float]
+    ) -> List[Dict[str, Any]]:
+        """Hydrate nearest-neighbour ids; agents deleted since they were indexed are skipped"""
+        similarity = dict(zip(ids, scores))
+        return [
+            {"agent": agent, "similarity": similarity[agent.id]}
+            for agent in await self.get_by_ids(db, ids=ids)
+        ]
+
+    @replica_read
+    async def get_leaderboard(
+        self,
+        db: AsyncSession,
+        *,
+        board: str = "trending",
+        category: Optional[AgentCategory] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Top agents of a precomputed leaderboard, overall or in one category,
+        as dicts of the agent and its score, best first. Boards are
+        "trending" (purchase volume with a LEADERBOARD_TRENDING_HALF_LIFE
+        decay), "top_rated" (Bayesian average rating) and "most_used".
+        Until the boards are first built, top_rated and most_used fall back
+        to a sorted search and trending is empty.
+        """
+        if board not in BOARDS:
+            raise ValueError(f"Unknown leaderboard: {board}")
+        top = await agent_leaderboards.top(board, category, limit)
+        if top is None:
+            if board == "trending":
+                return []
+            order_by = "average_rating" if board == "top_rated" else "total_uses"
+            agents = await self.search_agents(db, category=category, limit=limit, order_by=order_by)
+            return [{"agent": agent, "score": float(getattr(agent, order_by) or 0)} for agent in agents]
+        scores = dict(top)
+        return [
+            {"agent": agent, "score": scores[agent.id]}
+            for agent in await self.get_by_ids(db, ids=list(scores))
+        ]
+
+    def _suggest_score(self, agent: Any) -> float:
+        """Type-ahead rank of an agent: log-scaled uses plus its 0-5 average rating"""
+        return math.log1p(agent.total_uses or 0) + float(agent.average_rating or 0)
+
+    async def _update_suggestions(self, objs: List[Agent]) -> None:
+        """Re-score written agents; new capability tags count once until the next rebuild"""
+        await redis_client.suggest_add(
+            "agents",
+            {str(obj.id): (obj.name, self._suggest_score(obj)) for obj in objs if obj.name}
+        )
+        tags = {
+            suggest_key(tag): (tag, 1)
+            for obj in objs
+            for tag in obj.capabilities or []
+            if isinstance(tag, str)
+        }
+        await redis_client.suggest_add("capabilities", tags, only_new=True)
+
+    async def _remove_suggestions(self, ids: List[Any]) -> None:
+        await redis_client.suggest_remove("agents", [str(id) for id in ids])
+
+    async def rebuild_suggestions(self, db: AsyncSession) -> Dict[str, int]:
+        """
+        Rebuild the agent name and capability type-ahead indexes from the
+        table, refreshing every score and capability count. Returns the
+        number of names and tags indexed.
+        """
+        await redis_client.suggest_clear("agents")
+        await redis_client.suggest_clear("capabilities")
+
+        names = 0
+        tag_counts: Counter = Counter()
+        tag_labels: Dict[str, str] = {}
+        rows = await db.stream(
+            select(Agent.id, Agent.name, Agent.total_uses, Agent.average_rating, Agent.capabilities)
+            .execution_options(yield_per=1000)
+        )
+        async for partition in rows.partitions():
+            entries = {
+                str(row.id): (row.name, self._suggest_score(row))
+                for row in partition if row.name
+            }
+            await redis_client.suggest_add("agents", entries)
+            names += len(entries)
+            for row in partition:
+                tags = {suggest_key(tag): tag for tag in row.capabilities or [] if isinstance(tag, str)}
+                for key, tag in tags.items():
+                    if key:
+                        tag_counts[key] += 1
+                        tag_labels.setdefault(key, tag)
+
+        await redis_client.suggest_add(
+            "capabilities",
+            {key: (tag_labels[key], count) for key, count in tag_counts.items()}
+        )
+        return {"agents": names, "capabilities": len(tag_counts)}
+
+    def _index_filters(
+        self,
+        category: Optional[AgentCategory],
+        min_price: Optional[Decimal],
+        max_price: Optional[Decimal],
+        status: Optional[AgentStatus],
+        creator_id: Optional[int]
+    ) -> Tuple[Dict[str, Any], Dict[str, Tuple[Optional[Decimal], Optional[Decimal]]]]:
+        """_search_conditions without the text query, as agent index filters"""
+        equals = {}
+        if category:
+            equals["category"] = AgentCategory(category).value
+        if status:
+            equals["status"] = AgentStatus(status).value
+        if creator_id:
+            equals["creator_id"] = creator_id
+        ranges = {}
+        if min_price is not None or max_price is not None:
+            ranges["price"] = (min_price, max_price)
+        return equals, ranges
+
+    @replica_read
+    async def get_facets(
+        self,
+        db: AsyncSession,
+        *,
+        category: Optional[AgentCategory] = None,
+        min_price: Optional[Decimal] = None,
+        max_price: Optional[Decimal] = None,
+        status: Optional[AgentStatus] = None,
+        creator_id: Optional[int] = None,
+        price_buckets: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Facet counts of an agent search: matching agents, agents per category
+        and per status (each ignoring its own filter) and an equal-width price
+        histogram. Served from the agent index, or from SQL until it is loaded.
+        """
+        equals, ranges = self._index_filters(category, min_price, max_price, status, creator_id)
+        if agent_index.ready:
+            index = agent_index.index
+            return {
+                "total": index.search(equals=equals, ranges=ranges, limit=0)[1],
+                "categories": index.counts("category", equals=equals, ranges=ranges),
+                "statuses": index.counts("status", equals=equals, ranges=ranges),
+                "price_histogram": index.histogram("price", bins=price_buckets, equals=equals, ranges=ranges)
+            }
+
+        async def compute(db: AsyncSession) -> Dict[str, Any]:
+            def conditions(*, skip: Optional[str] = None) -> List[Any]:
+                return self._search_conditions(
+                    None,
+                    None if skip == "category" else category,
+                    min_price,
+                    max_price,
+                    None if skip == "status" else status,
+                    creator_id
+                )
+
+            facets = {}
+            for name, column in (("categories", Agent.category), ("statuses", Agent.status)):
+                rows = await db.execute(
+                    select(column, func.count())
+                    .where(*conditions(skip=column.key))
+                    .group_by(column)
+                )
+                facets[name] = {value.value: count for value, count in rows if value is not None}
+
+            matching = conditions()
+            total, low, high = (await db.execute(
+                select(func.count(), func.min(Agent.price), func.max(Agent.price)).where(*matching)
+            )).one()
+            facets["total"] = total
+            facets["price_histogram"] = []
+            if low is not None:
+                low, high = float(low), float(high)
+                if low == high:
+                    # Same range numpy.histogram gives a single value
+                    low, high = low - 0.5, high + 0.5
+                width = (high - low) / price_buckets
+                # The top edge belongs to the last bucket
+                bucket = func.least(
+                    func.width_bucket(Agent.price, low, high, price_buckets),
+                    price_buckets
+                )
+                counts = dict((await db.execute(
+                    select(bucket, func.count())
+                    .where(*matching, Agent.price.isnot(None))
+                    .group_by(bucket)
+                )).all())
+                facets["price_histogram"] = [
+                    {
+                        "min": low + index * width,
+                        "max": low + (index + 1) * width,
+                        "count": counts.get(index + 1, 0)
+                    }
+                    for index in range(price_buckets)
+                ]
+            return facets
+
+        search_key = fingerprint({
+            "category": category,
+            "min_price": min_price,
+            "max_price": max_price,
+            "status": status,
+            "creator_id": creator_id,
+            "price_buckets": price_buckets
+        })
+        return await self._get_cached_stats(
+            db,
+            self._get_cache_key(f"facets:{search_key}"),
+            compute,
+            expire=300,
+            tags=[self._get_tag("search")]
+        )
+
+    async def get_agent_stats(self, db: AsyncSession, *, agent_id: int) -> Dict[str, Any]:
         """Get agent statistics with caching."""
-        cache_key = self._get_cache_key(f"stats:{agent_id}")
-        
-        cached_stats = await redis_client.get(cache_key)
-        if cached_stats:
-            return cached_stats
+        async def compute(db: AsyncSession) -> Dict[str, Any]:
+            result = await db.execute(
+                select(
+                    func.count(Agent.id).label('total_sales'),
+                    func.avg(Agent.average_rating).label('avg_rating'),
+                    func.sum(Agent.total_uses).label('total_uses')
+                ).where(Agent.id == agent_id)
+            )
+            return result.one()._asdict()
         
-        stats = db.query(
-            func.count(Agent.id).label('total_sales'),
-            func.avg(Agent.average_rating).label('avg_rating'),
-            func.sum(Agent.total_uses).label('total_uses')
-        ).filter(Agent.id == agent_id).first()._asdict()
+        return await self._get_cached_stats(
+            db,
+            self._get_cache_key(f"stats:{agent_id}"),
+            compute,
+            tags=[self._get_tag(f"stats:{agent_id}")]
+        )
+
+    async def get_rating(self, db: AsyncSession, *, agent_id: int) -> Optional[Dict[str, Any]]:
+        """Rating aggregates of an agent, read from its (cached) row."""
+        agent = await self.get(db, agent_id)
+        if not agent:
+            return None
+        return {
+            "average_rating": agent.average_rating,
+            "total_ratings": agent.total_ratings,
+            "rating_histogram": agent.rating_histogram
+        }
+
+    async def apply_rating_delta(
+        self,
+        db: AsyncSession,
+        *,
+        agent_id: int,
+        rating: Optional[Decimal],
+        count: int
+    ) -> None:
+        """
+        Add (count=1) or remove (count=-1) one review rating from an agent's
+        running count, sum, mean and histogram, in the caller's transaction.
+        The caller commits and then calls invalidate_rating_caches.
+        """
+        if agent_id is None or rating is None:
+            return
+        rating = Decimal(str(rating))
+        # PostgreSQL arrays are 1-based; round() in SQL also rounds halves up
+        bucket = int(rating.quantize(Decimal(1), rounding=ROUND_HALF_UP)) + 1
+        new_count = Agent.total_ratings + count
+        new_sum = Agent.rating_sum + rating * count
+        await db.execute(
+            update(Agent)
+            .where(Agent.id == agent_id)
+            .values({
+                Agent.total_ratings: new_count,
+                Agent.rating_sum: new_sum,
+                Agent.average_rating: case((new_count > 0, new_sum / new_count), else_=0),
+                Agent.rating_histogram[bucket]: Agent.rating_histogram[bucket] + count
+            })
+            .execution_options(synchronize_session=False)
+        )
+        mark_agents_changed(db, [agent_id])
+
+    async def record_usage(self, db: AsyncSession, *, agent_id: int, count: int = 1) -> None:
+        """Count uses of an agent; the most-used leaderboards pick up the new total after the commit."""
+        await db.execute(
+            update(Agent)
+            .where(Agent.id == agent_id)
+            .values(total_uses=func.coalesce(Agent.total_uses, 0) + count)
+            .execution_options(synchronize_session=False)
+        )
+        mark_agents_changed(db, [agent_id])
+        await db.commit()
+        await redis_client.invalidate_tags(
+            self._get_tag(f"id:{agent_id}"),
+            self._get_tag(f"stats:{agent_id}")
+        )
+
+    async def invalidate_rating_caches(self, *agent_ids: int) -> None:
+        """Drop the cached rows and stats of agents whose ratings changed."""
+        tags = []
+        for agent_id in set(agent_ids):
+            if agent_id is not None:
+                tags += [self._get_tag(f"id:{agent_id}"), self._get_tag(f"stats:{agent_id}")]
+        await redis_client.invalidate_tags(*tags)
+
+    async def rebuild_rating_aggregates(
+        self,
+        db: AsyncSession,
+        *,
+        agent_ids: Optional[List[int]] = None
+    ) -> List[int]:
+        """
+        Recompute rating aggregates from the reviews table in one set-based
+        UPDATE, touching only agents whose stored values drifted. Used for the
+        initial backfill and as a repair job. Returns the ids it fixed.
+        """
+        histogram = ", ".join(
+            f"count(*) FILTER (WHERE round(rating) = {star})" for star in range(RATING_BUCKETS)
+        )
+        empty = "{" + ",".join("0" * RATING_BUCKETS) + "}"
+        scope = "AND a.id = ANY(:agent_ids)" if agent_ids else ""
+        result = await db.execute(
+            text(f"""
+                WITH agg AS (
+                    SELECT agent_id,
+                           count(rating) AS total,
+                           coalesce(sum(rating), 0) AS rating_sum,
+                           ARRAY[{histogram}] AS histogram
+                    FROM reviews
+                    WHERE rating IS NOT NULL
+                    GROUP BY agent_id
+                ), fixed AS (
+                    SELECT a.id,
+                           coalesce(agg.total, 0) AS total,
+                           coalesce(agg.rating_sum, 0) AS rating_sum,
+                           coalesce(agg.histogram, '{empty}') AS histogram
+                    FROM agents a
+                    LEFT JOIN agg ON agg.agent_id = a.id
+                    WHERE TRUE {scope}
+                )
+                UPDATE agents
+                SET total_ratings = fixed.total,
+                    rating_sum = fixed.rating_sum,
+                    average_rating = CASE WHEN fixed.total > 0
+                                          THEN fixed.rating_sum / fixed.total ELSE 0 END,
+                    rating_histogram = fixed.histogram
+                FROM fixed
+                WHERE agents.id = fixed.id
+                  AND (agents.total_ratings IS DISTINCT FROM fixed.total
+                       OR agents.rating_sum IS DISTINCT FROM fixed.rating_sum
+                       OR agents.rating_histogram IS DISTINCT FROM fixed.histogram)
+                RETURNING agents.id
+            """),
+            {"agent_ids": agent_ids} if agent_ids else {}
+        )
+        fixed_ids = list(result.scalars())
+        mark_agents_changed(db, fixed_ids)
+        await db.commit()
         
-        await redis_client.set(cache_key, stats, expire=1800)
-        return stats
+        for start in range(0, len(fixed_ids), 1000):
+            await self.invalidate_rating_caches(*fixed_ids[start:start + 1000])
+        return fixed_ids
 
     async def transfer_ownership(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         *, 
         agent_id: int, 
         new_owner_id: int
     ) -> Optional[Agent]:
         """Transfer agent ownership."""
-        db_obj = await self.get(db, id=agent_id)
+        db_obj = await self.get_db_obj(db, id=agent_id)
         if not db_obj:
             return None
 
+        previous_owner_id = db_obj.owner_id
         db_obj.owner_id = new_owner_id
         db_obj.is_listed = False
         db_obj.status = AgentStatus.SOLD
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
-        # Update caches
-        await self._update_agent_caches(db_obj)
+        # Update caches, including the listings of the previous owner
+        await self._update_agent_caches(
+            db_obj,
+            self._get_tag(f"owner:{previous_owner_id}")
+        )
         
         return db_obj
 
-    async def _update_agent_caches(self, agent: Agent) -> None:
+    async def _before_bulk_commit(
+        self,
+        db: AsyncSession,
+        *,
+        old: Optional[List[Dict[str, Any]]] = None,
+        new: Optional[List[Agent]] = None,
+        fields: Optional[Set[str]] = None
+    ) -> None:
+        """Bulk writes bypass the unit of work; record their agents for the index."""
+        await super()._before_bulk_commit(db, old=old, new=new, fields=fields)
+        if new:
+            mark_agents_changed(db, [obj.id for obj in new])
+
+    async def _cache_lookups(self, *objs: Agent) -> None:
+        """Also queue written agents for embedding; unchanged text is not encoded again."""
+        await super()._cache_lookups(*objs)
+        agent_embeddings.enqueue(obj.id for obj in objs)
+
+    def _invalidation_tags(self, obj: Agent) -> List[str]:
+        """Tags of the cached lists and aggregates a write to an agent affects."""
+        return super()._invalidation_tags(obj) + [
+            self._get_tag("search"),
+            self._get_tag(f"owner:{obj.owner_id}"),
+            self._get_tag(f"category:{AgentCategory(obj.category).value}"),
+            self._get_tag(f"stats:{obj.id}")
+        ]
+
+    async def _update_agent_caches(self, agent: Agent, *extra_tags: str) -> None:
         """Update all caches related to an agent."""
-        data = jsonable_encoder(agent)
-        
-        # Update main cache
-        await redis_client.set(
-            self._get_cache_key(f"id:{agent.id}"),
-            data,
-            expire=3600
-        )
-        
-        # Update token cache if exists
-        if agent.token_id:
-            await redis_client.set(
-                self._get_cache_key(f"token:{agent.token_id}"),
-                data,
-                expire=3600
-            )
+        # Invalidate the owner, category, search and stats entries of this agent
+        await redis_client.invalidate_tags(*self._invalidation_tags(agent), *extra_tags)
         
-        # Clear related caches
-        await redis_client.clear_cache(f"{self.cache_prefix}search:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}owner:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}category:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}stats:*")
+        # Update id and token caches
+        await self._cache_lookups(agent)
 
 # Create singleton instance
 agent = CRUDAgent(Agent)
\ No newline at end of file
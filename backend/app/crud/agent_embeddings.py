@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import math
+from typing import Any, Dict, Iterable, List, Set, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.ann import IVFIndex
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.db.session import AsyncSessionLocal
+from app.models.agent import Agent
+from app.models.agent_embedding import AgentEmbedding
+
+def embedding_text(agent: Any) -> str:
+    """The text an agent is embedded from: name, description and capabilities"""
+    capabilities = ", ".join(tag for tag in agent.capabilities or [] if isinstance(tag, str))
+    return "\n".join(part for part in (agent.name, agent.description, capabilities) if part)
+
+def content_hash(text: str) -> str:
+    """Identity of an embedding: the text and the model that encoded it"""
+    return hashlib.sha256(f"{settings.EMBEDDING_MODEL}\n{text}".encode()).hexdigest()
+
+def to_bytes(vectors: np.ndarray) -> List[bytes]:
+    return [row.tobytes() for row in vectors.astype("<f2")]
+
+def from_bytes(data: Iterable[bytes]) -> np.ndarray:
+    return np.frombuffer(b"".join(data), dtype="<f2").reshape(-1, settings.EMBEDDING_DIMENSION)
+
+class AgentEmbeddings:
+    """
+    Embeddings of agents for similarity search. Written agents are queued
+    and encoded in batches in the background; the vectors are stored in
+    agent_embeddings and held by every worker in an IVF index, loaded at
+    startup and retrained every EMBEDDING_RELOAD_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self.index = IVFIndex(settings.EMBEDDING_DIMENSION)
+        self._encoder = None
+        self._queue: Set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        # Fetches of vectors other workers stored, kept referenced until they finish
+        self._pending: Set[asyncio.Task] = set()
+        redis_client.add_listener(settings.EMBEDDING_CHANNEL, self._on_remote_changes)
+
+    @property
+    def ready(self) -> bool:
+        return settings.EMBEDDING_ENABLED and self.index.ready
+
+    def encoder(self):
+        """The text encoder, imported and loaded on first use"""
+        if self._encoder is None:
+            from app.services.ai.models.encoder import TextEncoder
+            self._encoder = TextEncoder(settings.EMBEDDING_MODEL)
+        return self._encoder
+
+    def lists(self, rows: int) -> int:
+        """IVF lists for rows vectors: EMBEDDING_IVF_LISTS, or about sqrt(rows)"""
+        return settings.EMBEDDING_IVF_LISTS or max(1, int(math.sqrt(rows)))
+
+    async def load(self, db: AsyncSession) -> None:
+        """Replace the index with every stored vector of the current model"""
+        ids, data = [], []
+        rows = await db.stream(
+            select(AgentEmbedding.agent_id, AgentEmbedding.vector)
+            .where(AgentEmbedding.model == settings.EMBEDDING_MODEL)
+            .execution_options(yield_per=10000)
+        )
+        async for agent_id, vector in rows:
+            ids.append(agent_id)
+            data.append(vector)
+        vectors = from_bytes(data)
+        # Training is CPU-bound; run it off the event loop, then swap in one step
+        index = IVFIndex(settings.EMBEDDING_DIMENSION)
+        await asyncio.to_thread(index.load, ids, vectors, self.lists(len(ids)))
+        self.index = index
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        *,
+        exact: bool = False,
+        exclude: Iterable[int] = ()
+    ) -> Tuple[List[int], List[float]]:
+        """Ids and similarities of the k agents nearest a unit vector, approximate unless exact"""
+        if exact:
+            return self.index.exact_search(query, k, exclude=exclude)
+        return self.index.search(query, k, nprobe=settings.EMBEDDING_IVF_PROBES, exclude=exclude)
+
+    def enqueue(self, agent_ids: Iterable[int]) -> None:
+        """Queue written agents for embedding; a no-op unless the embedder runs in this process"""
+        if not self._tasks:
+            return
+        self._queue.update(agent_ids)
+        self._wakeup.set()
+
+    async def embed(self, db: AsyncSession, agent_ids: List[int]) -> List[int]:
+        """
+        Encode the agents whose text changed since their stored embedding,
+        store the vectors, and apply them here and in every other worker.
+        Returns the ids that were encoded.
+        """
+        rows = (await db.execute(
+            select(Agent.id, Agent.name, Agent.description, Agent.capabilities, AgentEmbedding.content_hash)
+            .outerjoin(AgentEmbedding, AgentEmbedding.agent_id == Agent.id)
+            .where(Agent.id.in_(agent_ids))
+        )).all()
+        stale = []
+        for row in rows:
+            text = embedding_text(row)
+            if text and content_hash(text) != row.content_hash:
+                stale.append((row.id, text))
+        if not stale:
+            return []
+
+        vectors = await self.encoder().encode_async([text for _, text in stale])
+        stmt = insert(AgentEmbedding).values([
+            {
+                "agent_id": agent_id,
+                "model": settings.EMBEDDING_MODEL,
+                "content_hash": content_hash(text),
+                "vector": vector
+            }
+            for (agent_id, text), vector in zip(stale, to_bytes(vectors))
+        ])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[AgentEmbedding.agent_id],
+            set_={
+                "model": stmt.excluded.model,
+                "content_hash": stmt.excluded.content_hash,
+                "vector": stmt.excluded.vector,
+                "updated_at": func.now()
+            }
+        ))
+        await db.commit()
+
+        ids = [agent_id for agent_id, _ in stale]
+        if self.index.ready:
+            self.index.upsert(ids, vectors)
+        await redis_client.publish_event(settings.EMBEDDING_CHANNEL, {"ids": ids})
+        return ids
+
+    async def _embed_queued(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # Let a burst of writes collect into one batch
+            await asyncio.sleep(settings.EMBEDDING_BATCH_DELAY)
+            self._wakeup.clear()
+            while self._queue:
+                batch = [self._queue.pop() for _ in range(min(len(self._queue), settings.EMBEDDING_BATCH_SIZE))]
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await self.embed(db, batch)
+                except Exception as e:
+                    # The embed_agents script picks up agents left behind
+                    print(f"Agent embedding error: {e}")
+
+    async def _fetch(self, agent_ids: List[int]) -> None:
+        """Load vectors another worker stored into this worker's index"""
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(
+                    select(AgentEmbedding.agent_id, AgentEmbedding.vector)
+                    .where(AgentEmbedding.agent_id.in_(agent_ids))
+                )).all()
+        except Exception as e:
+            print(f"Agent embedding fetch error: {e}")
+            return
+        if rows:
+            self.index.upsert([row.agent_id for row in rows], from_bytes(row.vector for row in rows))
+
+    def _on_remote_changes(self, payload: Dict[str, Any]) -> None:
+        if self.index.ready:
+            task = asyncio.get_running_loop().create_task(self._fetch(payload["ids"]))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _reload_forever(self) -> None:
+        while True:
+            await asyncio.sleep(settings.EMBEDDING_RELOAD_INTERVAL)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.load(db)
+            except Exception as e:
+                print(f"Agent embedding reload error: {e}")
+
+    def start(self) -> None:
+        """Start the background embedder and the periodic reload"""
+        if settings.EMBEDDING_ENABLED and not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._embed_queued()),
+                asyncio.create_task(self._reload_forever())
+            ]
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+agent_embeddings = AgentEmbeddings()
@@ -0,0 +1,165 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.facets import FacetIndex
+from app.core.redis import redis_client
+from app.db.session import AsyncSessionLocal
+from app.models.agent import Agent, AgentCategory, AgentStatus
+
+# Session.info key: ids of agents written in the current transaction
+AGENT_CHANGES_KEY = "synthr_agent_index_changes"
+
+# Columns search_agents filters and sorts on
+INDEX_COLUMNS = (
+    Agent.id,
+    Agent.price,
+    Agent.average_rating,
+    Agent.created_at,
+    Agent.creator_id,
+    Agent.category,
+    Agent.status
+)
+
+# order_by values the index can sort by
+INDEX_ORDER_COLUMNS = ("id", "price", "average_rating", "created_at")
+
+# Coroutines run after each commit with the ids of the agents it wrote
+_commit_hooks: List[Callable[[List[int]], Awaitable[None]]] = []
+
+# Hooks in flight, kept referenced until they finish
+_pending: Set[asyncio.Task] = set()
+
+def on_agents_committed(hook: Callable[[List[int]], Awaitable[None]]) -> None:
+    """Run hook in the background after every commit that wrote agents"""
+    _commit_hooks.append(hook)
+
+def index_row(row: Any) -> Dict[str, Any]:
+    """Indexed values of an agent row, JSON-safe so they can be published"""
+    return {
+        "id": row.id,
+        "price": float(row.price) if row.price is not None else None,
+        "average_rating": float(row.average_rating) if row.average_rating is not None else None,
+        "created_at": row.created_at.timestamp() if row.created_at is not None else None,
+        "creator_id": row.creator_id,
+        "category": AgentCategory(row.category).value,
+        "status": AgentStatus(row.status).value if row.status is not None else None
+    }
+
+class AgentIndex:
+    """
+    The agents table's search columns held in a FacetIndex by every worker.
+    Loaded at startup; after each commit that wrote agents, the worker
+    reloads those rows, applies them and publishes them to the others.
+    """
+
+    def __init__(self):
+        self.index = FacetIndex(
+            numeric=("price", "average_rating", "created_at", "creator_id"),
+            categorical=("category", "status")
+        )
+        self._reloader: Optional[asyncio.Task] = None
+        redis_client.add_listener(settings.AGENT_INDEX_CHANNEL, self._on_remote_changes)
+
+    @property
+    def ready(self) -> bool:
+        return settings.AGENT_INDEX_ENABLED and self.index.ready
+
+    async def load(self, db: AsyncSession) -> None:
+        """Replace the index with every agent row"""
+        rows = await db.stream(
+            select(*INDEX_COLUMNS).execution_options(yield_per=10000)
+        )
+        loaded = [index_row(row) async for row in rows]
+        # Swap in one step so no search sees a half-built index
+        self.index.load(loaded, capacity=max(1024, 2 * len(loaded)))
+
+    def apply(self, upserts: Iterable[Dict[str, Any]], removed: Iterable[int]) -> None:
+        self.index.upsert(upserts)
+        self.index.remove(removed)
+
+    async def refresh(self, ids: List[int]) -> None:
+        """Reload committed agents into this worker's index and publish them to the others"""
+        if not self.index.ready:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(select(*INDEX_COLUMNS).where(Agent.id.in_(ids)))).all()
+        except Exception as e:
+            print(f"Agent index refresh error: {e}")
+            return
+        upserts = [index_row(row) for row in rows]
+        removed = list(set(ids) - {row["id"] for row in upserts})
+        self.apply(upserts, removed)
+        await redis_client.publish_event(
+            settings.AGENT_INDEX_CHANNEL,
+            {"upserts": upserts, "removed": removed}
+        )
+
+    def _on_remote_changes(self, payload: Dict[str, Any]) -> None:
+        """Apply agents another worker committed"""
+        if self.index.ready:
+            self.apply(payload["upserts"], payload["removed"])
+
+    async def _reload_forever(self) -> None:
+        while True:
+            await asyncio.sleep(settings.AGENT_INDEX_RELOAD_INTERVAL)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.load(db)
+            except Exception as e:
+                print(f"Agent index reload error: {e}")
+
+    def start_reloads(self) -> None:
+        """Start the periodic full reload"""
+        if settings.AGENT_INDEX_ENABLED and self._reloader is None:
+            self._reloader = asyncio.create_task(self._reload_forever())
+
+    async def close(self) -> None:
+        if self._reloader is not None:
+            self._reloader.cancel()
+            try:
+                await self._reloader
+            except asyncio.CancelledError:
+                pass
+            self._reloader = None
+
+agent_index = AgentIndex()
+on_agents_committed(agent_index.refresh)
+
+def mark_agents_changed(db: AsyncSession, ids: Iterable[int]) -> None:
+    """Record agents written outside the unit of work, e.g. by a Core UPDATE"""
+    db.info.setdefault(AGENT_CHANGES_KEY, set()).update(id for id in ids if id is not None)
+
+@event.listens_for(Session, "after_flush")
+def _collect_agent_changes(session: Session, flush_context: Any) -> None:
+    """Record agents the flush inserted, updated or deleted"""
+    ids = [
+        obj.id for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, Agent)
+    ]
+    if ids:
+        session.info.setdefault(AGENT_CHANGES_KEY, set()).update(ids)
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_hooks(session: Session) -> None:
+    """Bring the committed agents into the index and leaderboards without holding up the request"""
+    ids = session.info.pop(AGENT_CHANGES_KEY, None)
+    if not ids:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sync scripts: the index and leaderboards catch up at their next reload
+        return
+    for hook in _commit_hooks:
+        task = loop.create_task(hook(list(ids)))
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_agent_changes(session: Session) -> None:
+    """Rolled-back writes never reached the table"""
+    session.info.pop(AGENT_CHANGES_KEY, None)
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.crud.agent_index import on_agents_committed
+from app.db.session import AsyncSessionLocal
+from app.models.agent import Agent, AgentCategory
+from app.models.transaction import Transaction, TransactionStatus, TransactionType
+
+BOARDS = ("trending", "top_rated", "most_used")
+
+# Every board is kept overall and per category
+ALL = "all"
+SCOPES = (ALL, *(category.value for category in AgentCategory))
+
+# Claimed by the worker that runs the periodic rebuild
+RECONCILE_CLAIM = "synthr:leaderboard:reconcile"
+
+# Columns the top-rated and most-used scores are computed from
+LEADERBOARD_COLUMNS = (
+    Agent.id,
+    Agent.category,
+    Agent.average_rating,
+    Agent.total_ratings,
+    Agent.total_uses
+)
+
+def board_name(board: str, category: Optional[AgentCategory] = None) -> str:
+    return f"{board}:{AgentCategory(category).value if category else ALL}"
+
+def rated_score(row: Any) -> Optional[float]:
+    """
+    Bayesian average rating: the mean pulled toward LEADERBOARD_PRIOR_RATING
+    by LEADERBOARD_PRIOR_VOTES reviews, so one 5-star review does not top
+    the board. None for unrated agents, which are left off it.
+    """
+    count = row.total_ratings or 0
+    if count <= 0:
+        return None
+    prior = settings.LEADERBOARD_PRIOR_VOTES
+    mean = float(row.average_rating or 0)
+    return (mean * count + settings.LEADERBOARD_PRIOR_RATING * prior) / (count + prior)
+
+def used_score(row: Any) -> Optional[float]:
+    return float(row.total_uses) if row.total_uses else None
+
+def decay(seconds: float) -> float:
+    """Weight of a purchase made seconds after the trending epoch"""
+    return 2.0 ** (seconds / settings.LEADERBOARD_TRENDING_HALF_LIFE)
+
+class AgentLeaderboards:
+    """
+    Top-k agent boards in Redis sorted sets, so a read is one ZREVRANGE.
+    Top rated and most used are re-scored from the rows each commit wrote;
+    trending adds every completed purchase weighted by decay(), which grows
+    with time instead of shrinking old scores, so entries never need
+    rewriting and reads scale scores back to present-day volume. The epoch
+    is reset, and every board rebuilt from the database, by reconcile.
+    """
+
+    def __init__(self):
+        self._reconciler: Optional[asyncio.Task] = None
+
+    def _scores(self, row: Any) -> List[Tuple[str, str, Optional[float]]]:
+        """Board entries of an agent row; None removes it, e.g. from its previous category"""
+        member = str(row.id)
+        category = AgentCategory(row.category).value
+        entries = []
+        for board, score in (("top_rated", rated_score(row)), ("most_used", used_score(row))):
+            for scope in SCOPES:
+                entries.append((f"{board}:{scope}", member, score if scope in (ALL, category) else None))
+        # A recategorized agent's purchase volume reaches its new category at the next rebuild
+        for scope in SCOPES[1:]:
+            if scope != category:
+                entries.append((f"trending:{scope}", member, None))
+        return entries
+
+    async def refresh(self, ids: List[int]) -> None:
+        """Re-score committed agents, dropping deleted ones from every board"""
+        if not settings.LEADERBOARD_ENABLED:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                rows = (await db.execute(select(*LEADERBOARD_COLUMNS).where(Agent.id.in_(ids)))).all()
+        except Exception as e:
+            print(f"Agent leaderboard refresh error: {e}")
+            return
+        entries = []
+        for row in rows:
+            entries += self._scores(row)
+        for id in set(ids) - {row.id for row in rows}:
+            entries += [(f"{board}:{scope}", str(id), None) for board in BOARDS for scope in SCOPES]
+        await redis_client.leaderboard_update(entries)
+
+    async def record_purchase(
+        self,
+        *,
+        agent_id: int,
+        category: AgentCategory,
+        amount: Decimal,
+        at: datetime,
+        count: int = 1
+    ) -> None:
+        """Add (count=1) or withdraw (count=-1) a completed purchase made at `at` to the trending boards"""
+        if not settings.LEADERBOARD_ENABLED:
+            return
+        meta = await redis_client.leaderboard_meta()
+        if meta is None:
+            # Not built yet; the first rebuild counts the purchase
+            return
+        delta = count * float(amount) * decay(at.timestamp() - float(meta["trending_epoch"]))
+        member = str(agent_id)
+        await redis_client.leaderboard_update(increments=[
+            (board_name("trending"), member, delta),
+            (board_name("trending", category), member, delta)
+        ])
+
+    async def top(
+        self,
+        board: str,
+        category: Optional[AgentCategory] = None,
+        limit: int = 10
+    ) -> Optional[List[Tuple[int, float]]]:
+        """Best (agent id, score) of a board, or None while the boards have never been built"""
+        entries, meta = await redis_client.leaderboard_top(board_name(board, category), limit)
+        if meta is None:
+            return None
+        # Trending scores are stored in epoch terms; scale them to volume as of now
+        scale = decay(float(meta["trending_epoch"]) - time.time()) if board == "trending" else 1.0
+        return [(int(member), score * scale) for member, score in entries]
+
+    async def rebuild(self, db: AsyncSession) -> Dict[str, int]:
+        """
+        Recompute every board from the agents table and the purchases of the
+        last LEADERBOARD_TRENDING_WINDOW seconds, with a new trending epoch,
+        and swap them in. Returns the size of each board.
+        """
+        epoch = time.time()
+        boards: Dict[str, Dict[str, float]] = {
+            f"{board}:{scope}": {} for board in BOARDS for scope in SCOPES
+        }
+        rows = await db.stream(select(*LEADERBOARD_COLUMNS).execution_options(yield_per=10000))
+        async for row in rows:
+            for board, member, score in self._scores(row):
+                if score is not None:
+                    boards[board][member] = score
+
+        weight = func.power(
+            2.0,
+            (func.extract("epoch", Transaction.created_at) - epoch) / settings.LEADERBOARD_TRENDING_HALF_LIFE
+        )
+        since = datetime.fromtimestamp(epoch - settings.LEADERBOARD_TRENDING_WINDOW, timezone.utc)
+        volumes = await db.execute(
+            select(Transaction.agent_id, Agent.category, func.sum(cast(Transaction.amount, Float) * weight))
+            .join(Agent, Agent.id == Transaction.agent_id)
+            .where(
+                Transaction.type == TransactionType.PURCHASE,
+                Transaction.status == TransactionStatus.COMPLETED,
+                Transaction.created_at >= since
+            )
+            .group_by(Transaction.agent_id, Agent.category)
+        )
+        for agent_id, category, volume in volumes:
+            boards[board_name("trending")][str(agent_id)] = float(volume)
+            boards[board_name("trending", category)][str(agent_id)] = float(volume)
+
+        await redis_client.leaderboard_replace(boards, {"trending_epoch": epoch, "rebuilt_at": time.time()})
+        return {board: len(scores) for board, scores in boards.items()}
+
+    async def _reconcile_forever(self) -> None:
+        while True:
+            try:
+                # The first worker to claim the interval rebuilds; the others skip it
+                if await redis_client.claim(RECONCILE_CLAIM, settings.LEADERBOARD_RECONCILE_INTERVAL):
+                    async with AsyncSessionLocal() as db:
+                        await self.rebuild(db)
+            except Exception as e:
+                print(f"Agent leaderboard rebuild error: {e}")
+            await asyncio.sleep(settings.LEADERBOARD_RECONCILE_INTERVAL)
+
+    def start(self) -> None:
+        """Start the periodic rebuild, which also builds the boards on first deploy"""
+        if settings.LEADERBOARD_ENABLED and self._reconciler is None:
+            self._reconciler = asyncio.create_task(self._reconcile_forever())
+
+    async def close(self) -> None:
+        if self._reconciler is not None:
+            self._reconciler.cancel()
+            try:
+                await self._reconciler
+            except asyncio.CancelledError:
+                pass
+            self._reconciler = None
+
+agent_leaderboards = AgentLeaderboards()
+on_agents_committed(agent_leaderboards.refresh)
@@ -1,17 +1,55 @@
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
-from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, desc, func, literal, select
 
 from app.crud.base import CRUDBase
+from app.db.replicas import replica_read
+from app.db.rollups import Rollup
+from app.models.agent import Agent
 from app.models.ai_model import AIModel, ModelType, ModelStatus
+from app.models.rollup import ModelRollup
 from app.schemas.training import ModelCreate, ModelUpdate
 from app.core.redis import redis_client
 
+def _model_facts():
+    """One fact row per AI model, with its accuracy read once from performance_metrics"""
+    accuracy = AIModel.performance_metrics['accuracy'].as_float()
+    return (
+        select(
+            AIModel.id.label("id"),
+            AIModel.created_at.label("event_time"),
+            AIModel.model_type.label("model_type"),
+            Agent.category.label("category"),
+            Agent.owner_id.label("owner_id"),
+            literal(1).label("models"),
+            accuracy.label("accuracy_sum"),
+            case((accuracy.isnot(None), 1), else_=0).label("scored_models"),
+            *[
+                case((AIModel.status == status, 1), else_=0).label(status.name.lower())
+                for status in ModelStatus
+            ]
+        )
+        .outerjoin(Agent, Agent.id == AIModel.agent_id)
+    )
+
+model_rollup = Rollup(
+    ModelRollup,
+    _model_facts,
+    dimensions=(("model_type", "model_type"), ("category", "category"), ("user", "owner_id")),
+    measures=(
+        "models", "accuracy_sum", "scored_models",
+        *[status.name.lower() for status in ModelStatus]
+    ),
+    columns=("status", "performance_metrics", "model_type", "agent_id", "created_at")
+)
+
 class CRUDAIModel(CRUDBase[AIModel, ModelCreate, ModelUpdate]):
+    lookup_fields = {"agent": "agent_id"}
+    rollups = (model_rollup,)
+
     async def create_model(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         agent_id: int,
         model_type: ModelType,
@@ -28,8 +66,9 @@ class CRUDAIModel(CRUDBase[AIModel, ModelCreate, ModelUpdate]):
         )
         
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await self._before_commit(db, new=db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Cache the new model
         await self._update_model_caches(db_obj)
@@ -38,24 +77,26 @@ class CRUDAIModel(CRUDBase[AIModel, ModelCreate, ModelUpdate]):
 
     async def update_status(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         model_id: int,
         status: ModelStatus,
         performance_metrics: Optional[Dict[str, Any]] = None
     ) -> Optional[AIModel]:
         """Update model status and metrics."""
-        db_obj = await self.get(db, id=model_id)
+        db_obj = await self.get_db_obj(db, id=model_id)
         if not db_obj:
             return None
 
+        old = self._to_cache(db_obj)
         db_obj.status = status
         if performance_metrics:
             db_obj.performance_metrics = performance_metrics
             
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await self._before_commit(db, old=old, new=db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Update caches
         await self._update_model_caches(db_obj)
@@ -64,31 +105,22 @@ class CRUDAIModel(CRUDBase[AIModel, ModelCreate, ModelUpdate]):
 
     async def get_agent_model(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         agent_id: int
     ) -> Optional[AIModel]:
         """Get AI model for an agent with caching."""
-        cache_key = self._get_cache_key(f"agent:{agent_id}")
-        
-        cached_data = await redis_client.get(cache_key)
-        if cached_data:
-            return AIModel(**cached_data)
-        
-        model = db.query(AIModel).filter(AIModel.agent_id == agent_id).first()
-        
-        if model:
-            await redis_client.set(
-                cache_key,
-                jsonable_encoder(model),
-                expire=3600
-            )
-        
-        return model
+        return await self._cached_lookup(
+            db,
+            "agent",
+            agent_id,
+            lambda: db.scalar(select(AIModel).where(AIModel.agent_id == agent_id))
+        )
 
+    @replica_read
     async def get_models_by_type(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         model_type: ModelType,
         skip: int = 0,
@@ -99,99 +131,84 @@ class CRUDAIModel(CRUDBase[AIModel, ModelCreate, ModelUpdate]):
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            return [AIModel(**item) for item in cached_data]
+            return [self._from_cache(item) for item in cached_data]
         
-        models = (
-            db.query(AIModel)
-            .filter(AIModel.model_type == model_type)
+        models = (await db.scalars(
+            select(AIModel)
+            .where(AIModel.model_type == model_type)
             .order_by(desc(AIModel.created_at))
             .offset(skip)
             .limit(limit)
-            .all()
-        )
+        )).all()
         
         if models:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(models),
-                expire=1800
+                self._to_cache_many(models),
+                expire=1800,
+                tags=[self._get_tag(f"type:{ModelType(model_type).value}")]
             )
         
         return models
 
     async def get_model_stats(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         model_type: Optional[ModelType] = None
     ) -> Dict[str, Any]:
-        """Get model statistics with caching."""
-        cache_key = self._get_cache_key(f"stats:{model_type or 'all'}")
-        
-        cached_stats = await redis_client.get(cache_key)
-        if cached_stats:
-            return cached_stats
-        
-        query = db.query(
-            func.count(AIModel.id).label('total_models'),
-            func.avg(AIModel.performance_metrics['accuracy'].cast(float)).label('avg_accuracy')
-        )
-        
-        if model_type:
-            query = query.filter(AIModel.model_type == model_type)
-        
-        stats = query.first()._asdict()
-        
-        # Add status distribution
-        status_dist = (
-            db.query(
-                AIModel.status,
-                func.count(AIModel.id).label('count')
-            )
-            .filter(AIModel.model_type == model_type if model_type else True)
-            .group_by(AIModel.status)
-            .all()
+        """Get model statistics from the rollups, with caching."""
+        async def compute(db: AsyncSession) -> Dict[str, Any]:
+            if model_type:
+                totals = await model_rollup.totals(db, dimension="model_type", value=ModelType(model_type))
+            else:
+                totals = await model_rollup.totals(db)
+            
+            return {
+                'total_models': totals['models'],
+                'avg_accuracy': (
+                    totals['accuracy_sum'] / totals['scored_models'] if totals['scored_models'] else None
+                ),
+                'status_distribution': {
+                    status.value: totals[status.name.lower()]
+                    for status in ModelStatus
+                    if totals[status.name.lower()]
+                }
+            }
+        
+        stats_tag = f"type:{ModelType(model_type).value}" if model_type else "stats"
+        return await self._get_cached_stats(
+            db,
+            self._get_cache_key(f"stats:{model_type or 'all'}"),
+            compute,
+            tags=[self._get_tag(stats_tag), model_rollup.tag]
         )
-        
-        stats['status_distribution'] = {
-            status.value: count for status, count in status_dist
-        }
-        
-        await redis_client.set(cache_key, stats, expire=1800)
-        return stats
+
+    def _invalidation_tags(self, obj: AIModel) -> List[str]:
+        """Tags of the cached lists and aggregates a write to an AI model affects."""
+        return super()._invalidation_tags(obj) + [
+            self._get_tag("stats"),
+            self._get_tag(f"type:{ModelType(obj.model_type).value}")
+        ]
 
     async def _update_model_caches(self, model: AIModel) -> None:
         """Update all caches related to an AI model."""
-        data = jsonable_encoder(model)
-        
-        # Update main cache
-        await redis_client.set(
-            self._get_cache_key(f"id:{model.id}"),
-            data,
-            expire=3600
-        )
-        
-        # Update agent cache
-        await redis_client.set(
-            self._get_cache_key(f"agent:{model.agent_id}"),
-            data,
-            expire=3600
-        )
+        # Update id and agent caches
+        await self._cache_lookups(model)
         
-        # Clear related caches
-        await redis_client.clear_cache(f"{self.cache_prefix}type:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}stats:*")
+        # Invalidate the type and stats entries of this model
+        await redis_client.invalidate_tags(*self._invalidation_tags(model))
 
     async def update_weights(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         model_id: int,
         weights_hash: str,
         checkpoint_hash: Optional[str] = None
     ) -> Optional[AIModel]:
         """Update model weights IPFS hashes."""
-        db_obj = await self.get(db, id=model_id)
+        db_obj = await self.get_db_obj(db, id=model_id)
         if not db_obj:
             return None
 
@@ -200,8 +217,8 @@ class CRUDAIModel(CRUDBase[AIModel, ModelCreate, ModelUpdate]):
             db_obj.checkpoint_hash = checkpoint_hash
             
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Update caches
         await self._update_model_caches(db_obj)
@@ -1,47 +1,294 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union, Tuple
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Iterable, List, Optional, Set, Type, TypeVar, Union, Tuple
+import json
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, insert, select, func, or_, text, tuple_, update
+from sqlalchemy import column as sql_column, inspect as sa_inspect, values as sql_values
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from app.db.base_class import Base
-from app.core.redis import redis_client
+from app.core.bloom import BloomFilter
+from app.core.config import settings
+from app.core.cursor import decode_cursor, encode_cursor
+from app.core.redis import CacheEntry, redis_client
+from app.db.session import AsyncSessionLocal
+from app.db.counters import counter_field, counter_name, record_counter_deltas, register_counted_columns
+from app.db.identity_map import MISSING, get_session_identity_map
+from app.db.replicas import replica_read
+from app.db.rollups import Rollup
+from app.crud.records import CachedRecord
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Cached in place of a row that does not exist
+NEGATIVE_CACHE = "__synthr_none__"
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, whose values stay bound parameters"""
+    inherit_cache = False
+
+    def __init__(self, statement: Any):
+        self.statement = statement
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Unique columns looked up through the cache, by key name, e.g. {"wallet": "wallet_address"}
+    lookup_fields: Dict[str, str] = {}
+    # Lookups whose known values are tracked in an in-process Bloom filter
+    bloom_lookups: Tuple[str, ...] = ()
+    # Columns with live per-value row counters, for get_count(..., estimate=True)
+    counted_fields: Tuple[str, ...] = ()
+    # Fact tables fed by this model's rows, kept in step on every write
+    rollups: Tuple[Rollup, ...] = ()
+
     def __init__(self, model: Type[ModelType]):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
         """
         self.model = model
         self.cache_prefix = f"synthr:{model.__name__.lower()}:"
+        self.tag_prefix = f"{model.__name__.lower()}:"
+        # Deferred columns, like search documents, are neither loaded nor cached
+        self.cache_columns = [
+            attr.key for attr in sa_inspect(model).column_attrs if not attr.deferred
+        ]
+        self.bloom_filters = {
+            name: BloomFilter(settings.CACHE_BLOOM_CAPACITY, settings.CACHE_BLOOM_ERROR_RATE)
+            for name in self.bloom_lookups
+        }
+        self._filter_reload: Optional[asyncio.Task] = None
+        if self.bloom_filters:
+            redis_client.add_listener(self._bloom_channel(), self._on_remote_lookup_values)
+            # Values published while unsubscribed were missed; reload once subscribed
+            redis_client.add_subscribe_handler(self._reload_lookup_filters)
+        if self.counted_fields:
+            register_counted_columns(model.__tablename__, self.counted_fields)
     
     def _get_cache_key(self, key: str) -> str:
         """Generate cache key with prefix"""
         return f"{self.cache_prefix}{key}"
+
+    def _to_cache(self, obj: ModelType) -> Dict[str, Any]:
+        """Column values of a row, keeping Decimal and datetime types for the codec"""
+        return {column: getattr(obj, column) for column in self.cache_columns}
+
+    def _to_cache_many(self, objs: List[ModelType]) -> List[Dict[str, Any]]:
+        """Column values of several rows"""
+        return [self._to_cache(obj) for obj in objs]
+
+    def _from_cache(self, data: Dict[str, Any]) -> CachedRecord:
+        """Wrap cached column values in a read-only record"""
+        return CachedRecord(self.model, data)
+
+    def _bloom_channel(self) -> str:
+        """Channel on which workers share newly created lookup values"""
+        return f"{settings.CACHE_BLOOM_CHANNEL}:{self.tag_prefix}"
+
+    def _on_remote_lookup_values(self, payload: Dict[str, Any]) -> None:
+        """Add values created by another worker to the Bloom filter"""
+        bloom = self.bloom_filters.get(payload["name"])
+        if bloom is not None:
+            for value in payload["values"]:
+                bloom.add(value)
+
+    async def _remember_lookup_values(self, objs: List[ModelType]) -> None:
+        """Add the lookup values of new or changed rows to every worker's Bloom filters"""
+        for name, bloom in self.bloom_filters.items():
+            column = self.lookup_fields[name]
+            values = [str(getattr(obj, column)) for obj in objs if getattr(obj, column) is not None]
+            if values:
+                for value in values:
+                    bloom.add(value)
+                await redis_client.publish_event(self._bloom_channel(), {"name": name, "values": values})
+
+    async def load_lookup_filters(self, db: AsyncSession) -> None:
+        """
+        Refill the Bloom filters from the database. They answer "maybe" while
+        loading, and values other workers publish meanwhile are kept.
+        """
+        for name, bloom in self.bloom_filters.items():
+            bloom.clear()
+            column = getattr(self.model, self.lookup_fields[name])
+            values = await db.stream_scalars(
+                select(column)
+                .where(column.isnot(None))
+                .execution_options(yield_per=10000)
+            )
+            async for value in values:
+                bloom.add(str(value))
+            bloom.ready = True
+
+    def _reload_lookup_filters(self) -> None:
+        """Reload the Bloom filters in the background, replacing any reload in progress"""
+        async def reload() -> None:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.load_lookup_filters(db)
+            except Exception as e:
+                print(f"Bloom filter load error: {e}")
+
+        if self._filter_reload is not None:
+            self._filter_reload.cancel()
+        self._filter_reload = asyncio.get_running_loop().create_task(reload())
+
+    def _get_tag(self, tag: str) -> str:
+        """Generate invalidation tag with prefix"""
+        return f"{self.tag_prefix}{tag}"
+
+    def _invalidation_tags(self, obj: ModelType) -> List[str]:
+        """Tags of the cached lists and aggregates a write to obj affects."""
+        return [self._get_tag("list"), self._get_tag("count")]
+
+    @replica_read
+    async def _get_cached_stats(
+        self,
+        db: AsyncSession,
+        cache_key: str,
+        compute: Callable[[AsyncSession], Awaitable[Dict[str, Any]]],
+        *,
+        expire: int = 1800,
+        tags: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get an expensive aggregate, computing it once across workers on a miss
+        and serving the stale value while it is refreshed in the background.
+        """
+        async def compute_now() -> Dict[str, Any]:
+            return jsonable_encoder(await compute(db))
+
+        async def refresh() -> Dict[str, Any]:
+            # The request session may be closed by the time this runs
+            async with AsyncSessionLocal() as background_db:
+                return jsonable_encoder(await compute(background_db))
+
+        return await redis_client.get_or_compute(
+            cache_key,
+            compute_now,
+            expire=expire,
+            tags=tags,
+            refresh=refresh
+        )
         
-    async def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        """Get a record by ID with caching."""
-        cache_key = self._get_cache_key(f"id:{id}")
+    async def get(self, db: AsyncSession, id: Any) -> Optional[Union[ModelType, CachedRecord]]:
+        """
+        Get a record by ID with caching.
+        A cache hit returns a read-only CachedRecord; use get_db_obj to modify the row.
+        """
+        return await self._cached_lookup(
+            db,
+            "id",
+            id,
+            lambda: db.get(self.model, id)
+        )
+
+    async def _cached_lookup(
+        self,
+        db: AsyncSession,
+        name: str,
+        value: Any,
+        load: Callable[[], Awaitable[Optional[ModelType]]],
+        *,
+        expire: int = 3600,
+        trust_bloom: bool = True
+    ) -> Optional[Union[ModelType, CachedRecord]]:
+        """
+        Resolve a single-row lookup, e.g. ("wallet", address), through the
+        request identity map, the Bloom filter, Redis and finally the database.
+        Misses are cached for CACHE_NEGATIVE_TTL seconds. Without trust_bloom,
+        a Bloom negative still checks Redis and the database, for lookups such
+        as authentication where a false "absent" must never happen.
+        """
+        cache_key = self._get_cache_key(f"{name}:{value}")
+        identity_map = get_session_identity_map(db)
+        if identity_map is not None:
+            found = identity_map.get(cache_key)
+            if found is not MISSING:
+                return found
         
-        # Try to get from cache
-        cached_data = await redis_client.get(cache_key)
-        if cached_data:
-            return self.model(**cached_data)
+        bloom = self.bloom_filters.get(name)
+        if trust_bloom and bloom is not None and not bloom.might_contain(str(value)):
+            # Absent as far as this worker knows; no round trip needed
+            db_obj = None
+        else:
+            # Try to get from cache
+            cached_data = await redis_client.get(cache_key)
+            if cached_data == NEGATIVE_CACHE:
+                db_obj = None
+            elif cached_data:
+                db_obj = self._from_cache(cached_data)
+            else:
+                # Get from database
+                db_obj = await load()
+                if db_obj:
+                    if bloom is not None:
+                        # Heal a false negative, e.g. a row written outside the CRUD layer
+                        bloom.add(str(value))
+                    await redis_client.set(
+                        cache_key,
+                        self._to_cache(db_obj),
+                        expire=expire,
+                        tags=[self._get_tag(f"id:{db_obj.id}")]
+                    )
+                else:
+                    await redis_client.set(
+                        cache_key,
+                        NEGATIVE_CACHE,
+                        expire=settings.CACHE_NEGATIVE_TTL
+                    )
         
-        # Get from database
-        db_obj = db.query(self.model).filter(self.model.id == id).first()
-        if db_obj:
-            await redis_client.set(
-                cache_key,
-                jsonable_encoder(db_obj),
-                expire=3600
-            )
+        if identity_map is not None:
+            identity_map.add(cache_key, db_obj)
         return db_obj
     
-    async def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100,
+    async def _cache_lookups(self, *objs: ModelType) -> None:
+        """
+        Cache rows under their id and every lookup key, replacing any
+        negative entries, record their lookup values in the Bloom filters
+        and bring their type-ahead suggestions up to date.
+        """
+        entries = []
+        for obj in objs:
+            data = self._to_cache(obj)
+            tags = [self._get_tag(f"id:{obj.id}")]
+            entries.append(CacheEntry(self._get_cache_key(f"id:{obj.id}"), data, 3600, tags))
+            for name, column in self.lookup_fields.items():
+                value = getattr(obj, column)
+                if value is not None:
+                    entries.append(CacheEntry(self._get_cache_key(f"{name}:{value}"), data, 3600, tags))
+        await redis_client.set_many(entries)
+        await self._remember_lookup_values(list(objs))
+        await self._update_suggestions(list(objs))
+
+    async def _update_suggestions(self, objs: List[ModelType]) -> None:
+        """Add or re-score written rows in this model's type-ahead indexes; none by default"""
+
+    async def _remove_suggestions(self, ids: List[Any]) -> None:
+        """Drop deleted rows from this model's type-ahead indexes; none by default"""
+
+    async def get_db_obj(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        """Get the persistent ORM instance by ID, bypassing the cache, for writes."""
+        return await db.get(self.model, id)
+
+    def _filter_conditions(self, filters: Optional[Dict[str, Any]]) -> List[Any]:
+        """WHERE clauses for equality or IN filters on model columns"""
+        filter_conditions = []
+        for key, value in (filters or {}).items():
+            if hasattr(self.model, key):
+                if isinstance(value, (list, tuple)):
+                    filter_conditions.append(getattr(self.model, key).in_(value))
+                else:
+                    filter_conditions.append(getattr(self.model, key) == value)
+        return filter_conditions
+
+    @replica_read
+    async def get_multi(self, db: AsyncSession, *, skip: int = 0, limit: int = 100,
         filters: Optional[Dict[str, Any]] = None
     ) -> List[ModelType]:
         """Get multiple records with optional filters and caching."""
@@ -50,33 +297,126 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            return [self.model(**item) for item in cached_data]
-        
-        query = db.query(self.model)
+            return [self._from_cache(item) for item in cached_data]
         
-        if filters:
-            filter_conditions = []
-            for key, value in filters.items():
-                if hasattr(self.model, key):
-                    if isinstance(value, (list, tuple)):
-                        filter_conditions.append(getattr(self.model, key).in_(value))
-                    else:
-                        filter_conditions.append(getattr(self.model, key) == value)
-            if filter_conditions:
-                query = query.filter(*filter_conditions)
-        
-        db_objs = query.offset(skip).limit(limit).all()
+        query = (
+            select(self.model)
+            .where(*self._filter_conditions(filters))
+            .offset(skip)
+            .limit(limit)
+        )
+        db_objs = (await db.scalars(query)).all()
         
         if db_objs:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(db_objs),
-                expire=3600
+                self._to_cache_many(db_objs),
+                expire=3600,
+                tags=[self._get_tag("list")]
             )
         return db_objs
     
-    async def get_count(self, db: Session, filters: Optional[Dict[str, Any]] = None) -> int:
-        """Get total count of records with optional filters and caching."""
+    def _keyset_order(self, order_by: str) -> str:
+        """order_by if it is a non-null column, else created_at; row comparisons cannot skip NULLs"""
+        column = self.model.__table__.columns.get(order_by)
+        return order_by if column is not None and not column.nullable else "created_at"
+
+    async def _keyset_page(
+        self,
+        db: AsyncSession,
+        query: Any,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        cache_key: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+        expire: int = 1800
+    ) -> Tuple[List[Union[ModelType, CachedRecord]], Optional[str]]:
+        """
+        Run query one page at a time, seeking past the (order column, id)
+        position encoded in cursor instead of using OFFSET, so every page costs
+        the same. Returns the rows and the cursor of the next page, if any.
+        Raises InvalidCursor for a cursor issued for another ordering.
+        """
+        if cache_key is not None:
+            cache_key = f"{cache_key}:{order_by}:{order_desc}:{cursor}:{limit}"
+            cached_page = await redis_client.get(cache_key)
+            if cached_page:
+                return [self._from_cache(row) for row in cached_page["rows"]], cached_page["next"]
+        
+        order_col = getattr(self.model, order_by)
+        if cursor:
+            value, last_id = decode_cursor(cursor, order_by, order_desc)
+            position = tuple_(order_col, self.model.id)
+            if order_desc:
+                query = query.where(position < tuple_(value, last_id))
+            else:
+                query = query.where(position > tuple_(value, last_id))
+        
+        if order_desc:
+            query = query.order_by(desc(order_col), desc(self.model.id))
+        else:
+            query = query.order_by(order_col, self.model.id)
+        
+        # One extra row tells whether another page follows
+        rows = (await db.scalars(query.limit(limit + 1))).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(order_by, order_desc, getattr(last, order_by), last.id)
+        
+        if cache_key is not None and rows:
+            await redis_client.set(
+                cache_key,
+                {"rows": self._to_cache_many(rows), "next": next_cursor},
+                expire=expire,
+                tags=tags
+            )
+        return rows, next_cursor
+
+    @replica_read
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        filters: Optional[Dict[str, Any]] = None,
+        order_by: str = "created_at",
+        order_desc: bool = True
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """Cursor-paginated get_multi: the rows and the cursor of the next page."""
+        filter_key = "_".join(f"{k}:{v}" for k, v in (filters or {}).items())
+        return await self._keyset_page(
+            db,
+            select(self.model).where(*self._filter_conditions(filters)),
+            cursor=cursor,
+            limit=limit,
+            order_by=self._keyset_order(order_by),
+            order_desc=order_desc,
+            cache_key=self._get_cache_key(f"page:{filter_key}"),
+            tags=[self._get_tag("list")],
+            expire=3600
+        )
+
+    @replica_read
+    async def get_count(
+        self,
+        db: AsyncSession,
+        filters: Optional[Dict[str, Any]] = None,
+        *,
+        estimate: bool = False
+    ) -> int:
+        """
+        Get total count of records with optional filters and caching.
+        estimate=True trades exactness for a constant-time answer; see _estimate_count.
+        """
+        if estimate:
+            return await self._estimate_count(db, filters)
+        
         filter_key = "_".join(f"{k}:{v}" for k, v in (filters or {}).items())
         cache_key = self._get_cache_key(f"count:{filter_key}")
         
@@ -84,50 +424,113 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if cached_count is not None:
             return int(cached_count)
         
-        query = db.query(func.count(self.model.id))
-        
-        if filters:
-            filter_conditions = []
-            for key, value in filters.items():
-                if hasattr(self.model, key):
-                    if isinstance(value, (list, tuple)):
-                        filter_conditions.append(getattr(self.model, key).in_(value))
-                    else:
-                        filter_conditions.append(getattr(self.model, key) == value)
-            if filter_conditions:
-                query = query.filter(*filter_conditions)
-        
-        count = query.scalar()
-        await redis_client.set(cache_key, count, expire=3600)
+        count = await db.scalar(
+            select(func.count(self.model.id)).where(*self._filter_conditions(filters))
+        )
+        await redis_client.set(cache_key, count, expire=3600, tags=[self._get_tag("count")])
         return count
 
-    async def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
+    async def _estimate_count(self, db: AsyncSession, filters: Optional[Dict[str, Any]]) -> int:
+        """
+        Approximate count: the planner's table size when unfiltered, a live
+        row counter when filtering on one counted field, else the planner's
+        row estimate for the filtered query.
+        """
+        filters = {k: v for k, v in (filters or {}).items() if hasattr(self.model, k)}
+        if not filters:
+            reltuples = await db.scalar(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+                {"table": self.model.__tablename__}
+            )
+            # -1 until the table is first vacuumed or analyzed
+            if reltuples is not None and reltuples >= 0:
+                return reltuples
+        elif len(filters) == 1 and next(iter(filters)) in self.counted_fields:
+            field, value = next(iter(filters.items()))
+            values = value if isinstance(value, (list, tuple)) else [value]
+            total = 0
+            for value in values:
+                total += await self._counter(db, field, value)
+            return total
+        
+        query = select(self.model.id).where(*self._filter_conditions(filters))
+        try:
+            # A savepoint keeps a failed EXPLAIN from aborting the caller's transaction
+            async with db.begin_nested():
+                plan = await db.scalar(Explain(query))
+        except Exception as e:
+            print(f"Count estimate error, counting exactly: {e}")
+            return await self.get_count(db, filters)
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    async def _counter(self, db: AsyncSession, field: str, value: Any) -> int:
+        """Rows whose field equals value, from the counter seeded by one GROUP BY"""
+        name = counter_name(self.model.__tablename__, field)
+        count = await redis_client.get_counter(name, counter_field(value))
+        if count is not None:
+            return count
+        
+        column = getattr(self.model, field)
+        rows = (await db.execute(
+            select(column, func.count(self.model.id)).group_by(column)
+        )).all()
+        counts = {counter_field(row_value): row_count for row_value, row_count in rows}
+        await redis_client.seed_counter(name, counts, expire=settings.CACHE_COUNTER_TTL)
+        return counts.get(counter_field(value), 0)
+
+    async def _before_commit(
+        self,
+        db: AsyncSession,
+        *,
+        old: Optional[Dict[str, Any]] = None,
+        new: Optional[ModelType] = None
+    ) -> None:
+        """
+        Hook run inside a write's transaction, before its changes are flushed,
+        e.g. to maintain denormalized aggregates. old holds the previous column
+        values of an updated or deleted row; new is the created or updated row.
+        """
+        rollups = [rollup for rollup in self.rollups if rollup.changed(old, new)]
+        if not rollups:
+            return
+        # Take back the stored row's facts, then add the written row's
+        if old is not None:
+            for rollup in rollups:
+                await rollup.apply(db, [old["id"]], -1)
+        if new is not None:
+            await db.flush()
+            for rollup in rollups:
+                await rollup.apply(db, [new.id], 1)
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         """Create a new record and invalidate relevant caches."""
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await self._before_commit(db, new=db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
-        # Clear list and count caches
-        await redis_client.clear_cache(f"{self.cache_prefix}list:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}count:*")
+        # Invalidate list and count caches
+        await redis_client.invalidate_tags(*self._invalidation_tags(db_obj))
         
         # Cache the new object
-        cache_key = self._get_cache_key(f"id:{db_obj.id}")
-        await redis_client.set(
-            cache_key,
-            jsonable_encoder(db_obj),
-            expire=3600
-        )
+        await self._cache_lookups(db_obj)
         
         return db_obj
     
-    async def update(self, db: Session, *, db_obj: ModelType,
+    async def update(self, db: AsyncSession, *, db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
         """Update a record and update cache."""
         obj_data = jsonable_encoder(db_obj)
+        # Tags derived from the old values, e.g. the owner an agent moves away from,
+        # plus the id tag so lookups by old unique values are dropped
+        tags = set(self._invalidation_tags(db_obj))
+        tags.add(self._get_tag(f"id:{db_obj.id}"))
+        old = self._to_cache(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -138,34 +541,36 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
                 setattr(db_obj, field, update_data[field])
         
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await self._before_commit(db, old=old, new=db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
-        # Update cache
-        cache_key = self._get_cache_key(f"id:{db_obj.id}")
-        await redis_client.set(
-            cache_key,
-            jsonable_encoder(db_obj),
-            expire=3600
-        )
+        # Invalidate list caches for both the old and the new values
+        tags.update(self._invalidation_tags(db_obj))
+        await redis_client.invalidate_tags(*tags)
         
-        # Clear list caches
-        await redis_client.clear_cache(f"{self.cache_prefix}list:*")
+        # Update cache
+        await self._cache_lookups(db_obj)
         
         return db_obj
     
-    async def remove(self, db: Session, *, id: int) -> ModelType:
+    async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
         """Delete a record and clear caches."""
-        obj = db.query(self.model).get(id)
-        db.delete(obj)
-        db.commit()
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        await self._before_commit(db, old=self._to_cache(obj))
+        await db.commit()
         
-        # Clear all related caches
-        await redis_client.clear_cache(f"{self.cache_prefix}*")
+        # Drop every lookup of the object and the lists it appeared in
+        await redis_client.invalidate_tags(
+            self._get_tag(f"id:{id}"),
+            *self._invalidation_tags(obj)
+        )
+        await self._remove_suggestions([id])
         
         return obj
     
-    async def exists(self, db: Session, id: int) -> bool:
+    async def exists(self, db: AsyncSession, id: int) -> bool:
         """Check if a record exists with caching."""
         cache_key = self._get_cache_key(f"exists:{id}")
         
@@ -173,88 +578,272 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if cached_exists is not None:
             return bool(int(cached_exists))
         
-        exists = db.query(
-            db.query(self.model).filter(self.model.id == id).exists()
-        ).scalar()
+        exists = await db.scalar(
+            select(select(self.model.id).where(self.model.id == id).exists())
+        )
         
-        await redis_client.set(cache_key, int(exists), expire=3600)
+        await redis_client.set(
+            cache_key,
+            int(exists),
+            expire=3600,
+            tags=[self._get_tag(f"id:{id}")]
+        )
         return exists
         
-    async def get_by_ids(self, db: Session, *, ids: List[int]) -> List[ModelType]:
+    async def get_by_ids(self, db: AsyncSession, *, ids: List[int]) -> List[ModelType]:
         """Get multiple records by their IDs with caching."""
-        results = []
-        uncached_ids = []
+        ids = list(dict.fromkeys(ids))
+        cached = await redis_client.get_many(
+            [self._get_cache_key(f"id:{id}") for id in ids]
+        )
 
-        for id in ids:
-            cache_key = self._get_cache_key(f"id:{id}")
-            cached_data = await redis_client.get(cache_key)
+        found = {}
+        uncached_ids = []
+        for id, cached_data in zip(ids, cached):
+            if cached_data == NEGATIVE_CACHE:
+                continue
             if cached_data:
-                results.append(self.model(**cached_data))
+                found[id] = self._from_cache(cached_data)
             else:
                 uncached_ids.append(id)
         
         # Get uncached items from database
         if uncached_ids:
             db_objs = (
-                db.query(self.model)
-                .filter(self.model.id.in_(uncached_ids))
-                .all()
-            )
+                await db.scalars(select(self.model).where(self.model.id.in_(uncached_ids)))
+            ).all()
             
             # Cache the results
-            for obj in db_objs:
-                cache_key = self._get_cache_key(f"id:{obj.id}")
-                await redis_client.set(
-                    cache_key,
-                    jsonable_encoder(obj),
-                    expire=3600
+            await redis_client.set_many(
+                CacheEntry(
+                    self._get_cache_key(f"id:{obj.id}"),
+                    self._to_cache(obj),
+                    expire=3600,
+                    tags=[self._get_tag(f"id:{obj.id}")]
                 )
-                results.append(obj)
+                for obj in db_objs
+            )
+            found.update((obj.id, obj) for obj in db_objs)
         
-        return sorted(results, key=lambda x: ids.index(x.id))
+        return [found[id] for id in ids if id in found]
     
+    async def _before_bulk_commit(
+        self,
+        db: AsyncSession,
+        *,
+        old: Optional[List[Dict[str, Any]]] = None,
+        new: Optional[List[ModelType]] = None,
+        fields: Optional[Set[str]] = None
+    ) -> None:
+        """
+        Bulk counterpart of _before_commit, run once per chunk: with old, the
+        stored values of rows about to be updated; with new, rows just inserted
+        or updated. fields names the columns written, when not all of them.
+        """
+        rollups = [
+            rollup for rollup in self.rollups
+            if fields is None or fields.intersection(rollup.columns)
+        ]
+        for rollup in rollups:
+            old_ids = [data["id"] for data in old or [] if rollup.contributes(data)]
+            new_ids = [obj.id for obj in new or [] if rollup.contributes(obj)]
+            if old_ids:
+                await rollup.apply(db, old_ids, -1)
+            if new_ids:
+                await rollup.apply(db, new_ids, 1)
+
+        # Bulk writes bypass the unit of work, so the row counters never see them:
+        # inserts count their rows, updates move them between the written values
+        table = self.model.__tablename__
+        if fields is None:
+            if new and old is None:
+                record_counter_deltas(db.info, table, new, 1)
+        else:
+            if old:
+                record_counter_deltas(db.info, table, old, -1, fields)
+            if new:
+                record_counter_deltas(db.info, table, new, 1, fields)
+
+    def _bulk_values(self, obj_in: CreateSchemaType) -> Dict[str, Any]:
+        """Column values of a new row, keeping Enum, Decimal and datetime types for the driver"""
+        return obj_in.model_dump()
+
+    async def _copy_chunk(
+        self,
+        db: AsyncSession,
+        rows: List[Dict[str, Any]],
+        columns: List[str],
+        first: bool
+    ) -> List[ModelType]:
+        """
+        Insert rows with COPY into a temporary staging table followed by one
+        INSERT ... SELECT ... RETURNING, which keeps sequence ids and defaults.
+        """
+        table = self.model.__table__
+        staging = f"_bulk_{table.name}"
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        if first:
+            await db.execute(text(
+                f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                f"SELECT {column_list}, 0 AS _bulk_ord FROM {table.name} WITH NO DATA"
+            ))
+        else:
+            await db.execute(text(f"TRUNCATE {staging}"))
+
+        # COPY bypasses SQLAlchemy, so apply Python-side defaults and bind processing here
+        dialect = db.bind.dialect
+        processors = {}
+        for column in columns:
+            processors[column] = table.c[column].type.bind_processor(dialect)
+        records = []
+        for position, row in enumerate(rows):
+            record = []
+            for column in columns:
+                value = row.get(column)
+                default = table.c[column].default
+                if column not in row and default is not None:
+                    value = default.arg(None) if default.is_callable else default.arg
+                processor = processors[column]
+                record.append(processor(value) if processor and value is not None else value)
+            record.append(position)
+            records.append(record)
+
+        connection = await (await db.connection()).get_raw_connection()
+        await connection.driver_connection.copy_records_to_table(
+            staging, records=records, columns=[*columns, "_bulk_ord"]
+        )
+        created = (await db.scalars(
+            select(self.model).from_statement(text(
+                f"INSERT INTO {table.name} ({column_list}) "
+                f"SELECT {column_list} FROM {staging} ORDER BY _bulk_ord "
+                f"RETURNING *"
+            ))
+        )).all()
+        # Ids follow the staging order
+        return sorted(created, key=lambda obj: obj.id)
+
     async def bulk_create(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         *, 
-        objs_in: List[CreateSchemaType]
+        objs_in: List[CreateSchemaType],
+        chunk_size: Optional[int] = None
     ) -> List[ModelType]:
-        """Create multiple records at once."""
-        db_objs = []
-        for obj_in in objs_in:
-            obj_in_data = jsonable_encoder(obj_in)
-            db_obj = self.model(**obj_in_data)
-            db_objs.append(db_obj)
-        
-        db.add_all(db_objs)
-        db.commit()
-        for obj in db_objs:
-            db.refresh(obj)
+        """
+        Create many records in one transaction: one multi-row INSERT ... RETURNING
+        per chunk, or COPY for loads of at least BULK_COPY_THRESHOLD rows, then
+        one cache pipeline per chunk. Returns the rows in input order.
+        """
+        chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        rows = [self._bulk_values(obj_in) for obj_in in objs_in]
+        use_copy = (
+            len(rows) >= settings.BULK_COPY_THRESHOLD
+            and db.bind.dialect.driver == "asyncpg"
+        )
+        if use_copy:
+            table_columns = [column.key for column in self.model.__table__.columns]
+            keys = set().union(*rows)
+            columns = [
+                column for column in table_columns
+                if column in keys or self.model.__table__.c[column].default is not None
+            ]
+
+        chunks = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            if use_copy:
+                created = await self._copy_chunk(db, chunk, columns, first=not chunks)
+            else:
+                created = (await db.scalars(
+                    insert(self.model).returning(self.model, sort_by_parameter_order=True),
+                    chunk
+                )).all()
+            await self._before_bulk_commit(db, new=list(created))
+            chunks.append(created)
+        await db.commit()
             
-        # Clear list and count caches
-        await redis_client.clear_cache(f"{self.cache_prefix}list:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}count:*")
+        # Invalidate list and count caches
+        tags = set()
+        for created in chunks:
+            for obj in created:
+                tags.update(self._invalidation_tags(obj))
+        await redis_client.invalidate_tags(*tags)
         
-        # Cache new objects
-        for obj in db_objs:
-            cache_key = self._get_cache_key(f"id:{obj.id}")
-            await redis_client.set(
-                cache_key,
-                jsonable_encoder(obj),
-                expire=3600
-            )
+        # Cache new objects, one pipeline per chunk
+        for created in chunks:
+            await self._cache_lookups(*created)
         
-        return db_objs
+        return [obj for created in chunks for obj in created]
 
     async def bulk_update(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         *, 
-        objs: List[Tuple[ModelType, UpdateSchemaType]]
+        objs: List[Tuple[ModelType, Union[UpdateSchemaType, Dict[str, Any]]]],
+        chunk_size: Optional[int] = None
     ) -> List[ModelType]:
-        """Update multiple records at once."""
-        updated_objs = []
+        """
+        Update many records in one transaction: rows writing the same fields
+        go in one UPDATE ... FROM (VALUES ...) RETURNING per chunk, then the
+        caches of every old and new value are invalidated in one batch.
+        Returns the updated rows in input order.
+        """
+        chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        table = self.model.__table__
+
+        # Group rows by the fields they write; a row listed twice keeps its last values
+        groups: Dict[Tuple[str, ...], Dict[Any, Tuple[ModelType, Dict[str, Any]]]] = {}
         for db_obj, obj_in in objs:
-            updated_obj = await self.update(db, db_obj=db_obj, obj_in=obj_in)
-            updated_objs.append(updated_obj)
-        return updated_objs
\ No newline at end of file
+            if isinstance(obj_in, dict):
+                update_data = obj_in
+            else:
+                update_data = obj_in.model_dump(exclude_unset=True)
+            fields = tuple(sorted(field for field in update_data if field in table.c and field != "id"))
+            if fields:
+                groups.setdefault(fields, {})[db_obj.id] = (
+                    db_obj, {field: update_data[field] for field in fields}
+                )
+
+        tags = set()
+        updated: Dict[Any, ModelType] = {}
+        for fields, rows in groups.items():
+            rows = list(rows.values())
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                old = []
+                for db_obj, _ in chunk:
+                    old.append(self._to_cache(db_obj))
+                    tags.update(self._invalidation_tags(db_obj))
+                    tags.add(self._get_tag(f"id:{db_obj.id}"))
+                await self._before_bulk_commit(db, old=old, fields=set(fields))
+
+                data = sql_values(
+                    sql_column("id", table.c.id.type),
+                    *[sql_column(field, table.c[field].type) for field in fields],
+                    name="bulk_values"
+                ).data([
+                    (db_obj.id, *[update_data[field] for field in fields])
+                    for db_obj, update_data in chunk
+                ])
+                stmt = (
+                    update(self.model)
+                    .where(self.model.id == data.c.id)
+                    .values({field: data.c[field] for field in fields})
+                    .returning(self.model)
+                    .execution_options(synchronize_session=False, populate_existing=True)
+                )
+                result = (await db.scalars(stmt)).all()
+
+                await self._before_bulk_commit(db, new=list(result), fields=set(fields))
+                updated.update((obj.id, obj) for obj in result)
+        await db.commit()
+        
+        # Invalidate list caches for both the old and the new values
+        for obj in updated.values():
+            tags.update(self._invalidation_tags(obj))
+        await redis_client.invalidate_tags(*tags)
+        
+        # Update cache in one pipeline
+        await self._cache_lookups(*updated.values())
+        
+        return [updated.get(db_obj.id, db_obj) for db_obj, _ in objs]
\ No newline at end of file
@@ -0,0 +1,38 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+class CachedRecord(Mapping):
+    """
+    Read-only view of a cached row.
+    Exposes the row's columns as attributes (agent.price) and as a mapping,
+    so it can be returned wherever a detached ORM instance was read before.
+    Relationships are not cached; load the ORM instance to follow them.
+    """
+    __slots__ = ("_data", "_model")
+
+    def __init__(self, model: type, data: Dict[str, Any]):
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_model", model)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(
+                f"Cached {self._model.__name__} has no column '{name}'"
+            ) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Cached {self._model.__name__} records are read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"<Cached{self._model.__name__} id={self._data.get('id')}>"
@@ -1,10 +1,11 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func
+from typing import List, Optional, Dict, Any, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, func, select
 from decimal import Decimal
-from fastapi.encoders import jsonable_encoder
 
+from app.crud.agent import agent as agent_crud
 from app.crud.base import CRUDBase
+from app.db.replicas import replica_read
 from app.models.review import Review
 from app.schemas.review import ReviewCreate, ReviewUpdate
 from app.core.redis import redis_client
@@ -12,7 +13,7 @@ from app.core.redis import redis_client
 class CRUDReview(CRUDBase[Review, ReviewCreate, ReviewUpdate]):
     async def create_with_user(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         obj_in: ReviewCreate,
         reviewer_id: int,
@@ -25,17 +26,19 @@ class CRUDReview(CRUDBase[Review, ReviewCreate, ReviewUpdate]):
             agent_creator_id=agent_creator_id
         )
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await self._before_commit(db, new=db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Cache the new review
         await self._update_review_caches(db_obj)
         
         return db_obj
 
+    @replica_read
     async def get_agent_reviews(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         agent_id: int,
         skip: int = 0,
@@ -47,33 +50,58 @@ class CRUDReview(CRUDBase[Review, ReviewCreate, ReviewUpdate]):
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            return [Review(**item) for item in cached_data]
+            return [self._from_cache(item) for item in cached_data]
         
-        query = db.query(Review).filter(Review.agent_id == agent_id)
+        query = select(Review).where(Review.agent_id == agent_id)
         
         if verified_only:
-            query = query.filter(Review.is_verified_purchase == True)
+            query = query.where(Review.is_verified_purchase == True)
         
-        reviews = (
+        reviews = (await db.scalars(
             query
             .order_by(desc(Review.created_at))
             .offset(skip)
             .limit(limit)
-            .all()
-        )
+        )).all()
         
         if reviews:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(reviews),
-                expire=1800
+                self._to_cache_many(reviews),
+                expire=1800,
+                tags=[self._get_tag(f"agent:{agent_id}")]
             )
         
         return reviews
 
+    @replica_read
+    async def get_agent_reviews_page(
+        self,
+        db: AsyncSession,
+        *,
+        agent_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        verified_only: bool = False
+    ) -> Tuple[List[Review], Optional[str]]:
+        """Cursor-paginated reviews of an agent, newest first."""
+        query = select(Review).where(Review.agent_id == agent_id)
+        if verified_only:
+            query = query.where(Review.is_verified_purchase == True)
+        
+        return await self._keyset_page(
+            db,
+            query,
+            cursor=cursor,
+            limit=limit,
+            cache_key=self._get_cache_key(f"agent_page:{agent_id}:{verified_only}"),
+            tags=[self._get_tag(f"agent:{agent_id}")]
+        )
+
+    @replica_read
     async def get_user_reviews(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         user_id: int,
         skip: int = 0,
@@ -85,108 +113,165 @@ class CRUDReview(CRUDBase[Review, ReviewCreate, ReviewUpdate]):
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            return [Review(**item) for item in cached_data]
+            return [self._from_cache(item) for item in cached_data]
         
-        query = db.query(Review)
+        query = select(Review)
         if as_creator:
-            query = query.filter(Review.agent_creator_id == user_id)
+            query = query.where(Review.agent_creator_id == user_id)
         else:
-            query = query.filter(Review.reviewer_id == user_id)
+            query = query.where(Review.reviewer_id == user_id)
         
-        reviews = (
+        reviews = (await db.scalars(
             query
             .order_by(desc(Review.created_at))
             .offset(skip)
             .limit(limit)
-            .all()
-        )
+        )).all()
         
         if reviews:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(reviews),
-                expire=1800
+                self._to_cache_many(reviews),
+                expire=1800,
+                tags=[self._get_tag(f"user:{user_id}")]
             )
         
         return reviews
 
     async def get_review_stats(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         agent_id: Optional[int] = None,
         user_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """Get review statistics with caching."""
-        cache_key = self._get_cache_key(f"stats:agent{agent_id or ''}:user{user_id or ''}")
-        
-        cached_stats = await redis_client.get(cache_key)
-        if cached_stats:
-            return cached_stats
-        
-        query = db.query(
-            func.count(Review.id).label('total_reviews'),
-            func.avg(Review.rating).label('average_rating'),
-            func.count(Review.id).filter(Review.is_verified_purchase == True).label('verified_reviews')
-        )
+        async def compute(db: AsyncSession) -> Dict[str, Any]:
+            query = select(
+                func.count(Review.id).label('total_reviews'),
+                func.avg(Review.rating).label('average_rating'),
+                func.count(Review.id).filter(Review.is_verified_purchase == True).label('verified_reviews')
+            )
+            
+            if agent_id:
+                query = query.where(Review.agent_id == agent_id)
+            if user_id:
+                query = query.where(Review.agent_creator_id == user_id)
+            
+            stats = (await db.execute(query)).one()._asdict()
+            
+            # Add rating distribution
+            if agent_id or user_id:
+                rating_dist = (await db.execute(
+                    select(
+                        Review.rating,
+                        func.count(Review.id).label('count')
+                    )
+                    .where(Review.agent_id == agent_id if agent_id else Review.agent_creator_id == user_id)
+                    .group_by(Review.rating)
+                )).all()
+                stats['rating_distribution'] = {
+                    float(rating): count for rating, count in rating_dist
+                }
+            return stats
         
+        tags = []
         if agent_id:
-            query = query.filter(Review.agent_id == agent_id)
+            tags.append(self._get_tag(f"agent:{agent_id}"))
         if user_id:
-            query = query.filter(Review.agent_creator_id == user_id)
-        
-        stats = query.first()._asdict()
-        
-        # Add rating distribution
-        if agent_id or user_id:
-            rating_dist = (
-                db.query(
-                    Review.rating,
-                    func.count(Review.id).label('count')
-                )
-                .filter(Review.agent_id == agent_id if agent_id else Review.agent_creator_id == user_id)
-                .group_by(Review.rating)
-                .all()
+            tags.append(self._get_tag(f"user:{user_id}"))
+        return await self._get_cached_stats(
+            db,
+            self._get_cache_key(f"stats:agent{agent_id or ''}:user{user_id or ''}"),
+            compute,
+            tags=tags or [self._get_tag("stats")]
+        )
+
+    async def _before_commit(
+        self,
+        db: AsyncSession,
+        *,
+        old: Optional[Dict[str, Any]] = None,
+        new: Optional[Review] = None
+    ) -> None:
+        """Move the rating between the reviewed agents' running aggregates."""
+        await super()._before_commit(db, old=old, new=new)
+        if old is not None and new is not None:
+            if (old["agent_id"], old["rating"]) == (new.agent_id, new.rating):
+                return
+        if old is not None:
+            await agent_crud.apply_rating_delta(
+                db, agent_id=old["agent_id"], rating=old["rating"], count=-1
             )
-            stats['rating_distribution'] = {
-                float(rating): count for rating, count in rating_dist
-            }
-        
-        await redis_client.set(cache_key, stats, expire=1800)
-        return stats
+        if new is not None:
+            await agent_crud.apply_rating_delta(
+                db, agent_id=new.agent_id, rating=new.rating, count=1
+            )
+
+    async def _before_bulk_commit(
+        self,
+        db: AsyncSession,
+        *,
+        old: Optional[List[Dict[str, Any]]] = None,
+        new: Optional[List[Review]] = None,
+        fields: Optional[Set[str]] = None
+    ) -> None:
+        """Move the ratings of reviews written in bulk between their agents' aggregates."""
+        await super()._before_bulk_commit(db, old=old, new=new, fields=fields)
+        if fields is not None and not fields.intersection(("agent_id", "rating")):
+            return
+        for data in old or []:
+            await agent_crud.apply_rating_delta(
+                db, agent_id=data["agent_id"], rating=data["rating"], count=-1
+            )
+        for review in new or []:
+            await agent_crud.apply_rating_delta(
+                db, agent_id=review.agent_id, rating=review.rating, count=1
+            )
+
+    def _invalidation_tags(self, obj: Review) -> List[str]:
+        """Tags of the cached lists and aggregates a write to a review affects."""
+        return super()._invalidation_tags(obj) + [
+            self._get_tag("stats"),
+            self._get_tag(f"agent:{obj.agent_id}"),
+            self._get_tag(f"user:{obj.reviewer_id}"),
+            self._get_tag(f"user:{obj.agent_creator_id}"),
+            # The agent row carries the rating aggregates
+            agent_crud._get_tag(f"id:{obj.agent_id}"),
+            agent_crud._get_tag(f"stats:{obj.agent_id}")
+        ]
 
     async def _update_review_caches(self, review: Review) -> None:
         """Update all caches related to a review."""
-        data = jsonable_encoder(review)
+        data = self._to_cache(review)
         
         # Update main cache
         await redis_client.set(
             self._get_cache_key(f"id:{review.id}"),
             data,
-            expire=3600
+            expire=3600,
+            tags=[self._get_tag(f"id:{review.id}")]
         )
         
-        # Clear related caches
-        await redis_client.clear_cache(f"{self.cache_prefix}agent:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}user:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}stats:*")
+        # Invalidate the agent, user and stats entries of this review
+        await redis_client.invalidate_tags(*self._invalidation_tags(review))
 
     async def verify_purchase(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         review_id: int,
         is_verified: bool = True
     ) -> Optional[Review]:
         """Mark a review as verified purchase."""
-        db_obj = await self.get(db, id=review_id)
+        db_obj = await self.get_db_obj(db, id=review_id)
         if not db_obj:
             return None
             
         db_obj.is_verified_purchase = is_verified
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Update caches
         await self._update_review_caches(db_obj)
@@ -1,18 +1,59 @@
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
-from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, case, desc, func, literal, select
 
 from app.crud.base import CRUDBase
+from app.db.replicas import replica_read
+from app.db.rollups import Rollup
+from app.models.agent import Agent, AgentCategory
+from app.models.rollup import TrainingRollup
 from app.models.training import TrainingJob, TrainingStatus
 from app.models.ai_model import AIModel, ModelType, ModelStatus
 from app.schemas.training import TrainingJobCreate, TrainingJobUpdate
 from app.core.redis import redis_client
 
+def _training_facts():
+    """One fact row per completed training job, with its model type and agent"""
+    return (
+        select(
+            TrainingJob.id.label("id"),
+            TrainingJob.created_at.label("event_time"),
+            AIModel.model_type.label("model_type"),
+            Agent.category.label("category"),
+            Agent.owner_id.label("owner_id"),
+            TrainingJob.agent_id.label("agent_id"),
+            literal(1).label("jobs"),
+            TrainingJob.compute_time.label("compute_time"),
+            case((TrainingJob.compute_time.isnot(None), 1), else_=0).label("timed_jobs"),
+            TrainingJob.current_accuracy.label("accuracy_sum"),
+            case((TrainingJob.current_accuracy.isnot(None), 1), else_=0).label("scored_jobs")
+        )
+        .outerjoin(AIModel, AIModel.id == TrainingJob.model_id)
+        .outerjoin(Agent, Agent.id == TrainingJob.agent_id)
+        .where(TrainingJob.status == TrainingStatus.COMPLETED)
+    )
+
+training_rollup = Rollup(
+    TrainingRollup,
+    _training_facts,
+    dimensions=(
+        ("model_type", "model_type"),
+        ("category", "category"),
+        ("user", "owner_id"),
+        ("agent", "agent_id")
+    ),
+    measures=("jobs", "compute_time", "timed_jobs", "accuracy_sum", "scored_jobs"),
+    columns=("status", "compute_time", "current_accuracy", "model_id", "agent_id", "created_at"),
+    # Only completed jobs have facts; progress updates of running ones skip the rollup
+    contributes=lambda row: row["status"] == TrainingStatus.COMPLETED
+)
+
 class CRUDTraining(CRUDBase[TrainingJob, TrainingJobCreate, TrainingJobUpdate]):
+    rollups = (training_rollup,)
+
     async def create_training_job(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         agent_id: int,
         model_id: int,
@@ -27,8 +68,9 @@ class CRUDTraining(CRUDBase[TrainingJob, TrainingJobCreate, TrainingJobUpdate]):
         )
         
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await self._before_commit(db, new=db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Cache the new job
         await self._update_training_caches(db_obj)
@@ -37,7 +79,7 @@ class CRUDTraining(CRUDBase[TrainingJob, TrainingJobCreate, TrainingJobUpdate]):
 
     async def update_progress(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         job_id: int,
         progress: float,
@@ -46,10 +88,11 @@ class CRUDTraining(CRUDBase[TrainingJob, TrainingJobCreate, TrainingJobUpdate]):
         metrics: Optional[Dict[str, Any]] = None
     ) -> Optional[TrainingJob]:
         """Update training progress."""
-        db_obj = await self.get(db, id=job_id)
+        db_obj = await self.get_db_obj(db, id=job_id)
         if not db_obj:
             return None
 
+        old = self._to_cache(db_obj)
         db_obj.progress = progress
         if current_loss is not None:
             db_obj.current_loss = current_loss
@@ -59,17 +102,19 @@ class CRUDTraining(CRUDBase[TrainingJob, TrainingJobCreate, TrainingJobUpdate]):
             db_obj.metrics = metrics
             
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await self._before_commit(db, old=old, new=db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Update caches
         await self._update_training_caches(db_obj)
         
         return db_obj
 
+    @replica_read
     async def get_agent_training_jobs(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         agent_id: int,
         skip: int = 0,
@@ -80,89 +125,113 @@ class CRUDTraining(CRUDBase[TrainingJob, TrainingJobCreate, TrainingJobUpdate]):
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            return [TrainingJob(**item) for item in cached_data]
+            return [self._from_cache(item) for item in cached_data]
         
-        jobs = (
-            db.query(TrainingJob)
-            .filter(TrainingJob.agent_id == agent_id)
+        jobs = (await db.scalars(
+            select(TrainingJob)
+            .where(TrainingJob.agent_id == agent_id)
             .order_by(desc(TrainingJob.created_at))
             .offset(skip)
             .limit(limit)
-            .all()
-        )
+        )).all()
         
         if jobs:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(jobs),
-                expire=1800
+                self._to_cache_many(jobs),
+                expire=1800,
+                tags=[self._get_tag(f"agent:{agent_id}")]
             )
         
         return jobs
 
-    async def get_active_jobs(self, db: Session) -> List[TrainingJob]:
+    async def get_active_jobs(self, db: AsyncSession) -> List[TrainingJob]:
         """Get all active training jobs with caching."""
         cache_key = self._get_cache_key("active")
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            return [TrainingJob(**item) for item in cached_data]
+            return [self._from_cache(item) for item in cached_data]
         
-        jobs = db.query(TrainingJob).filter(
-            TrainingJob.status.in_([TrainingStatus.PENDING, TrainingStatus.RUNNING])
-        ).all()
+        jobs = (await db.scalars(
+            select(TrainingJob).where(
+                TrainingJob.status.in_([TrainingStatus.PENDING, TrainingStatus.RUNNING])
+            )
+        )).all()
         
         if jobs:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(jobs),
-                expire=300
+                self._to_cache_many(jobs),
+                expire=300,
+                tags=[self._get_tag("active")]
             )
         
         return jobs
 
     async def get_training_stats(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
-        agent_id: Optional[int] = None
+        agent_id: Optional[int] = None,
+        model_type: Optional[ModelType] = None,
+        category: Optional[AgentCategory] = None,
+        user_id: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Get training statistics with caching."""
-        cache_key = self._get_cache_key(f"stats:{agent_id or 'global'}")
-        
-        cached_stats = await redis_client.get(cache_key)
-        if cached_stats:
-            return cached_stats
-        
-        query = db.query(
-            func.count(TrainingJob.id).label('total_jobs'),
-            func.avg(TrainingJob.compute_time).label('avg_compute_time'),
-            func.avg(TrainingJob.current_accuracy).label('avg_accuracy')
+        """Get statistics of completed training jobs from the rollups, optionally for one dimension."""
+        filters = {
+            "agent": agent_id,
+            "model_type": model_type,
+            "category": category,
+            "user": user_id
+        }
+        filters = {dimension: value for dimension, value in filters.items() if value}
+        if len(filters) > 1:
+            raise ValueError("Filter training stats by one of agent, model type, category or user")
+        dimension, value = next(iter(filters.items()), ("all", ""))
+
+        async def compute(db: AsyncSession) -> Dict[str, Any]:
+            totals = await training_rollup.totals(db, dimension=dimension, value=value)
+            return {
+                'total_jobs': totals['jobs'],
+                'avg_compute_time': (
+                    totals['compute_time'] / totals['timed_jobs'] if totals['timed_jobs'] else None
+                ),
+                'avg_accuracy': (
+                    totals['accuracy_sum'] / totals['scored_jobs'] if totals['scored_jobs'] else None
+                )
+            }
+        
+        stats_tag = f"agent:{agent_id}" if agent_id else "stats"
+        return await self._get_cached_stats(
+            db,
+            self._get_cache_key(f"stats:{dimension}:{value}"),
+            compute,
+            tags=[self._get_tag(stats_tag), training_rollup.tag]
         )
-        
-        if agent_id:
-            query = query.filter(TrainingJob.agent_id == agent_id)
-        
-        stats = query.first()._asdict()
-        
-        await redis_client.set(cache_key, stats, expire=1800)
-        return stats
+
+    def _invalidation_tags(self, obj: TrainingJob) -> List[str]:
+        """Tags of the cached lists and aggregates a write to a training job affects."""
+        return super()._invalidation_tags(obj) + [
+            self._get_tag("stats"),
+            self._get_tag("active"),
+            self._get_tag(f"agent:{obj.agent_id}")
+        ]
 
     async def _update_training_caches(self, job: TrainingJob) -> None:
         """Update all caches related to a training job."""
-        data = jsonable_encoder(job)
+        data = self._to_cache(job)
         
         # Update main cache
         await redis_client.set(
             self._get_cache_key(f"id:{job.id}"),
             data,
-            expire=3600
+            expire=3600,
+            tags=[self._get_tag(f"id:{job.id}")]
         )
         
-        # Clear related caches
-        await redis_client.clear_cache(f"{self.cache_prefix}agent:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}active")
-        await redis_client.clear_cache(f"{self.cache_prefix}stats:*")
+        # Invalidate the agent, active and stats entries of this job
+        await redis_client.invalidate_tags(*self._invalidation_tags(job))
 
 # Create singleton instance
 training = CRUDTraining(TrainingJob)
\ No newline at end of file
@@ -1,35 +1,61 @@
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc, func
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, func, literal, select
 from decimal import Decimal
-from fastapi.encoders import jsonable_encoder
 
+from app.crud.agent import agent as agent_crud
+from app.crud.agent_leaderboards import agent_leaderboards
 from app.crud.base import CRUDBase
+from app.db.replicas import replica_read
+from app.db.rollups import Rollup
+from app.models.agent import Agent, AgentCategory
+from app.models.rollup import TransactionRollup
 from app.models.transaction import Transaction, TransactionStatus, TransactionType
 from app.schemas.transaction import TransactionCreate, TransactionUpdate
 from app.core.redis import redis_client
 
+def _transaction_facts():
+    """One fact row per transaction, with the category of the agent traded"""
+    return (
+        select(
+            Transaction.id.label("id"),
+            Transaction.created_at.label("event_time"),
+            Agent.category.label("category"),
+            Transaction.buyer_id.label("buyer_id"),
+            Transaction.seller_id.label("seller_id"),
+            literal(1).label("transactions"),
+            Transaction.amount.label("volume")
+        )
+        .outerjoin(Agent, Agent.id == Transaction.agent_id)
+    )
+
+transaction_rollup = Rollup(
+    TransactionRollup,
+    _transaction_facts,
+    dimensions=(("category", "category"), ("user", "buyer_id"), ("user", "seller_id")),
+    measures=("transactions", "volume"),
+    columns=("agent_id", "buyer_id", "seller_id", "amount", "created_at")
+)
+
 class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate]):
-    async def get_by_hash(self, db: Session, *, tx_hash: str) -> Optional[Transaction]:
+    lookup_fields = {"hash": "transaction_hash"}
+    counted_fields = ("status", "type")
+    rollups = (transaction_rollup,)
+
+    async def get_by_hash(self, db: AsyncSession, *, tx_hash: str) -> Optional[Transaction]:
         """Get transaction by blockchain hash."""
-        cache_key = self._get_cache_key(f"hash:{tx_hash}")
-        
-        cached_data = await redis_client.get(cache_key)
-        if cached_data:
-            return Transaction(**cached_data)
-        
-        db_obj = db.query(Transaction).filter(Transaction.transaction_hash == tx_hash).first()
-        if db_obj:
-            await redis_client.set(
-                cache_key,
-                jsonable_encoder(db_obj),
-                expire=3600
-            )
-        return db_obj
+        return await self._cached_lookup(
+            db,
+            "hash",
+            tx_hash,
+            lambda: db.scalar(select(Transaction).where(Transaction.transaction_hash == tx_hash))
+        )
 
+    @replica_read
     async def get_user_transactions(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         user_id: int,
         skip: int = 0,
@@ -41,9 +67,9 @@ class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            return [Transaction(**item) for item in cached_data]
+            return [self._from_cache(item) for item in cached_data]
         
-        query = db.query(Transaction).filter(
+        query = select(Transaction).where(
             or_(
                 Transaction.buyer_id == user_id,
                 Transaction.seller_id == user_id
@@ -51,22 +77,54 @@ class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
         )
         
         if type:
-            query = query.filter(Transaction.type == type)
+            query = query.where(Transaction.type == type)
         
-        transactions = query.order_by(desc(Transaction.created_at)).offset(skip).limit(limit).all()
+        transactions = (await db.scalars(
+            query.order_by(desc(Transaction.created_at)).offset(skip).limit(limit)
+        )).all()
         
         if transactions:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(transactions),
-                expire=1800
+                self._to_cache_many(transactions),
+                expire=1800,
+                tags=[self._get_tag(f"user:{user_id}")]
             )
         
         return transactions
 
+    @replica_read
+    async def get_user_transactions_page(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        type: Optional[TransactionType] = None
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """Cursor-paginated transactions of a user, newest first."""
+        query = select(Transaction).where(
+            or_(
+                Transaction.buyer_id == user_id,
+                Transaction.seller_id == user_id
+            )
+        )
+        if type:
+            query = query.where(Transaction.type == type)
+        
+        return await self._keyset_page(
+            db,
+            query,
+            cursor=cursor,
+            limit=limit,
+            cache_key=self._get_cache_key(f"user_page:{user_id}:{type}"),
+            tags=[self._get_tag(f"user:{user_id}")]
+        )
+
     async def create_purchase(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         agent_id: int,
         buyer_id: int,
@@ -86,8 +144,9 @@ class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
         )
         
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await self._before_commit(db, new=db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Cache the new transaction
         await self._update_transaction_caches(db_obj)
@@ -96,102 +155,147 @@ class CRUDTransaction(CRUDBase[Transaction, TransactionCreate, TransactionUpdate
 
     async def update_status(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
         tx_hash: str,
         status: TransactionStatus,
         block_number: Optional[int] = None
     ) -> Optional[Transaction]:
         """Update transaction status."""
-        db_obj = await self.get_by_hash(db, tx_hash=tx_hash)
+        db_obj = await db.scalar(select(Transaction).where(Transaction.transaction_hash == tx_hash))
         if not db_obj:
             return None
 
+        old = self._to_cache(db_obj)
         db_obj.status = status
         if block_number:
             db_obj.block_number = block_number
             
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await self._before_commit(db, old=old, new=db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Update caches
         await self._update_transaction_caches(db_obj)
+        await self._update_trending(db, old, db_obj)
         
         return db_obj
 
+    async def _update_trending(
+        self,
+        db: AsyncSession,
+        old: Dict[str, Any],
+        transaction: Transaction
+    ) -> None:
+        """Count a purchase on the trending boards when it completes, and withdraw it if it is refunded."""
+        def completed(values: Dict[str, Any]) -> bool:
+            return (
+                values["type"] == TransactionType.PURCHASE
+                and values["status"] == TransactionStatus.COMPLETED
+            )
+
+        count = completed(self._to_cache(transaction)) - completed(old)
+        if not count or transaction.agent_id is None:
+            return
+        agent = await agent_crud.get(db, id=transaction.agent_id)
+        if agent is None:
+            return
+        await agent_leaderboards.record_purchase(
+            agent_id=agent.id,
+            category=agent.category,
+            amount=transaction.amount,
+            at=transaction.created_at,
+            count=count
+        )
+
     async def get_transaction_stats(
         self,
-        db: Session,
+        db: AsyncSession,
         *,
-        user_id: Optional[int] = None
+        user_id: Optional[int] = None,
+        category: Optional[AgentCategory] = None
     ) -> Dict[str, Any]:
-        """Get transaction statistics with caching."""
-        cache_key = self._get_cache_key(f"stats:{user_id or 'global'}")
-        
-        cached_stats = await redis_client.get(cache_key)
-        if cached_stats:
-            return cached_stats
-        
-        query = db.query(
-            func.count(Transaction.id).label('total_transactions'),
-            func.sum(Transaction.amount).label('total_volume'),
-            func.avg(Transaction.amount).label('average_amount')
-        )
-        
+        """Get transaction statistics of a user, an agent category or the marketplace from the rollups."""
+        if user_id and category:
+            raise ValueError("Filter transaction stats by user or by category, not both")
         if user_id:
-            query = query.filter(
-                or_(
-                    Transaction.buyer_id == user_id,
-                    Transaction.seller_id == user_id
+            dimension, value, stats_tag = "user", user_id, f"user:{user_id}"
+        elif category:
+            dimension, value, stats_tag = "category", category, "stats"
+        else:
+            dimension, value, stats_tag = "all", "", "stats"
+
+        async def compute(db: AsyncSession) -> Dict[str, Any]:
+            totals = await transaction_rollup.totals(db, dimension=dimension, value=value)
+            return {
+                'total_transactions': totals['transactions'],
+                'total_volume': totals['volume'],
+                'average_amount': (
+                    totals['volume'] / totals['transactions'] if totals['transactions'] else None
                 )
-            )
+            }
         
-        stats = query.first()._asdict()
-        
-        await redis_client.set(cache_key, stats, expire=1800)
-        return stats
+        return await self._get_cached_stats(
+            db,
+            self._get_cache_key(f"stats:{dimension}:{value}"),
+            compute,
+            tags=[self._get_tag(stats_tag), transaction_rollup.tag]
+        )
+
+    @replica_read
+    async def get_volume_series(
+        self,
+        db: AsyncSession,
+        *,
+        granularity: str = "day",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        category: Optional[AgentCategory] = None
+    ) -> List[Dict[str, Any]]:
+        """Hourly or daily transaction count and volume, oldest bucket first."""
+        if category:
+            return await transaction_rollup.series(
+                db, granularity=granularity, dimension="category", value=category,
+                since=since, until=until
+            )
+        return await transaction_rollup.series(db, granularity=granularity, since=since, until=until)
+
+    def _invalidation_tags(self, obj: Transaction) -> List[str]:
+        """Tags of the cached lists and aggregates a write to a transaction affects."""
+        return super()._invalidation_tags(obj) + [
+            self._get_tag("stats"),
+            self._get_tag("pending"),
+            self._get_tag(f"user:{obj.buyer_id}"),
+            self._get_tag(f"user:{obj.seller_id}")
+        ]
 
     async def _update_transaction_caches(self, transaction: Transaction) -> None:
         """Update all caches related to a transaction."""
-        data = jsonable_encoder(transaction)
-        
-        # Update main cache
-        await redis_client.set(
-            self._get_cache_key(f"id:{transaction.id}"),
-            data,
-            expire=3600
-        )
-        
-        # Update hash cache
-        if transaction.transaction_hash:
-            await redis_client.set(
-                self._get_cache_key(f"hash:{transaction.transaction_hash}"),
-                data,
-                expire=3600
-            )
+        # Update id and hash caches
+        await self._cache_lookups(transaction)
         
-        # Clear related caches
-        await redis_client.clear_cache(f"{self.cache_prefix}user:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}stats:*")
+        # Invalidate the buyer, seller, pending and stats entries
+        await redis_client.invalidate_tags(*self._invalidation_tags(transaction))
 
-    async def get_pending_transactions(self, db: Session) -> List[Transaction]:
+    async def get_pending_transactions(self, db: AsyncSession) -> List[Transaction]:
         """Get all pending transactions."""
         cache_key = self._get_cache_key("pending")
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            return [Transaction(**item) for item in cached_data]
+            return [self._from_cache(item) for item in cached_data]
         
-        transactions = db.query(Transaction).filter(
-            Transaction.status == TransactionStatus.PENDING
-        ).all()
+        transactions = (await db.scalars(
+            select(Transaction).where(Transaction.status == TransactionStatus.PENDING)
+        )).all()
         
         if transactions:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(transactions),
-                expire=300
+                self._to_cache_many(transactions),
+                expire=300,
+                tags=[self._get_tag("pending")]
             )
         
         return transactions
@@ -1,83 +1,86 @@
 from typing import Any, Dict, Optional, Union, List
-from sqlalchemy.orm import Session
-from sqlalchemy import select, or_
-from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, or_
+from sqlalchemy.exc import IntegrityError
 
 from app.crud.base import CRUDBase
+from app.db.replicas import replica_read
+from app.models.agent import Agent
+from app.models.review import Review
+from app.models.transaction import Transaction
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.redis import redis_client
+from app.core.suggest import suggest_key
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
-    async def get_by_wallet(self, db: Session, *, wallet_address: str) -> Optional[User]:
-        """Get a user by wallet address with caching."""
-        cache_key = self._get_cache_key(f"wallet:{wallet_address}")
-        
-        cached_data = await redis_client.get(cache_key)
-        if cached_data:
-            return User(**cached_data)
-        
-        db_obj = db.query(User).filter(User.wallet_address == wallet_address).first()
-        if db_obj:
-            await redis_client.set(
-                cache_key,
-                jsonable_encoder(db_obj),
-                expire=3600
-            )
-        return db_obj
+    lookup_fields = {"wallet": "wallet_address", "username": "username"}
+    bloom_lookups = ("wallet",)
+
+    async def get_by_wallet(
+        self,
+        db: AsyncSession,
+        *,
+        wallet_address: str,
+        trust_bloom: bool = True
+    ) -> Optional[User]:
+        """
+        Get a user by wallet address with caching.
+        Authentication passes trust_bloom=False so a wallet this worker has
+        not heard of yet is still looked up.
+        """
+        return await self._cached_lookup(
+            db,
+            "wallet",
+            wallet_address,
+            lambda: db.scalar(select(User).where(User.wallet_address == wallet_address)),
+            trust_bloom=trust_bloom
+        )
     
-    async def get_by_username(self, db: Session, *, username: str) -> Optional[User]:
+    async def get_by_username(self, db: AsyncSession, *, username: str) -> Optional[User]:
         """Get a user by username with caching."""
-        cache_key = self._get_cache_key(f"username:{username}")
-        
-        cached_data = await redis_client.get(cache_key)
-        if cached_data:
-            return User(**cached_data)
-        
-        db_obj = db.query(User).filter(User.username == username).first()
-        if db_obj:
-            await redis_client.set(
-                cache_key,
-                jsonable_encoder(db_obj),
-                expire=3600
-            )
-        return db_obj
+        return await self._cached_lookup(
+            db,
+            "username",
+            username,
+            lambda: db.scalar(select(User).where(User.username == username))
+        )
 
     
-    async def create_with_wallet(self, db: Session, *, wallet_address: str) -> User:
+    async def create_with_wallet(self, db: AsyncSession, *, wallet_address: str) -> User:
         """Create a new user with wallet address."""
         db_obj = User(wallet_address=wallet_address, is_active=True)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Another worker registered the wallet before our Bloom filter heard of it
+            await db.rollback()
+            return await db.scalar(select(User).where(User.wallet_address == wallet_address))
+        await db.refresh(db_obj)
         
-        # Cache the new user
-        cache_key = self._get_cache_key(f"wallet:{wallet_address}")
-        await redis_client.set(
-            cache_key,
-            jsonable_encoder(db_obj),
-            expire=3600
-        )
+        # Cache the new user, replacing any cached miss for the wallet
+        await self._cache_lookups(db_obj)
         
         return db_obj
     
-    async def update_nonce(self, db: Session, *, user_id: int, nonce: str) -> User:
+    async def update_nonce(self, db: AsyncSession, *, user_id: int, nonce: Optional[str]) -> User:
         """Update user's authentication nonce."""
-        db_obj = await self.get(db, id=user_id)
+        db_obj = await self.get_db_obj(db, id=user_id)
         if not db_obj:
             return None
 
         db_obj.nonce = nonce
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         
         # Update caches
         await self._update_user_caches(db_obj)
         
         return db_obj
     
-    async def get_user_stats(self, db: Session, *, user_id: int) -> Dict[str, Any]:
+    async def get_user_stats(self, db: AsyncSession, *, user_id: int) -> Dict[str, Any]:
         """Get user's statistics with caching."""
         cache_key = self._get_cache_key(f"stats:{user_id}")
         
@@ -85,73 +88,72 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         if cached_stats:
             return cached_stats
         
-        user = await self.get(db, id=user_id)
-        if not user:
+        # One round trip of aggregate subqueries, however large the catalog
+        row = (await db.execute(
+            select(
+                select(func.count(Agent.id))
+                .where(Agent.creator_id == user_id)
+                .scalar_subquery().label("total_agents_created"),
+                select(func.count(Agent.id))
+                .where(Agent.owner_id == user_id)
+                .scalar_subquery().label("total_agents_owned"),
+                select(func.count(Transaction.id))
+                .where(Transaction.buyer_id == user_id)
+                .scalar_subquery().label("sent_transactions"),
+                select(func.count(Transaction.id))
+                .where(Transaction.seller_id == user_id)
+                .scalar_subquery().label("received_transactions"),
+                select(func.avg(Review.rating))
+                .join(Agent, Review.agent_id == Agent.id)
+                .where(Agent.creator_id == user_id)
+                .scalar_subquery().label("average_rating"),
+                select(func.coalesce(func.sum(Transaction.amount), 0))
+                .where(Transaction.seller_id == user_id)
+                .scalar_subquery().label("total_revenue")
+            )
+            .where(User.id == user_id)
+        )).first()
+        if not row:
             return {}
 
         stats = {
-            "total_agents_created": len(user.created_agents),
-            "total_agents_owned": len(user.owned_agents),
-            "total_transactions": len(user.sent_transactions) + len(user.received_transactions),
-            "average_rating": await self._calculate_average_rating(user),
-            "total_revenue": await self._calculate_total_revenue(user)
+            "total_agents_created": row.total_agents_created,
+            "total_agents_owned": row.total_agents_owned,
+            "total_transactions": row.sent_transactions + row.received_transactions,
+            "average_rating": round(float(row.average_rating or 0), 2),
+            "total_revenue": float(row.total_revenue)
         }
         
-        await redis_client.set(cache_key, stats, expire=1800)  # 30 minutes
+        await redis_client.set(
+            cache_key,
+            stats,
+            expire=1800,  # 30 minutes
+            tags=[self._get_tag(f"id:{user_id}")]
+        )
         return stats
     
+    def _invalidation_tags(self, obj: User) -> List[str]:
+        """Tags of the cached lists and aggregates a write to a user affects."""
+        return super()._invalidation_tags(obj) + [self._get_tag("search")]
+
     async def _update_user_caches(self, user: User) -> None:
         """Update all caches related to a user."""
-        data = jsonable_encoder(user)
-        
-        # Update main cache
-        await redis_client.set(
-            self._get_cache_key(f"id:{user.id}"),
-            data,
-            expire=3600
+        # Clear related caches, including lookups by a previous username
+        await redis_client.invalidate_tags(
+            self._get_tag(f"id:{user.id}"),
+            *self._invalidation_tags(user)
         )
+        await redis_client.delete(self._get_cache_key(f"stats:{user.id}"))
         
-        # Update wallet cache
-        if user.wallet_address:
-            await redis_client.set(
-                self._get_cache_key(f"wallet:{user.wallet_address}"),
-                data,
-                expire=3600
-            )
-        
-        # Update username cache
-        if user.username:
-            await redis_client.set(
-                self._get_cache_key(f"username:{user.username}"),
-                data,
-                expire=3600
-            )
-        
-        # Clear related caches
-        await redis_client.clear_cache(f"{self.cache_prefix}search:*")
-        await redis_client.clear_cache(f"{self.cache_prefix}stats:{user.id}")
-
-    async def _calculate_average_rating(self, user: User) -> float:
-        """Calculate user's average rating."""
-        total_ratings = sum(len(agent.reviews) for agent in user.created_agents)
-        if total_ratings == 0:
-            return 0.0
-        
-        total_score = sum(
-            sum(review.rating for review in agent.reviews)
-            for agent in user.created_agents
-        )
-        return round(total_score / total_ratings, 2)
-
-    async def _calculate_total_revenue(self, user: User) -> float:
-        """Calculate user's total revenue."""
-        return sum(float(tx.amount) for tx in user.received_transactions)
+        # Update id, wallet and username caches
+        await self._cache_lookups(user)
 
 
     
+    @replica_read
     async def search_users(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         *, 
         query: str,
         skip: int = 0,
@@ -162,11 +164,11 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         
         cached_results = await redis_client.get(cache_key)
         if cached_results:
-            return [User(**user_data) for user_data in cached_results]
+            return [self._from_cache(item) for item in cached_results]
         
-        results = (
-            db.query(User)
-            .filter(
+        results = (await db.scalars(
+            select(User)
+            .where(
                 or_(
                     User.username.ilike(f"%{query}%"),
                     User.wallet_address.ilike(f"%{query}%")
@@ -174,37 +176,81 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             )
             .offset(skip)
             .limit(limit)
-            .all()
-        )
+        )).all()
         
         if results:
             await redis_client.set(
                 cache_key,
-                jsonable_encoder(results),
-                expire=300
+                self._to_cache_many(results),
+                expire=300,
+                tags=[self._get_tag("search")]
             )
         
         return results
         
-    def is_username_taken(self, db: Session, *, username: str) -> bool:
+    async def suggest(self, *, prefix: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Type-ahead suggestions of usernames for a partly typed name, best
+        reputation first, served from Redis alone; see CRUDAgent.suggest.
+        """
+        found = await redis_client.suggest_top(("users",), prefix, limit)
+        return {
+            "prefix": suggest_key(prefix),
+            "users": [
+                {"id": int(member), "username": label, "score": score}
+                for member, label, score in found["users"]
+            ]
+        }
+
+    async def _update_suggestions(self, objs: List[User]) -> None:
+        """Index users by username, ranked by reputation; users without one are dropped"""
+        await redis_client.suggest_add(
+            "users",
+            {str(obj.id): (obj.username, obj.reputation_score or 0) for obj in objs if obj.username}
+        )
+        await redis_client.suggest_remove("users", [str(obj.id) for obj in objs if not obj.username])
+
+    async def _remove_suggestions(self, ids: List[Any]) -> None:
+        await redis_client.suggest_remove("users", [str(id) for id in ids])
+
+    async def rebuild_suggestions(self, db: AsyncSession) -> int:
+        """Rebuild the username type-ahead index from the table; returns the names indexed"""
+        await redis_client.suggest_clear("users")
+        names = 0
+        rows = await db.stream(
+            select(User.id, User.username, User.reputation_score)
+            .where(User.username.isnot(None))
+            .execution_options(yield_per=1000)
+        )
+        async for partition in rows.partitions():
+            await redis_client.suggest_add(
+                "users",
+                {str(row.id): (row.username, row.reputation_score or 0) for row in partition}
+            )
+            names += len(partition)
+        return names
+
+    async def is_username_taken(self, db: AsyncSession, *, username: str) -> bool:
         """
         Check if a username is already taken.
         """
-        return db.query(
-            db.query(User)
-            .filter(User.username == username)
-            .exists()
-        ).scalar()
+        return await db.scalar(
+            select(
+                select(User.id)
+                .where(User.username == username)
+                .exists()
+            )
+        )
 
-    def deactivate(self, db: Session, *, user_id: int) -> User:
+    async def deactivate(self, db: AsyncSession, *, user_id: int) -> User:
         """
         Deactivate a user account.
         """
-        db_obj = self.get(db, id=user_id)
+        db_obj = await self.get_db_obj(db, id=user_id)
         db_obj.is_active = False
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
         return db_obj
 
 user = CRUDUser(User)
\ No newline at end of file
@@ -0,0 +1,92 @@
+import asyncio
+from collections import Counter
+from enum import Enum
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.core.redis import redis_client
+
+COUNTER_DELTAS_KEY = "synthr_counter_deltas"
+
+# Columns with per-value row counters, by table name
+COUNTED_COLUMNS: Dict[str, Tuple[str, ...]] = {}
+
+# Counter updates in flight, kept referenced until they finish
+_pending: Set[asyncio.Task] = set()
+
+def register_counted_columns(table: str, columns: Tuple[str, ...]) -> None:
+    """Maintain row counters for each value of columns, e.g. agents by category"""
+    COUNTED_COLUMNS[table] = columns
+
+def counter_name(table: str, column: str) -> str:
+    """Name of the counter hash of a column, e.g. agents:category"""
+    return f"{table}:{column}"
+
+def counter_field(value: Any) -> str:
+    """Hash field of a column value; enums count by value"""
+    if isinstance(value, Enum):
+        value = value.value
+    return str(value)
+
+def record_counter_deltas(
+    session_info: Dict[str, Any],
+    table: str,
+    rows: Iterable[Any],
+    sign: int,
+    columns: Optional[Iterable[str]] = None
+) -> None:
+    """
+    Count rows written outside the unit of work, e.g. by a bulk INSERT or
+    UPDATE ... RETURNING, which after_flush never sees: each row, an object
+    or a dict of column values, adds sign to the counters of its values.
+    columns limits this to some of the table's counted columns.
+    """
+    counted = COUNTED_COLUMNS.get(table, ())
+    if columns is not None:
+        counted = [column for column in counted if column in set(columns)]
+    if not counted:
+        return
+    deltas = session_info.setdefault(COUNTER_DELTAS_KEY, Counter())
+    for row in rows:
+        for column in counted:
+            value = row[column] if isinstance(row, dict) else getattr(row, column)
+            deltas[(counter_name(table, column), counter_field(value))] += sign
+
+@event.listens_for(Session, "after_flush")
+def _collect_counter_deltas(session: Session, flush_context: Any) -> None:
+    """Record how many rows each counted value gained or lost in this flush"""
+    deltas = session.info.setdefault(COUNTER_DELTAS_KEY, Counter())
+    for objs, sign in ((session.new, 1), (session.deleted, -1)):
+        for obj in objs:
+            table = getattr(obj, "__tablename__", None)
+            for column in COUNTED_COLUMNS.get(table, ()):
+                deltas[(counter_name(table, column), counter_field(getattr(obj, column)))] += sign
+
+    for obj in session.dirty:
+        table = getattr(obj, "__tablename__", None)
+        for column in COUNTED_COLUMNS.get(table, ()):
+            history = inspect(obj).attrs[column].history
+            for value in history.deleted:
+                deltas[(counter_name(table, column), counter_field(value))] -= 1
+            for value in history.added:
+                deltas[(counter_name(table, column), counter_field(value))] += 1
+
+@event.listens_for(Session, "after_commit")
+def _apply_counter_deltas(session: Session) -> None:
+    """Send the committed deltas to Redis without holding up the request"""
+    deltas = session.info.pop(COUNTER_DELTAS_KEY, None)
+    if not deltas:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sync scripts: counters catch up at their next reseed
+        return
+    task = loop.create_task(redis_client.incr_counters(deltas))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_counter_deltas(session: Session) -> None:
+    """Rolled-back rows never counted"""
+    session.info.pop(COUNTER_DELTAS_KEY, None)
@@ -1,26 +1,49 @@
-from typing import Generator
+from typing import AsyncGenerator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import AsyncSessionLocal
+from app.db.identity_map import IdentityMap, attach_identity_map, get_session_identity_map
+from app.db.replicas import pin_writer
+from app.core.config import settings
+from app.core.redis import redis_client
 from app.core.security import decode_jwt_token
 from app.services.auth.wallet import verify_wallet_signature
+from app.crud.user import user as user_crud
 
 security = HTTPBearer()
 
-def get_db() -> Generator:
+async def get_db() -> AsyncGenerator:
     """
     Database dependency to be used in routes.
-    Creates a new database session for each request and closes it afterwards.
+    Creates a new async database session for each request and closes it afterwards.
+    The session carries a request-scoped identity map for CRUD lookups;
+    get_identity_map exposes its stats.
     """
-    try:
-        db = SessionLocal()
+    async with AsyncSessionLocal() as db:
+        attach_identity_map(db)
         yield db
-    finally:
-        db.close()
+
+async def get_cache_batch() -> AsyncGenerator:
+    """
+    Dependency buffering the request's cache writes, flushed in a single
+    Redis pipeline when the handler finishes. Invalidations apply at once.
+    """
+    if not settings.CACHE_WRITE_BEHIND:
+        yield None
+        return
+    async with redis_client.batch() as batch:
+        yield batch
+
+def get_identity_map(db: AsyncSession = Depends(get_db)) -> IdentityMap:
+    """
+    Dependency exposing the request's identity map, e.g. to report
+    how many lookups it avoided.
+    """
+    return get_session_identity_map(db)
         
 async def get_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     token: HTTPAuthorizationCredentials = Depends(security)
 ) -> dict:
     """
@@ -38,10 +61,13 @@ async def get_current_user(
         if wallet_address is None:
             raise credentials_exception
         
-        # Getting user from DB
-        user = db.query(User).filter(User.wallet_address == wallet_address).first()
+        # Getting user through the identity map and cache
+        user = await user_crud.get_by_wallet(db, wallet_address=wallet_address, trust_bloom=False)
         if user is None:
             raise credentials_exception
+
+        # A user who just wrote reads from the primary until the replicas catch up
+        await pin_writer(db, f"user:{user.id}")
             
         return user
     except:
@@ -0,0 +1,68 @@
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+IDENTITY_MAP_KEY = "synthr_identity_map"
+
+# Marks a key that has not been resolved yet in this request
+MISSING = object()
+
+class IdentityMap:
+    """
+    Request-scoped memo of CRUD lookups, keyed by cache key.
+    Repeated get/get_by_wallet/get_by_token_id calls within one request are
+    answered from memory; every commit on the owning session clears it.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        """Get a resolved lookup (possibly None), or MISSING"""
+        value = self._entries.get(key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def add(self, key: str, value: Any) -> None:
+        """Remember the result of a lookup, including misses"""
+        self._entries[key] = value
+
+    def clear(self) -> None:
+        """Forget every lookup"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Lookups answered from memory vs resolved through Redis or Postgres"""
+        return {
+            "avoided_lookups": self.hits,
+            "resolved_lookups": self.misses,
+            "size": len(self._entries)
+        }
+
+def attach_identity_map(db: AsyncSession) -> IdentityMap:
+    """Give a session its own identity map"""
+    identity_map = IdentityMap()
+    db.info[IDENTITY_MAP_KEY] = identity_map
+    return identity_map
+
+def get_session_identity_map(db: Optional[AsyncSession]) -> Optional[IdentityMap]:
+    """The identity map of a session, if one was attached"""
+    if db is None:
+        return None
+    return db.info.get(IDENTITY_MAP_KEY)
+
+@event.listens_for(Session, "after_commit")
+def _clear_identity_map(session: Session) -> None:
+    """
+    Rows may have changed; later lookups in the request must re-resolve.
+    Fires for the sync Session wrapped by each AsyncSession, which shares its info.
+    """
+    identity_map = session.info.get(IDENTITY_MAP_KEY)
+    if identity_map is not None:
+        identity_map.clear()
@@ -0,0 +1,214 @@
+import asyncio
+import functools
+import itertools
+import math
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, TypeVar
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from app.core.config import settings
+from app.core.redis import current_ttl_bound, redis_client, ttl_bound
+
+# Set while a read-only CRUD method runs; its queries may go to a replica
+_replica_reads: ContextVar[bool] = ContextVar("synthr_replica_reads", default=False)
+
+# Session.info flag: the session has written, or serves a client that wrote
+# recently, so its reads stay on the primary
+PINNED_KEY = "synthr_pinned_to_primary"
+
+# Session.info keys: the client the session serves, e.g. "user:42", and
+# whether the session itself has written
+WRITER_KEY = "synthr_writer"
+WROTE_KEY = "synthr_wrote"
+
+# Marker of a client that committed a write in the last pin_seconds()
+PIN_PREFIX = "synthr:replica:pinned:"
+
+# Clients that wrote through this worker, to the monotonic time their pin ends
+_recent_writers: Dict[str, float] = {}
+
+# Pin markers being written, kept referenced until they finish
+_pending: Set[asyncio.Task] = set()
+
+# Seconds a replica's last replayed transaction trails the primary; 0 when caught up
+LAG_SQL = text("""
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+""")
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+class ReplicaPool:
+    """
+    Async engines for the read replicas, handed out round-robin among those
+    that passed their last health check: reachable and lagging the primary
+    by at most DATABASE_REPLICA_MAX_LAG seconds.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.engines: List[AsyncEngine] = [
+            create_async_engine(
+                url,
+                pool_pre_ping=True,
+                pool_size=10,
+                max_overflow=20,
+                echo=settings.SQL_DEBUG
+            )
+            for url in urls
+        ]
+        self.healthy = [True] * len(self.engines)
+        self._next = itertools.count()
+        self._checker: Optional[asyncio.Task] = None
+        for index, engine in enumerate(self.engines):
+            event.listen(engine.sync_engine, "handle_error", self._on_error(index))
+
+    def _on_error(self, index: int) -> Callable[[Any], None]:
+        """Take a replica out of rotation as soon as a query finds it unreachable"""
+        def handle_error(context: Any) -> None:
+            if context.is_disconnect:
+                self.healthy[index] = False
+        return handle_error
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """Next healthy replica, or None to use the primary"""
+        for _ in range(len(self.engines)):
+            index = next(self._next) % len(self.engines)
+            if self.healthy[index]:
+                return self.engines[index]
+        return None
+
+    async def _check(self, index: int) -> bool:
+        try:
+            async with self.engines[index].connect() as conn:
+                lag = await asyncio.wait_for(
+                    conn.scalar(LAG_SQL),
+                    timeout=settings.DATABASE_REPLICA_CHECK_TIMEOUT
+                )
+            return float(lag) <= settings.DATABASE_REPLICA_MAX_LAG
+        except Exception as e:
+            print(f"Replica {index} health check failed: {e}")
+            return False
+
+    async def check(self) -> None:
+        """Check every replica once, concurrently"""
+        results = await asyncio.gather(*[self._check(index) for index in range(len(self.engines))])
+        self.healthy = list(results)
+
+    async def _check_forever(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.DATABASE_REPLICA_CHECK_INTERVAL)
+
+    def start_health_checks(self) -> None:
+        """Start the background health check loop, if there are replicas"""
+        if self.engines and self._checker is None:
+            self._checker = asyncio.create_task(self._check_forever())
+
+    async def close(self) -> None:
+        """Stop health checks and dispose every replica engine"""
+        if self._checker is not None:
+            self._checker.cancel()
+            try:
+                await self._checker
+            except asyncio.CancelledError:
+                pass
+            self._checker = None
+        for engine in self.engines:
+            await engine.dispose()
+
+replicas = ReplicaPool(settings.ASYNC_REPLICA_URLS)
+
+def pin_seconds() -> int:
+    """How long after a write a healthy replica may still be missing it"""
+    return math.ceil(settings.DATABASE_REPLICA_MAX_LAG) + settings.DATABASE_REPLICA_CHECK_INTERVAL
+
+async def pin_writer(db: AsyncSession, writer: str) -> None:
+    """
+    Attribute the session's writes to writer, and keep its reads on the
+    primary if writer committed a write through any worker in the last
+    pin_seconds(), so a client reads its own writes across requests.
+    """
+    db.info[WRITER_KEY] = writer
+    if not replicas.engines:
+        return
+    if _recent_writers.get(writer, 0) > time.monotonic() or await redis_client.exists(f"{PIN_PREFIX}{writer}"):
+        db.info[PINNED_KEY] = True
+
+def replica_read(method: F) -> F:
+    """
+    Mark a read-only CRUD coroutine: its queries go to a replica unless the
+    session is pinned to the primary. Background tasks it starts inherit the
+    mark. Cache entries written after reading from a replica expire within
+    DATABASE_REPLICA_MAX_LAG seconds, so results a lagging replica returned
+    right after an invalidation do not outlive the lag.
+    """
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = _replica_reads.set(True)
+        try:
+            with ttl_bound():
+                return await method(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return wrapper
+
+class RoutingSession(Session):
+    """
+    Session sending the queries of replica_read methods to a replica.
+    Writes, flushes and every query after the session's first write use
+    the primary, so a request reads its own writes.
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Any:
+        if (
+            _replica_reads.get()
+            and not self._flushing
+            and not self.info.get(PINNED_KEY)
+            and not isinstance(clause, UpdateBase)
+        ):
+            replica = replicas.choose()
+            if replica is not None:
+                bound = current_ttl_bound()
+                if bound is not None:
+                    bound.limit(max(1, math.ceil(settings.DATABASE_REPLICA_MAX_LAG)))
+                return replica.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_after_flush(session: Session, flush_context: Any) -> None:
+    session.info[PINNED_KEY] = True
+    session.info[WROTE_KEY] = True
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _pin_on_write(orm_execute_state: Any) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[PINNED_KEY] = True
+        orm_execute_state.session.info[WROTE_KEY] = True
+
+@event.listens_for(RoutingSession, "after_commit")
+def _pin_writer_after_commit(session: Session) -> None:
+    """Keep the client's next requests, in any worker, on the primary"""
+    writer = session.info.get(WRITER_KEY)
+    if not session.info.pop(WROTE_KEY, False) or writer is None or not replicas.engines:
+        return
+    now = time.monotonic()
+    if len(_recent_writers) > 10000:
+        for expired in [key for key, until in _recent_writers.items() if until <= now]:
+            del _recent_writers[expired]
+    _recent_writers[writer] = now + pin_seconds()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(redis_client.set_flag(f"{PIN_PREFIX}{writer}", pin_seconds()))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_rolled_back_write(session: Session) -> None:
+    session.info.pop(WROTE_KEY, None)
@@ -0,0 +1,225 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import String, cast, delete, func, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+GRANULARITIES = ("hour", "day")
+
+# Dimension value of the rows that total every source row
+ALL = ""
+
+# Rollups by fact table name, for the rebuild command
+ROLLUPS: Dict[str, "Rollup"] = {}
+
+class Rollup:
+    """
+    Hourly and daily fact table kept in step with a source table.
+
+    source() selects one row per source record with an id, an event_time,
+    the dimension columns and the measures. Every record adds its measures
+    to one bucket per granularity, once for the ALL row and once for each
+    dimension value it has. dimensions pairs a dimension name with a source
+    column; a dimension may be fed by several columns (e.g. buyer and
+    seller), a record counting once per distinct value. contributes, when
+    given, tells from a row's column values whether source() selects it at
+    all, so writes to rows it skips never touch the fact table.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        source: Callable[[], Select],
+        *,
+        dimensions: Tuple[Tuple[str, str], ...],
+        measures: Tuple[str, ...],
+        columns: Tuple[str, ...],
+        contributes: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ):
+        self.model = model
+        self.source = source
+        self.dimensions = dimensions
+        self.measures = measures
+        # Source row columns the facts depend on; other updates skip the rollup
+        self.columns = columns
+        self._contributes = contributes
+        self.tag = f"rollup:{model.__tablename__}"
+        ROLLUPS[model.__tablename__] = self
+
+    def _contributions(
+        self,
+        src: Any,
+        granularity: str,
+        dimension: Optional[Tuple[str, str]],
+        sign: int = 1
+    ) -> Select:
+        """Bucketed measure sums of the source rows for one granularity and dimension"""
+        bucket = func.date_trunc(granularity, src.c.event_time)
+        if dimension is None:
+            name, value = literal("all"), literal(ALL, String)
+            conditions, group_by = [], [bucket]
+        else:
+            name, column = literal(dimension[0]), dimension[1]
+            value = cast(src.c[column], String)
+            conditions = [src.c[column].isnot(None)]
+            # Count a record once when two columns feed the same dimension
+            for other_name, other in self.dimensions:
+                if other == column:
+                    break
+                if other_name == dimension[0]:
+                    conditions.append(src.c[column].is_distinct_from(src.c[other]))
+            group_by = [bucket, value]
+
+        return (
+            select(
+                literal(granularity).label("granularity"),
+                bucket.label("bucket"),
+                name.label("dimension"),
+                value.label("dimension_value"),
+                *[
+                    (sign * func.coalesce(func.sum(src.c[measure]), 0)).label(measure)
+                    for measure in self.measures
+                ]
+            )
+            .where(*conditions)
+            .group_by(*group_by)
+        )
+
+    def _upsert(self, query: Select):
+        """Add query's measures to existing fact rows, inserting missing ones"""
+        key = ["granularity", "bucket", "dimension", "dimension_value"]
+        # Aggregation leaves row order undefined; lock fact rows in one fixed
+        # order so concurrent writes sharing hot rows cannot deadlock
+        query = query.order_by(*[query.selected_columns[column] for column in key])
+        stmt = insert(self.model).from_select([*key, *self.measures], query)
+        return stmt.on_conflict_do_update(
+            index_elements=["granularity", "bucket", "dimension", "dimension_value"],
+            set_={
+                **{
+                    measure: getattr(self.model, measure) + getattr(stmt.excluded, measure)
+                    for measure in self.measures
+                },
+                "updated_at": func.now()
+            }
+        )
+
+    async def apply(self, db: AsyncSession, ids: Sequence[Any], sign: int) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) the facts of the source records ids
+        as currently stored, in one statement. Removing must run before the
+        new values are flushed; adding after.
+        """
+        facts = self.source().subquery()
+        src = select(facts).where(facts.c.id.in_(ids)).subquery()
+        contributions = union_all(*[
+            self._contributions(src, granularity, dimension, sign)
+            for granularity in GRANULARITIES
+            for dimension in (None, *self.dimensions)
+        ]).subquery()
+        # Columns feeding one dimension can hit the same fact row; add them up first
+        key = [contributions.c[column] for column in ("granularity", "bucket", "dimension", "dimension_value")]
+        query = select(
+            *key,
+            *[func.sum(contributions.c[measure]).label(measure) for measure in self.measures]
+        ).group_by(*key)
+        await db.execute(self._upsert(query))
+
+    def contributes(self, row: Any) -> bool:
+        """Whether a source row, an object or a dict of column values, has facts"""
+        if self._contributes is None:
+            return True
+        if not isinstance(row, dict):
+            row = {column: getattr(row, column) for column in self.columns}
+        return self._contributes(row)
+
+    def changed(self, old: Optional[Dict[str, Any]], new: Optional[Any]) -> bool:
+        """Whether a write can change this rollup's facts"""
+        if not any(row is not None and self.contributes(row) for row in (old, new)):
+            return False
+        if old is None or new is None:
+            return True
+        return any(old[column] != getattr(new, column) for column in self.columns)
+
+    async def rebuild(self, db: AsyncSession, *, since: Optional[datetime] = None) -> None:
+        """
+        Recompute the fact table from the source, entirely or from the day of
+        since onward, one set-based statement per granularity and dimension.
+        """
+        facts = self.source().subquery()
+        source = select(facts)
+        clear = delete(self.model)
+        if since is not None:
+            start = func.date_trunc("day", since)
+            source = source.where(facts.c.event_time >= start)
+            clear = clear.where(self.model.bucket >= start)
+        src = source.subquery()
+
+        await db.execute(clear)
+        for granularity in GRANULARITIES:
+            for dimension in (None, *self.dimensions):
+                await db.execute(self._upsert(self._contributions(src, granularity, dimension)))
+        await db.commit()
+
+    async def totals(
+        self,
+        db: AsyncSession,
+        *,
+        dimension: str = "all",
+        value: Any = ALL,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Measure sums over the daily buckets of one dimension value"""
+        query = select(*[
+            func.coalesce(func.sum(getattr(self.model, measure)), 0).label(measure)
+            for measure in self.measures
+        ]).where(*self._bucket_conditions("day", dimension, value, since, until))
+        return (await db.execute(query)).one()._asdict()
+
+    async def series(
+        self,
+        db: AsyncSession,
+        *,
+        granularity: str = "day",
+        dimension: str = "all",
+        value: Any = ALL,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Fact rows of one dimension value, oldest bucket first"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown rollup granularity: {granularity}")
+        query = (
+            select(self.model.bucket, *[getattr(self.model, measure) for measure in self.measures])
+            .where(*self._bucket_conditions(granularity, dimension, value, since, until))
+            .order_by(self.model.bucket)
+        )
+        return [row._asdict() for row in (await db.execute(query)).all()]
+
+    def _bucket_conditions(
+        self,
+        granularity: str,
+        dimension: str,
+        value: Any,
+        since: Optional[datetime],
+        until: Optional[datetime]
+    ) -> List[Any]:
+        """Filters selecting one dimension value's buckets in [since, until)"""
+        conditions = [
+            self.model.granularity == granularity,
+            self.model.dimension == dimension,
+            self.model.dimension_value == dimension_value(value)
+        ]
+        if since is not None:
+            conditions.append(self.model.bucket >= func.date_trunc(granularity, since))
+        if until is not None:
+            conditions.append(self.model.bucket < until)
+        return conditions
+
+def dimension_value(value: Any) -> str:
+    """Stored form of a dimension value; enums are stored by name, like their columns"""
+    if isinstance(value, Enum):
+        return value.name
+    return str(value)
@@ -1,8 +1,10 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.replicas import RoutingSession
 
-# Create database engine
+# Create database engine for scripts and migrations
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -12,4 +14,22 @@ engine = create_engine(
 )
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Create async database engine used by the API and the CRUD layer
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+    echo=settings.SQL_DEBUG
+)
+
+# Create async session factory; rows stay readable after commit without a reload,
+# and replica_read CRUD methods query a read replica when one is configured
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False
+)
\ No newline at end of file
@@ -1,13 +1,23 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from ..core.config import settings
+from app import crud
+from app.core.redis import redis_client
+from app.db.deps import get_cache_batch
+from app.crud.agent_embeddings import agent_embeddings
+from app.crud.agent_index import agent_index
+from app.crud.agent_leaderboards import agent_leaderboards
+from app.db.replicas import replicas
+from app.db.session import AsyncSessionLocal, async_engine
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description=settings.DESCRIPTION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    # Each request's cache writes go to Redis in one pipeline at the end
+    dependencies=[Depends(get_cache_batch)]
 )
 
 # Set up CORS
@@ -28,6 +38,35 @@ app.include_router(training.router, prefix=settings.API_V1_STR)
 app.include_router(users.router, prefix=settings.API_V1_STR)
 app.include_router(transactions.router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+async def startup():
+    redis_client.start_invalidation_listener()
+    replicas.start_health_checks()
+
+    # The Bloom filters of known wallets and token ids load once the listener
+    # has subscribed, and reload after every reconnect
+    async with AsyncSessionLocal() as db:
+        # Agent searches without a text query, and facet counts, are served from memory
+        if settings.AGENT_INDEX_ENABLED:
+            await agent_index.load(db)
+
+        # Vectors for similar-agent search; agents written from now on are embedded in the background
+        if settings.EMBEDDING_ENABLED:
+            await agent_embeddings.load(db)
+    agent_index.start_reloads()
+    agent_embeddings.start()
+    # Leaderboards are rebuilt from the database by one worker per interval
+    agent_leaderboards.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await redis_client.close()
+    await replicas.close()
+    await agent_index.close()
+    await agent_embeddings.close()
+    await agent_leaderboards.close()
+    await async_engine.dispose()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to SYNTHR API"}
\ No newline at end of file
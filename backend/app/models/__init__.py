@@ -3,4 +3,7 @@ from .user import User
 from .agent import Agent, AgentStatus, AgentCategory
 from .ai_model import AIModel, ModelType, ModelStatus
 from .training import TrainingJob, TrainingStatus
-from .transaction import Transaction
\ No newline at end of file
+from .transaction import Transaction
+from .review import Review
+from .rollup import TransactionRollup, TrainingRollup, ModelRollup
+from .agent_embedding import AgentEmbedding
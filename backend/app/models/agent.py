@@ -1,8 +1,12 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Numeric, JSON, Enum, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, ForeignKey, Numeric, JSON, Enum, Boolean, Index
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 import enum
 from .base import Base, TimestampedBase
 
+# Review counts per whole star, 0 through 5
+RATING_BUCKETS = 6
+
 class AgentStatus(str, enum.Enum):
     DRAFT = "draft"
     TRAINING = "training"
@@ -21,6 +25,25 @@ class AgentCategory(str, enum.Enum):
 
 class Agent(Base, TimestampedBase):
     __tablename__ = "agents"
+    __table_args__ = (
+        # Listing and search shapes, each ordered by (created_at, id)
+        Index("ix_agents_owner_id_created_at", "owner_id", "created_at", "id"),
+        Index("ix_agents_creator_id_created_at", "creator_id", "created_at", "id"),
+        Index("ix_agents_category_created_at", "category", "created_at", "id"),
+        Index("ix_agents_status_created_at", "status", "created_at", "id"),
+        Index("ix_agents_category_price", "category", "price"),
+        Index("ix_agents_created_at", "created_at", "id"),
+        # Substring search (ilike '%q%')
+        Index("ix_agents_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "ix_agents_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"}
+        ),
+        # Full-text search
+        Index("ix_agents_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     # Basic Information
     token_id = Column(String(100), unique=True, index=True)
@@ -48,6 +71,12 @@ class Agent(Base, TimestampedBase):
     total_uses = Column(Integer, default=0)
     average_rating = Column(Numeric(precision=3, scale=2), default=0)
     total_ratings = Column(Integer, default=0)
+    rating_sum = Column(Numeric(precision=12, scale=1), default=0)
+    rating_histogram = Column(ARRAY(Integer), default=lambda: [0] * RATING_BUCKETS)
+    
+    # Search document: name (A), capabilities (B), description (C) and category (D),
+    # kept up to date by the agents_search_vector_update trigger; never loaded by default
+    search_vector = deferred(Column(TSVECTOR))
     
     # Relationships
     creator = relationship("User", back_populates="created_agents", foreign_keys=[creator_id])
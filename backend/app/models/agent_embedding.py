@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, func
+from .base import Base
+
+class AgentEmbedding(Base):
+    """
+    Text embedding of an agent's name, description and capabilities, as
+    little-endian float16 bytes. content_hash identifies the embedded text
+    and model, so unchanged agents are not encoded again.
+    """
+    __tablename__ = "agent_embeddings"
+
+    agent_id = Column(Integer, ForeignKey("agents.id", ondelete="CASCADE"), primary_key=True)
+    model = Column(String(200), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, JSON, Enum
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 from .base import Base, TimestampedBase
@@ -18,6 +18,9 @@ class ModelStatus(str, enum.Enum):
 
 class AIModel(Base, TimestampedBase):
     __tablename__ = "ai_models"
+    __table_args__ = (
+        Index("ix_ai_models_model_type_created_at", "model_type", "created_at", "id"),
+    )
 
     agent_id = Column(Integer, ForeignKey("agents.id"), unique=True)
     model_type = Column(Enum(ModelType), nullable=False)
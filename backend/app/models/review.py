@@ -1,9 +1,14 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Numeric, Boolean
+from sqlalchemy import Column, String, Integer, ForeignKey, Numeric, Boolean, Index
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampedBase
 
 class Review(Base, TimestampedBase):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("ix_reviews_agent_id_created_at", "agent_id", "created_at", "id"),
+        Index("ix_reviews_reviewer_id_created_at", "reviewer_id", "created_at", "id"),
+        Index("ix_reviews_agent_creator_id_created_at", "agent_creator_id", "created_at", "id"),
+    )
 
     agent_id = Column(Integer, ForeignKey("agents.id"))
     reviewer_id = Column(Integer, ForeignKey("users.id"))
@@ -0,0 +1,47 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, Integer, Numeric, String, func
+from .base import Base
+
+class RollupKey:
+    """
+    Key of a fact table row: the measures of one hour or day bucket for one
+    dimension value, e.g. ("day", "category", "TRADING", 2026-10-17).
+    The "all" dimension, with an empty value, totals every row.
+    """
+    # Key order serves both totals and time ranges of one dimension value
+    granularity = Column(String(10), primary_key=True)
+    dimension = Column(String(20), primary_key=True)
+    dimension_value = Column(String(100), primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+class TransactionRollup(Base, RollupKey):
+    """Transactions by creation time, per agent category and participating user"""
+    __tablename__ = "transaction_rollups"
+
+    transactions = Column(Integer, nullable=False, default=0)
+    volume = Column(Numeric(precision=28, scale=8), nullable=False, default=0)
+
+class TrainingRollup(Base, RollupKey):
+    """Completed training jobs by creation time, per model type, agent category, owner and agent"""
+    __tablename__ = "training_rollups"
+
+    jobs = Column(Integer, nullable=False, default=0)
+    compute_time = Column(BigInteger, nullable=False, default=0)  # in seconds
+    timed_jobs = Column(Integer, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0)
+    scored_jobs = Column(Integer, nullable=False, default=0)
+
+class ModelRollup(Base, RollupKey):
+    """AI models by creation time, per model type, agent category and owner"""
+    __tablename__ = "model_rollups"
+
+    models = Column(Integer, nullable=False, default=0)
+    accuracy_sum = Column(Float, nullable=False, default=0)
+    scored_models = Column(Integer, nullable=False, default=0)
+
+    # Models currently in each ModelStatus
+    initializing = Column(Integer, nullable=False, default=0)
+    training = Column(Integer, nullable=False, default=0)
+    validating = Column(Integer, nullable=False, default=0)
+    ready = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
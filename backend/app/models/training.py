@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, JSON, Enum, Float
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON, Enum, Float, Index
 from sqlalchemy.orm import relationship
 import enum
 from .base import Base, TimestampedBase
@@ -12,6 +12,10 @@ class TrainingStatus(str, enum.Enum):
 
 class TrainingJob(Base, TimestampedBase):
     __tablename__ = "training_jobs"
+    __table_args__ = (
+        Index("ix_training_jobs_agent_id_created_at", "agent_id", "created_at", "id"),
+        Index("ix_training_jobs_status", "status"),
+    )
 
     agent_id = Column(Integer, ForeignKey("agents.id"))
     model_id = Column(Integer, ForeignKey("ai_models.id"))
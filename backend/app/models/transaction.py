@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Numeric, JSON, Enum
+from sqlalchemy import Column, String, Integer, ForeignKey, Numeric, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 from .base import Base, TimestampedBase
@@ -17,6 +17,11 @@ class TransactionType(str, enum.Enum):
 
 class Transaction(Base, TimestampedBase):
     __tablename__ = "transactions"
+    __table_args__ = (
+        Index("ix_transactions_buyer_id_created_at", "buyer_id", "created_at", "id"),
+        Index("ix_transactions_seller_id_created_at", "seller_id", "created_at", "id"),
+        Index("ix_transactions_status", "status"),
+    )
 
     # Transaction Details
     agent_id = Column(Integer, ForeignKey("agents.id"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, Table, JSON
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, Table, JSON, Index
 from sqlalchemy.orm import relationship
 from .base import Base, TimestampedBase
 
@@ -15,6 +15,16 @@ oauth_accounts = Table(
 
 class User(Base, TimestampedBase):
     __tablename__ = "users"
+    __table_args__ = (
+        # Substring search (ilike '%q%')
+        Index("ix_users_username_trgm", "username", postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"}),
+        Index(
+            "ix_users_wallet_address_trgm",
+            "wallet_address",
+            postgresql_using="gin",
+            postgresql_ops={"wallet_address": "gin_trgm_ops"}
+        ),
+    )
     
     # Basic Info
     username = Column(String(100), unique=True, index=True)
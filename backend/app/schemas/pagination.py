@@ -12,6 +12,7 @@ class PaginationParams(BaseSchema):
 
 class PageInfo(BaseSchema):
     total: int
+    total_is_estimate: bool = False
     page: int
     size: int
     pages: int
@@ -20,4 +21,17 @@ class PageInfo(BaseSchema):
 
 class PaginatedData(BaseModel, Generic[T]):
     data: List[T]
-    page_info: PageInfo
\ No newline at end of file
+    page_info: PageInfo
+
+class CursorParams(BaseSchema):
+    cursor: Optional[str] = Field(default=None, description="next_cursor of the previous page")
+    size: int = Field(default=10, ge=1, le=100, description="Items per page")
+
+class CursorPageInfo(BaseSchema):
+    size: int
+    next_cursor: Optional[str] = None
+    has_next: bool
+
+class CursorPaginatedData(BaseModel, Generic[T]):
+    data: List[T]
+    page_info: CursorPageInfo
@@ -0,0 +1,61 @@
+from typing import List, Optional
+import asyncio
+import numpy as np
+import torch
+from transformers import AutoModel, AutoTokenizer, PreTrainedModel, PreTrainedTokenizer
+
+class TextEncoder:
+    """
+    Sentence encoder turning texts into unit-length float32 vectors, so a
+    dot product is their cosine similarity. Meant for a small model such as
+    sentence-transformers/all-MiniLM-L6-v2, which runs on CPU.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_length: int = 256,
+        device: str = "cuda" if torch.cuda.is_available() else "cpu"
+    ):
+        self.model_name = model_name
+        self.max_length = max_length
+        self.device = device
+        self.tokenizer: Optional[PreTrainedTokenizer] = None
+        self.model: Optional[PreTrainedModel] = None
+
+    def load_model(self) -> None:
+        """Load the model and tokenizer"""
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self.model = AutoModel.from_pretrained(self.model_name)
+        self.model.to(self.device)
+        self.model.eval()
+
+    @property
+    def dimension(self) -> int:
+        if self.model is None:
+            self.load_model()
+        return self.model.config.hidden_size
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Mean-pooled, L2-normalized embeddings of texts, one row each"""
+        if self.model is None:
+            self.load_model()
+        inputs = self.tokenizer(
+            texts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=self.max_length
+        ).to(self.device)
+
+        with torch.inference_mode():
+            hidden = self.model(**inputs).last_hidden_state
+        # Average the token vectors, ignoring padding
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+        return pooled.cpu().numpy().astype(np.float32)
+
+    async def encode_async(self, texts: List[str]) -> np.ndarray:
+        """encode in a worker thread, so inference never blocks the event loop"""
+        return await asyncio.to_thread(self.encode, texts)
@@ -1,5 +1,5 @@
 from typing import Optional, Tuple
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.auth.jwt import jwt_service
 from app.services.auth.wallet import wallet_service
@@ -14,7 +14,7 @@ class AuthService:
     
     async def init_wallet_auth(
         self,
-        db: Session,
+        db: AsyncSession,
         wallet_address: str
     ) -> Tuple[str, str]:
         """
@@ -42,7 +42,7 @@ class AuthService:
 
     async def verify_wallet_auth(
         self,
-        db: Session,
+        db: AsyncSession,
         wallet_address: str,
         signature: str,
         nonce: str
@@ -0,0 +1,141 @@
+import asyncio
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+from dotenv import load_dotenv
+from sqlalchemy import and_, desc, func, select
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app import crud  # noqa
+from app.crud.agent_index import agent_index  # noqa
+from app.db.session import AsyncSessionLocal, async_engine  # noqa
+from app.models.agent import Agent, AgentCategory, AgentStatus  # noqa
+from benchmark_query_indexes import AGENTS, connect, seed  # noqa  (same 1M seeded agents)
+
+RUNS = 50
+PAGE_SIZE = 20
+
+# (label, search_agents filters) from browsing to narrow, deep-page searches
+SEARCHES = [
+    ("newest", {}),
+    ("category by price", {"category": AgentCategory.TRADING, "order_by": "price", "order_desc": False}),
+    ("price band by rating", {"min_price": Decimal(10), "max_price": Decimal(50), "order_by": "average_rating"}),
+    ("status + category", {"category": AgentCategory.ANALYTICS, "status": AgentStatus.LISTED}),
+    ("deep page", {"status": AgentStatus.LISTED, "skip": 50_000}),
+]
+
+def sql_query(filters: dict):
+    """search_agents' SQL on a cache miss, for one page"""
+    conditions = crud.agent._search_conditions(
+        None,
+        filters.get("category"),
+        filters.get("min_price"),
+        filters.get("max_price"),
+        filters.get("status"),
+        None
+    )
+    order_col = getattr(Agent, filters.get("order_by", "created_at"))
+    id_col = Agent.id
+    if filters.get("order_desc", True):
+        order_col, id_col = desc(order_col), desc(id_col)
+    statement = select(Agent.id).order_by(order_col, id_col)
+    if conditions:
+        statement = statement.where(and_(*conditions))
+    return statement.offset(filters.get("skip", 0)).limit(PAGE_SIZE)
+
+def index_search(filters: dict) -> list:
+    equals, ranges = crud.agent._index_filters(
+        filters.get("category"),
+        filters.get("min_price"),
+        filters.get("max_price"),
+        filters.get("status"),
+        None
+    )
+    return agent_index.index.search(
+        equals=equals,
+        ranges=ranges,
+        order_by=filters.get("order_by", "created_at"),
+        descending=filters.get("order_desc", True),
+        skip=filters.get("skip", 0),
+        limit=PAGE_SIZE
+    )[0]
+
+def index_facets() -> None:
+    index = agent_index.index
+    index.counts("category")
+    index.counts("status")
+    index.histogram("price")
+
+def time_sync(call) -> dict:
+    call()  # warm up
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"p50": statistics.median(timings), "p95": sorted(timings)[int(RUNS * 0.95) - 1]}
+
+async def time_async(call) -> dict:
+    await call()  # warm up
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"p50": statistics.median(timings), "p95": sorted(timings)[int(RUNS * 0.95) - 1]}
+
+def report(label: str, index: dict, sql: dict) -> None:
+    print(
+        f"   - {label:<22} index p50 {index['p50']:8.3f} ms  p95 {index['p95']:8.3f} ms   "
+        f"SQL p50 {sql['p50']:8.2f} ms  p95 {sql['p95']:8.2f} ms"
+    )
+
+async def run() -> None:
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        await agent_index.load(db)
+        print(f"\n✅ Loaded {len(agent_index.index):,} agents into the index in {time.perf_counter() - start:.2f}s")
+        print(f"\n⏱  Agent search and facets over {AGENTS:,} agents, {RUNS} runs each\n")
+
+        mismatches = 0
+        for label, filters in SEARCHES:
+            statement = sql_query(filters)
+            ids = index_search(filters)
+            if ids != list((await db.scalars(statement)).all()):
+                mismatches += 1
+                print(f"   ❌ {label}: index and SQL pages differ")
+            report(
+                label,
+                time_sync(lambda: index_search(filters)),
+                await time_async(lambda: db.execute(statement))
+            )
+
+        async def sql_facets():
+            for column in (Agent.category, Agent.status):
+                await db.execute(select(column, func.count()).group_by(column))
+            await db.execute(select(func.min(Agent.price), func.max(Agent.price)))
+        report("facets", time_sync(index_facets), await time_async(sql_facets))
+    await async_engine.dispose()
+
+    if mismatches:
+        print(f"\n❌ {mismatches} of {len(SEARCHES)} searches returned different pages")
+    else:
+        print(f"\n✅ Every index page matched SQL")
+
+def main():
+    conn = connect()
+    try:
+        seed(conn)
+    finally:
+        conn.close()
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
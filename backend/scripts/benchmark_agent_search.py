@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import hashlib
+import statistics
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+from sqlalchemy import desc, or_, select
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app import crud  # noqa
+from app.db.session import AsyncSessionLocal, async_engine  # noqa
+from app.models.agent import Agent  # noqa
+from benchmark_query_indexes import AGENTS, connect, seed  # noqa  (same 1M seeded agents)
+
+RUNS = 50
+PAGE_SIZE = 20
+
+def name_hash(i: int) -> str:
+    """The md5 fragment in the name of seeded agent i"""
+    return hashlib.md5(str(i).encode()).hexdigest()[:8]
+
+# (label, query, prefix) covering rare, common, multi-word and type-ahead searches
+SEARCHES = [
+    ("rare term", name_hash(4242), False),
+    ("common term", "oracle", False),
+    ("either term", "sentiment or ledger", False),
+    ("phrase", '"seeded agent"', False),
+    ("type-ahead common", "orac", True),
+    ("type-ahead rare", name_hash(4242)[:5], True),
+]
+
+def ilike_query(query: str):
+    """The previous search_agents filter: unranked substring match"""
+    return (
+        select(Agent)
+        .where(or_(Agent.name.ilike(f"%{query}%"), Agent.description.ilike(f"%{query}%")))
+        .order_by(desc(Agent.created_at), desc(Agent.id))
+        .limit(PAGE_SIZE)
+    )
+
+def ranked_query(query: str, prefix: bool):
+    """search_agents_ranked's query, without its cache"""
+    return crud.agent._ranked_search_query(
+        query, None, None, None, None, None,
+        prefix=prefix, skip=0, limit=PAGE_SIZE
+    )
+
+async def measure(db, statement) -> dict:
+    await db.execute(statement)  # warm up
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        (await db.execute(statement)).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[int(len(timings) * 0.95) - 1]
+    }
+
+async def run(target_ms: float) -> None:
+    print(f"\n⏱  Agent search over {AGENTS:,} agents, {RUNS} runs each, p95 target {target_ms:.0f} ms\n")
+    misses = 0
+    async with AsyncSessionLocal() as db:
+        for label, query, prefix in SEARCHES:
+            ranked = await measure(db, ranked_query(query, prefix))
+            ilike = await measure(db, ilike_query(query.strip('"')))
+            ok = ranked["p95"] <= target_ms
+            misses += not ok
+            print(
+                f"   {'✅' if ok else '❌'} {label:<18} {query!r:<24} "
+                f"ranked p50 {ranked['p50']:7.2f} ms  p95 {ranked['p95']:7.2f} ms   "
+                f"ilike p50 {ilike['p50']:7.2f} ms  p95 {ilike['p95']:7.2f} ms"
+            )
+    await async_engine.dispose()
+
+    if misses:
+        print(f"\n❌ {misses} of {len(SEARCHES)} searches missed the p95 target")
+    else:
+        print(f"\n✅ Every search met the p95 target")
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of full-text agent search against ilike")
+    parser.add_argument("--target-ms", type=float, default=50.0, help="p95 latency target in ms")
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        seed(conn)
+    finally:
+        conn.close()
+    asyncio.run(run(args.target_ms))
+
+if __name__ == "__main__":
+    main()
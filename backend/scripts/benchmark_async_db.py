@@ -0,0 +1,72 @@
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine, engine  # noqa
+from app.models.agent import Agent  # noqa
+
+CONCURRENCY = 200
+ROUNDS = 5
+PAGE_SIZE = 20
+
+def agents_page(index: int):
+    """The uncached query behind one simulated request"""
+    return (
+        select(Agent)
+        .order_by(Agent.id)
+        .offset((index * PAGE_SIZE) % 10_000)
+        .limit(PAGE_SIZE)
+    )
+
+async def sync_request(index: int) -> float:
+    """The previous path: an async handler running a blocking Session query"""
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        db.scalars(agents_page(index)).all()
+    return (time.perf_counter() - start) * 1000
+
+async def async_request(index: int) -> float:
+    """The new path: the same query on an AsyncSession"""
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        (await db.scalars(agents_page(index))).all()
+    return (time.perf_counter() - start) * 1000
+
+async def run(request) -> dict:
+    """Run ROUNDS bursts of CONCURRENCY concurrent requests"""
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        latencies += await asyncio.gather(*(request(i) for i in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "rps": len(latencies) / elapsed
+    }
+
+async def main():
+    print(f"\n⏱  Agent page query, {CONCURRENCY} concurrent requests x {ROUNDS} rounds\n")
+    for name, request in (("sync Session", sync_request), ("AsyncSession", async_request)):
+        result = await run(request)
+        print(
+            f"   - {name:<13} p50 {result['p50']:8.2f} ms   "
+            f"p99 {result['p99']:8.2f} ms   {result['rps']:9.0f} req/s"
+        )
+    engine.dispose()
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from dotenv import load_dotenv
+from sqlalchemy import delete, select
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app import crud  # noqa
+from app.core.config import settings  # noqa
+from app.core.redis import redis_client  # noqa
+from app.crud.transaction import transaction_rollup  # noqa
+from app.db.session import AsyncSessionLocal, async_engine  # noqa
+from app.models.agent import Agent  # noqa
+from app.models.transaction import Transaction, TransactionType  # noqa
+from app.schemas.transaction import TransactionCreate  # noqa
+
+# The per-row path takes minutes at full size; it runs on a sample
+PER_ROW_SAMPLE = 2000
+
+def transactions_in(agent: Agent, rows: int):
+    return [
+        TransactionCreate(
+            agent_id=agent.id,
+            buyer_id=agent.owner_id,
+            seller_id=agent.creator_id,
+            amount=Decimal(i % 1000) / 10,
+            type=TransactionType.PURCHASE
+        )
+        for i in range(rows)
+    ]
+
+async def per_row(objs_in) -> list:
+    """The previous bulk_create: add_all, commit, one refresh and one SETEX per row"""
+    async with AsyncSessionLocal() as db:
+        db_objs = [Transaction(**obj_in.model_dump()) for obj_in in objs_in]
+        db.add_all(db_objs)
+        await db.commit()
+        for obj in db_objs:
+            await db.refresh(obj)
+        for obj in db_objs:
+            await redis_client.set(
+                crud.transaction._get_cache_key(f"id:{obj.id}"),
+                crud.transaction._to_cache(obj),
+                expire=3600
+            )
+        return [obj.id for obj in db_objs]
+
+async def bulk(objs_in, copy: bool) -> list:
+    """bulk_create forced onto the INSERT ... RETURNING or the COPY path"""
+    settings.BULK_COPY_THRESHOLD = 0 if copy else len(objs_in) + 1
+    async with AsyncSessionLocal() as db:
+        return [obj.id for obj in await crud.transaction.bulk_create(db, objs_in=objs_in)]
+
+async def run(rows: int) -> None:
+    async with AsyncSessionLocal() as db:
+        agent = await db.scalar(select(Agent).limit(1))
+    if agent is None:
+        print("❌ No agents found; create one before benchmarking")
+        return
+
+    started_at = datetime.now(timezone.utc)
+    created_ids = []
+    print(f"\n⏱  Bulk creating transactions (chunk size {settings.BULK_CHUNK_SIZE:,})\n")
+    try:
+        for label, count, load in (
+            ("per-row (previous)", min(rows, PER_ROW_SAMPLE), per_row),
+            ("INSERT ... RETURNING", rows, lambda objs_in: bulk(objs_in, copy=False)),
+            ("COPY", rows, lambda objs_in: bulk(objs_in, copy=True)),
+        ):
+            objs_in = transactions_in(agent, count)
+            start = time.perf_counter()
+            created_ids += await load(objs_in)
+            elapsed = time.perf_counter() - start
+            print(f"   - {label:<22} {count:>7,} rows in {elapsed:7.2f}s   {count / elapsed:>10,.0f} rows/s")
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Transaction).where(Transaction.id.in_(created_ids)))
+            await db.commit()
+            # Take the deleted rows back out of the rollups
+            await transaction_rollup.rebuild(db, since=started_at)
+        print(f"\n🧹 Removed {len(created_ids):,} benchmark transactions")
+        await redis_client.close()
+        await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rows per second of the bulk_create paths")
+    parser.add_argument("--rows", type=int, default=50_000, help="rows per bulk load")
+    args = parser.parse_args()
+    asyncio.run(run(args.rows))
+
+if __name__ == "__main__":
+    main()
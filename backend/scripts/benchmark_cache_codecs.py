@@ -0,0 +1,135 @@
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+from redis.asyncio import Redis
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app.core.config import settings  # noqa
+from app.core.codecs import get_codec  # noqa
+from app.crud.agent import agent as agent_crud  # noqa
+from app.models.agent import Agent, AgentCategory, AgentStatus  # noqa
+
+AGENTS = 10_000
+PAGE_SIZE = 100
+KEY_PREFIX = "synthr:bench:codec:"
+
+def make_agents() -> list:
+    """Build detached Agent rows shaped like production data"""
+    now = datetime.now(timezone.utc)
+    categories = list(AgentCategory)
+    return [
+        Agent(
+            id=i,
+            token_id=f"0x{i:064x}",
+            name=f"Agent {i}",
+            description="Summarizes on-chain activity and flags anomalies " * 4,
+            category=categories[i % len(categories)],
+            status=AgentStatus.LISTED,
+            creator_id=i % 500,
+            owner_id=i % 700,
+            price=Decimal("1.25000000") + i,
+            is_listed=True,
+            royalty_percentage=Decimal("2.50"),
+            ipfs_hash=f"Qm{i:044d}",
+            agent_metadata={"version": "1.0", "tags": ["defi", "alerts"]},
+            capabilities=["summarize", "classify", "alert"],
+            model_parameters={"temperature": 0.2, "max_tokens": 512},
+            total_uses=i * 3,
+            average_rating=Decimal("4.20"),
+            total_ratings=i % 50,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(AGENTS)
+    ]
+
+class LegacyCodec:
+    """The previous path: jsonable_encoder + json.dumps, rehydrated as ORM instances"""
+
+    def encode(self, value):
+        return json.dumps(jsonable_encoder(value)).encode()
+
+    def decode(self, data):
+        value = json.loads(data)
+        if isinstance(value, list):
+            return [Agent(**item) for item in value]
+        return Agent(**value)
+
+class RecordCodec:
+    """The current path: column dicts through a codec, read back as CachedRecords"""
+
+    def __init__(self, codec):
+        self.codec = codec
+
+    def encode(self, value):
+        if isinstance(value, list):
+            return self.codec.encode(agent_crud._to_cache_many(value))
+        return self.codec.encode(agent_crud._to_cache(value))
+
+    def decode(self, data):
+        value = self.codec.decode(data)
+        if isinstance(value, list):
+            return [agent_crud._from_cache(item) for item in value]
+        return agent_crud._from_cache(value)
+
+async def memory_usage(redis: Redis, payloads: list) -> int:
+    """Store payloads and sum MEMORY USAGE over the keys"""
+    keys = [f"{KEY_PREFIX}{i}" for i in range(len(payloads))]
+    async with redis.pipeline(transaction=False) as pipe:
+        for key, payload in zip(keys, payloads):
+            pipe.set(key, payload)
+        await pipe.execute()
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.memory_usage(key, samples=0)
+        usage = await pipe.execute()
+    await redis.delete(*keys)
+    return sum(usage)
+
+async def main():
+    agents = make_agents()
+    pages = [agents[i:i + PAGE_SIZE] for i in range(0, AGENTS, PAGE_SIZE)]
+    codecs = {
+        "legacy json": LegacyCodec(),
+        "json": RecordCodec(get_codec("json")),
+        "msgpack": RecordCodec(get_codec("msgpack")),
+        "msgpack+zlib": RecordCodec(get_codec("msgpack", "zlib")),
+        "msgpack+lz4": RecordCodec(get_codec("msgpack", "lz4")),
+    }
+    redis = Redis.from_url(settings.REDIS_URL)
+
+    print(f"\n📦 {AGENTS} agents as single rows and {len(pages)} pages of {PAGE_SIZE}\n")
+    for name, codec in codecs.items():
+        start = time.perf_counter()
+        rows = [codec.encode(agent) for agent in agents]
+        encode_rate = AGENTS / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for row in rows:
+            codec.decode(row)
+        decode_rate = AGENTS / (time.perf_counter() - start)
+
+        lists = [codec.encode(page) for page in pages]
+        row_memory = await memory_usage(redis, rows)
+        list_memory = await memory_usage(redis, lists)
+
+        print(
+            f"   - {name:<13} encode {encode_rate:9.0f} rows/s   decode {decode_rate:9.0f} rows/s   "
+            f"redis rows {row_memory / 1024:8.0f} KiB   pages {list_memory / 1024:8.0f} KiB"
+        )
+
+    await redis.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
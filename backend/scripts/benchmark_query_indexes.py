@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+import psycopg2
+from dotenv import load_dotenv
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+USERS = 10_000
+AGENTS = 1_000_000
+REVIEWS = 1_000_000
+TRANSACTIONS = 1_000_000
+SEED_PREFIX = "bench-"
+
+# A term that only a handful of seeded agent names contain
+RARE_TERM = "7f3a9c"
+
+# Query shapes issued by the CRUD layer, with the indexes each one should use
+QUERIES = [
+    (
+        "agents by owner",
+        ("ix_agents_owner_id_created_at",),
+        "SELECT * FROM agents WHERE owner_id = %(user_id)s "
+        "ORDER BY created_at DESC, id DESC LIMIT 20"
+    ),
+    (
+        "agents by category",
+        ("ix_agents_category_created_at",),
+        "SELECT * FROM agents WHERE category = 'TRADING' "
+        "ORDER BY created_at DESC, id DESC LIMIT 20"
+    ),
+    (
+        "listed agents in price range",
+        ("ix_agents_category_price",),
+        "SELECT * FROM agents WHERE category = 'TRADING' AND price BETWEEN 10 AND 11 "
+        "ORDER BY created_at DESC, id DESC LIMIT 20"
+    ),
+    (
+        "agent search (ilike)",
+        ("ix_agents_name_trgm", "ix_agents_description_trgm"),
+        "SELECT * FROM agents WHERE name ILIKE %(term)s OR description ILIKE %(term)s "
+        "ORDER BY created_at DESC, id DESC LIMIT 20"
+    ),
+    (
+        "reviews of an agent",
+        ("ix_reviews_agent_id_created_at",),
+        "SELECT * FROM reviews WHERE agent_id = %(agent_id)s "
+        "ORDER BY created_at DESC LIMIT 20"
+    ),
+    (
+        "transactions of a user",
+        ("ix_transactions_buyer_id_created_at", "ix_transactions_seller_id_created_at"),
+        "SELECT * FROM transactions WHERE buyer_id = %(user_id)s OR seller_id = %(user_id)s "
+        "ORDER BY created_at DESC LIMIT 20"
+    ),
+    (
+        "user search (ilike)",
+        ("ix_users_username_trgm", "ix_users_wallet_address_trgm"),
+        "SELECT * FROM users WHERE username ILIKE %(term)s OR wallet_address ILIKE %(term)s "
+        "LIMIT 10"
+    ),
+]
+
+SEED_SQL = f"""
+SELECT setseed(0.42);
+
+INSERT INTO users (username, wallet_address, is_active)
+SELECT '{SEED_PREFIX}user-' || i, '0x' || lpad(to_hex(i), 40, '0'), true
+FROM generate_series(1, {USERS}) AS i;
+
+INSERT INTO agents (token_id, name, description, category, status, creator_id, owner_id,
+                    price, is_listed, created_at)
+SELECT
+    '{SEED_PREFIX}' || i,
+    (ARRAY['Alpha', 'Sentiment', 'Vision', 'Ledger', 'Oracle', 'Scribe'])[1 + i % 6]
+        || ' ' || substr(md5(i::text), 1, 8),
+    'Seeded agent ' || md5((i * 7)::text),
+    (ARRAY['ANALYTICS', 'CONTENT', 'DATA_PROCESSING', 'AUTOMATION', 'TRADING', 'CREATIVE'])
+        [1 + floor(random() * 6)::int]::agentcategory,
+    (ARRAY['DRAFT', 'READY', 'LISTED', 'SOLD', 'DELISTED'])
+        [1 + floor(random() * 5)::int]::agentstatus,
+    u.id,
+    u.id,
+    round((random() * 100)::numeric, 2),
+    random() < 0.5,
+    now() - (random() * interval '365 days')
+FROM generate_series(1, {AGENTS}) AS i
+JOIN (
+    SELECT id, row_number() OVER (ORDER BY id) - 1 AS n
+    FROM users WHERE username LIKE '{SEED_PREFIX}%'
+) u ON u.n = i % {USERS};
+
+INSERT INTO reviews (agent_id, reviewer_id, agent_creator_id, rating, created_at)
+SELECT a.id, a.owner_id, a.creator_id, round((random() * 5)::numeric, 1),
+       now() - (random() * interval '365 days')
+FROM agents a, generate_series(1, {REVIEWS // AGENTS})
+WHERE a.token_id LIKE '{SEED_PREFIX}%';
+
+INSERT INTO transactions (agent_id, buyer_id, seller_id, amount, transaction_hash,
+                          status, type, created_at)
+SELECT a.id, a.owner_id, a.creator_id, a.price, '{SEED_PREFIX}' || a.id || '-' || g,
+       'COMPLETED', 'PURCHASE', now() - (random() * interval '365 days')
+FROM agents a, generate_series(1, {TRANSACTIONS // AGENTS}) AS g
+WHERE a.token_id LIKE '{SEED_PREFIX}%';
+
+ANALYZE users;
+ANALYZE agents;
+ANALYZE reviews;
+ANALYZE transactions;
+"""
+
+CLEAN_SQL = f"""
+DELETE FROM transactions WHERE transaction_hash LIKE '{SEED_PREFIX}%';
+DELETE FROM reviews WHERE agent_id IN (SELECT id FROM agents WHERE token_id LIKE '{SEED_PREFIX}%');
+DELETE FROM agents WHERE token_id LIKE '{SEED_PREFIX}%';
+DELETE FROM users WHERE username LIKE '{SEED_PREFIX}%';
+"""
+
+def connect():
+    return psycopg2.connect(
+        host=os.getenv("POSTGRES_SERVER", "localhost"),
+        port=os.getenv("POSTGRES_PORT", "5436"),
+        user=os.getenv("POSTGRES_USER", "postgres"),
+        password=os.getenv("POSTGRES_PASSWORD", "postgres"),
+        dbname=os.getenv("POSTGRES_DB", "synthr_db")
+    )
+
+def seed(conn) -> None:
+    """Insert the benchmark rows once; later runs reuse them"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM agents WHERE token_id LIKE %s", (f"{SEED_PREFIX}%",))
+        if cur.fetchone()[0] >= AGENTS:
+            print(f"ℹ️  {AGENTS:,} seeded agents already present")
+            return
+        print(f"🌱 Seeding {USERS:,} users, {AGENTS:,} agents, {REVIEWS:,} reviews "
+              f"and {TRANSACTIONS:,} transactions...")
+        cur.execute(CLEAN_SQL)
+        cur.execute(SEED_SQL)
+    conn.commit()
+
+def sample_params(conn) -> dict:
+    with conn.cursor() as cur:
+        cur.execute("SELECT id FROM users WHERE username = %s", (f"{SEED_PREFIX}user-42",))
+        user_id = cur.fetchone()[0]
+        cur.execute("SELECT id FROM agents WHERE token_id = %s", (f"{SEED_PREFIX}4242",))
+        agent_id = cur.fetchone()[0]
+    return {"user_id": user_id, "agent_id": agent_id, "term": f"%{RARE_TERM}%"}
+
+def explain(cur, sql: str, params: dict) -> dict:
+    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+    plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    plan = plan[0]
+    return {
+        "ms": plan["Execution Time"],
+        "node": scan_node(plan["Plan"]),
+        "buffers": plan["Plan"].get("Shared Hit Blocks", 0) + plan["Plan"].get("Shared Read Blocks", 0)
+    }
+
+def scan_node(node: dict) -> str:
+    """Type of the first scan under Limit/Sort/Append nodes, e.g. 'Index Scan'"""
+    while "Scan" not in node["Node Type"] and node.get("Plans"):
+        node = node["Plans"][0]
+    return node["Node Type"]
+
+def run(conn, params: dict) -> None:
+    """EXPLAIN ANALYZE every query shape with its indexes, then with them dropped in a rolled-back transaction"""
+    print(f"\n⏱  EXPLAIN ANALYZE over {AGENTS:,} agents\n")
+    for label, indexes, sql in QUERIES:
+        with conn.cursor() as cur:
+            explain(cur, sql, params)  # warm the buffer cache
+            with_index = explain(cur, sql, params)
+            for index in indexes:
+                cur.execute(f"DROP INDEX IF EXISTS {index}")
+            without_index = explain(cur, sql, params)
+        conn.rollback()
+        print(
+            f"   - {label:<30} indexed {with_index['ms']:9.2f} ms ({with_index['node']}, "
+            f"{with_index['buffers']} buffers)   "
+            f"unindexed {without_index['ms']:9.2f} ms ({without_index['node']}, "
+            f"{without_index['buffers']} buffers)"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN-based benchmark of the marketplace indexes")
+    parser.add_argument("--clean", action="store_true", help="remove the seeded rows and exit")
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        if args.clean:
+            with conn.cursor() as cur:
+                cur.execute(CLEAN_SQL)
+            conn.commit()
+            print("🧹 Removed seeded benchmark rows")
+            return
+        seed(conn)
+        run(conn, sample_params(conn))
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
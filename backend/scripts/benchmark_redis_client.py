@@ -0,0 +1,96 @@
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+from redis import Redis
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app.core.config import settings  # noqa
+from app.core.redis import RedisClient  # noqa
+import app.crud.base as crud_base  # noqa
+from app.crud.agent import agent as agent_crud  # noqa
+
+CONCURRENCY = 500
+ROUNDS = 5
+AGENT_ID = 1
+
+SAMPLE_AGENT = {
+    "id": AGENT_ID,
+    "token_id": "bench-token-1",
+    "name": "Benchmark Agent",
+    "description": "Agent used to benchmark the cached read path",
+    "category": "analytics",
+    "status": "listed",
+    "creator_id": 1,
+    "owner_id": 1,
+    "price": "1.50000000",
+    "is_listed": True,
+    "capabilities": ["summarize", "classify"],
+    "total_uses": 0,
+    "total_ratings": 0,
+}
+
+class LegacyRedisClient:
+    """The previous client: async signatures around the blocking redis.Redis"""
+
+    def __init__(self):
+        self.redis = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=0,
+            decode_responses=True
+        )
+
+    async def get(self, key: str):
+        data = self.redis.get(key)
+        return json.loads(data) if data else None
+
+    async def set(self, key: str, value, expire: int = 3600) -> bool:
+        return self.redis.setex(key, expire, json.dumps(value))
+
+    async def close(self) -> None:
+        self.redis.close()
+
+async def timed_get() -> float:
+    start = time.perf_counter()
+    await agent_crud.get(None, id=AGENT_ID)
+    return (time.perf_counter() - start) * 1000
+
+async def run(client) -> dict:
+    """Run ROUNDS bursts of CONCURRENCY cached agent.get calls through client"""
+    crud_base.redis_client = client
+    await client.set(agent_crud._get_cache_key(f"id:{AGENT_ID}"), SAMPLE_AGENT)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        latencies += await asyncio.gather(*(timed_get() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "rps": len(latencies) / elapsed
+    }
+
+async def main():
+    print(f"\n⏱  Cached agent.get, {CONCURRENCY} concurrent coroutines x {ROUNDS} rounds\n")
+    for name, client in (("legacy (sync)", LegacyRedisClient()), ("asyncio pool", RedisClient())):
+        result = await run(client)
+        await client.close()
+        print(
+            f"   - {name:<14} p50 {result['p50']:8.2f} ms   "
+            f"p99 {result['p99']:8.2f} ms   {result['rps']:9.0f} req/s"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+import numpy as np
+from dotenv import load_dotenv
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app.core.ann import IVFIndex  # noqa
+from app.core.config import settings  # noqa
+from app.crud.agent_embeddings import agent_embeddings  # noqa
+from app.db.session import AsyncSessionLocal, async_engine  # noqa
+
+QUERIES = 200
+PROBES = (1, 2, 4, 8, 16, 32)
+
+def synthetic(rows: int, clusters: int = 200, seed: int = 0) -> IVFIndex:
+    """Unit vectors scattered around random topics, standing in for agent embeddings"""
+    rng = np.random.default_rng(seed)
+    dimension = settings.EMBEDDING_DIMENSION
+    topics = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    vectors = np.empty((rows, dimension), dtype=np.float16)
+    for start in range(0, rows, 65536):
+        count = min(65536, rows - start)
+        block = topics[rng.integers(clusters, size=count)] + 0.6 * rng.standard_normal((count, dimension), dtype=np.float32)
+        vectors[start:start + count] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    index = IVFIndex(dimension)
+    index.load(list(range(1, rows + 1)), vectors, agent_embeddings.lists(rows))
+    return index
+
+async def stored() -> IVFIndex:
+    async with AsyncSessionLocal() as db:
+        await agent_embeddings.load(db)
+    await async_engine.dispose()
+    return agent_embeddings.index
+
+def measure(search, queries, k: int):
+    timings, results = [], []
+    for query_id, query in queries:
+        start = time.perf_counter()
+        ids, _ = search(query, k, query_id)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append(set(ids))
+    timings.sort()
+    return results, statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+def run(index: IVFIndex, k: int, target_recall: float) -> None:
+    rows = len(index)
+    if rows <= k:
+        print(f"❌ Only {rows} vectors indexed; embed agents first (scripts/embed_agents.py) or use --synthetic")
+        return
+    rng = np.random.default_rng(1)
+    query_ids = rng.choice(list(index._slots), size=min(QUERIES, rows), replace=False).tolist()
+    queries = [(query_id, index.vector(query_id)) for query_id in query_ids]
+    lists = 0 if index.centroids is None else len(index.centroids)
+
+    print(f"\n⏱  Top-{k} similar agents over {rows:,} vectors, {lists} IVF lists, {len(queries)} queries\n")
+    exact, p50, p95 = measure(
+        lambda query, k, query_id: index.exact_search(query, k, exclude=[query_id]), queries, k
+    )
+    print(f"   - {'brute force':<12} recall 1.000   p50 {p50:8.3f} ms  p95 {p95:8.3f} ms")
+
+    best = None
+    for nprobe in PROBES:
+        if lists and nprobe > lists:
+            break
+        found, p50, p95 = measure(
+            lambda query, k, query_id: index.search(query, k, nprobe=nprobe, exclude=[query_id]), queries, k
+        )
+        recall = statistics.mean(len(a & e) / len(e) for a, e in zip(found, exact) if e)
+        ok = recall >= target_recall
+        if ok and best is None:
+            best = nprobe
+        print(f"   {'✅' if ok else '  '} nprobe {nprobe:<5} recall {recall:.3f}   p50 {p50:8.3f} ms  p95 {p95:8.3f} ms")
+
+    if best is None:
+        print(f"\n❌ No nprobe reached recall {target_recall}; raise EMBEDDING_IVF_PROBES or lower the list count")
+    else:
+        print(f"\n✅ nprobe {best} reaches recall {target_recall} (EMBEDDING_IVF_PROBES is {settings.EMBEDDING_IVF_PROBES})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall and latency of IVF similar-agent search against brute force")
+    parser.add_argument("--synthetic", type=int, metavar="ROWS",
+                        help="benchmark ROWS synthetic vectors instead of the stored embeddings")
+    parser.add_argument("--k", type=int, default=10, help="neighbours per query")
+    parser.add_argument("--target-recall", type=float, default=0.95, help="recall@k to reach")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        start = time.perf_counter()
+        index = synthetic(args.synthetic)
+        print(f"\n✅ Built and trained a {args.synthetic:,} vector index in {time.perf_counter() - start:.2f}s")
+    else:
+        index = asyncio.run(stored())
+    run(index, args.k, args.target_recall)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import asyncio
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+from sqlalchemy import text, update
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app.core.config import settings  # noqa
+from app.db.replicas import LAG_SQL, replica_read, replicas  # noqa
+from app.db.session import AsyncSessionLocal, async_engine  # noqa
+from app.models.user import User  # noqa
+
+SERVER_SQL = text("SELECT inet_server_addr()::text || ':' || inet_server_port()")
+
+@replica_read
+async def routed_server(db) -> str:
+    """Server answering a replica_read query"""
+    return await db.scalar(SERVER_SQL)
+
+async def check_replicas():
+    """Show each configured server, then where CRUD reads are routed"""
+    async with async_engine.connect() as conn:
+        primary = await conn.scalar(SERVER_SQL)
+    print(f"\n✅ Primary: {primary}")
+
+    if not replicas.engines:
+        print("ℹ️  No DATABASE_REPLICA_URLS configured; every query uses the primary")
+    await replicas.check()
+    for index, engine in enumerate(replicas.engines):
+        if not replicas.healthy[index]:
+            print(f"❌ Replica {index}: unhealthy, skipped")
+            continue
+        async with engine.connect() as conn:
+            server = await conn.scalar(SERVER_SQL)
+            lag = await conn.scalar(LAG_SQL)
+        print(f"✅ Replica {index}: {server} ({float(lag):.1f}s behind, max {settings.DATABASE_REPLICA_MAX_LAG}s)")
+
+    async with AsyncSessionLocal() as db:
+        print(f"\n📋 Routing:")
+        for attempt in range(max(2, len(replicas.engines) * 2)):
+            print(f"   - read {attempt + 1}: {await routed_server(db)}")
+
+        # A write pins the session to the primary; this one matches no rows
+        await db.execute(update(User).where(User.id == -1).values(is_active=True))
+        print(f"   - read after write: {await routed_server(db)}")
+        await db.rollback()
+
+    await replicas.close()
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(check_replicas())
@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+from sqlalchemy import or_, select
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app.core.config import settings  # noqa
+from app.core.redis import redis_client  # noqa
+from app.crud.agent_embeddings import agent_embeddings  # noqa
+from app.db.session import AsyncSessionLocal, async_engine  # noqa
+from app.models.agent import Agent  # noqa
+from app.models.agent_embedding import AgentEmbedding  # noqa
+
+async def embed(check_all: bool) -> None:
+    """Embed agents with no vector of the current model, or every agent whose text changed"""
+    statement = (
+        select(Agent.id)
+        .outerjoin(AgentEmbedding, AgentEmbedding.agent_id == Agent.id)
+        .order_by(Agent.id)
+    )
+    if not check_all:
+        statement = statement.where(or_(
+            AgentEmbedding.agent_id.is_(None),
+            AgentEmbedding.model != settings.EMBEDDING_MODEL,
+            AgentEmbedding.updated_at < Agent.updated_at
+        ))
+    async with AsyncSessionLocal() as db:
+        agent_ids = list((await db.scalars(statement)).all())
+    print(f"\n🔄 Checking {len(agent_ids):,} agents with {settings.EMBEDDING_MODEL}...")
+
+    start = time.perf_counter()
+    embedded = 0
+    for offset in range(0, len(agent_ids), settings.EMBEDDING_BATCH_SIZE):
+        async with AsyncSessionLocal() as db:
+            embedded += len(await agent_embeddings.embed(
+                db, agent_ids[offset:offset + settings.EMBEDDING_BATCH_SIZE]
+            ))
+        if offset and offset % (settings.EMBEDDING_BATCH_SIZE * 100) == 0:
+            print(f"   - {offset:,} checked, {embedded:,} embedded")
+    elapsed = time.perf_counter() - start
+    print(f"✅ Embedded {embedded:,} agents in {elapsed:.2f}s ({embedded / max(elapsed, 1e-9):,.0f} agents/s)")
+
+    await redis_client.close()
+    await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill agent embeddings for similar-agent search")
+    parser.add_argument("--all", action="store_true", dest="check_all",
+                        help="check every agent, not only those without a current vector")
+    args = parser.parse_args()
+    asyncio.run(embed(args.check_all))
+
+if __name__ == "__main__":
+    main()
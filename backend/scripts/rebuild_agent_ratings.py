@@ -0,0 +1,37 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app import crud  # noqa
+from app.db.session import AsyncSessionLocal, async_engine  # noqa
+
+async def rebuild(agent_ids) -> None:
+    async with AsyncSessionLocal() as db:
+        repaired = await crud.agent.rebuild_rating_aggregates(db, agent_ids=agent_ids)
+    await async_engine.dispose()
+
+    scope = f"{len(agent_ids)} agents" if agent_ids else "all agents"
+    print(f"\n✅ Rebuilt rating aggregates for {scope}")
+    print(f"🔧 Repaired {len(repaired):,} agents whose stored aggregates had drifted")
+    if repaired and len(repaired) <= 20:
+        print(f"   - Agent ids: {', '.join(str(id) for id in repaired)}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Backfill or repair agent rating aggregates from the reviews table"
+    )
+    parser.add_argument("--agent-id", type=int, action="append", dest="agent_ids",
+                        help="only rebuild this agent; may be repeated")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.agent_ids))
+
+if __name__ == "__main__":
+    main()
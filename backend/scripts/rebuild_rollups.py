@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app import crud  # noqa  (defines the rollups)
+from app.core.redis import redis_client  # noqa
+from app.db.rollups import ROLLUPS  # noqa
+from app.db.session import AsyncSessionLocal, async_engine  # noqa
+
+async def rebuild(tables, since) -> None:
+    for table in tables:
+        rollup = ROLLUPS[table]
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await rollup.rebuild(db, since=since)
+        # Stats read from the rebuilt table are stale now
+        await redis_client.invalidate_tags(rollup.tag)
+        print(f"✅ Rebuilt {table} in {time.perf_counter() - start:.2f}s")
+
+    await redis_client.close()
+    await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute the marketplace rollup tables from their source tables")
+    parser.add_argument("--table", action="append", dest="tables", choices=sorted(ROLLUPS),
+                        help="only rebuild this rollup table; may be repeated")
+    parser.add_argument("--since", type=datetime.fromisoformat,
+                        help="only rebuild buckets from this day on, e.g. 2026-10-01")
+    args = parser.parse_args()
+
+    since = args.since
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    tables = args.tables or sorted(ROLLUPS)
+
+    scope = f"from {since.date()}" if since else "entirely"
+    print(f"\n🔄 Rebuilding {', '.join(tables)} {scope}...")
+    asyncio.run(rebuild(tables, since))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app import crud  # noqa
+from app.core.redis import redis_client  # noqa
+from app.db.session import AsyncSessionLocal, async_engine  # noqa
+
+RUNS = 200
+
+# Keystroke sequences a user types into the marketplace search box
+TYPED = ["s", "se", "sen", "sent", "senti", "sentiment a", "o", "or", "ora", "oracle"]
+
+async def measure(call) -> dict:
+    await call()  # warm up
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {"p50": statistics.median(timings), "p95": timings[int(RUNS * 0.95) - 1]}
+
+async def run(rebuild: bool, limit: int) -> None:
+    if rebuild:
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            agents = await crud.agent.rebuild_suggestions(db)
+            users = await crud.user.rebuild_suggestions(db)
+        print(
+            f"✅ Indexed {agents['agents']:,} agent names, {agents['capabilities']:,} capability tags "
+            f"and {users:,} usernames in {time.perf_counter() - start:.2f}s"
+        )
+
+    print(f"\n⏱  Suggestion latency, top {limit}, {RUNS} runs each\n")
+    for prefix in TYPED:
+        agents = await measure(lambda: crud.agent.suggest(prefix=prefix, limit=limit))
+        users = await measure(lambda: crud.user.suggest(prefix=prefix, limit=limit))
+        found = await crud.agent.suggest(prefix=prefix, limit=limit)
+        top = found["agents"][0]["name"] if found["agents"] else "-"
+        print(
+            f"   - {prefix!r:<15} agents p50 {agents['p50']:6.3f} ms  p95 {agents['p95']:6.3f} ms   "
+            f"users p50 {users['p50']:6.3f} ms  p95 {users['p95']:6.3f} ms   top: {top}"
+        )
+
+    await redis_client.close()
+    await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the type-ahead indexes and time suggestions")
+    parser.add_argument("--skip-rebuild", action="store_true", help="only time suggestions")
+    parser.add_argument("--limit", type=int, default=10, help="suggestions per reply")
+    args = parser.parse_args()
+
+    if not args.skip_rebuild:
+        print(f"\n🔄 Rebuilding agent, capability and username suggestions...")
+    asyncio.run(run(not args.skip_rebuild, args.limit))
+
+if __name__ == "__main__":
+    main()
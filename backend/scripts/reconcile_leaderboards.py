@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Add parent directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Load environment variables
+load_dotenv()
+
+from app import crud  # noqa
+from app.core.redis import redis_client  # noqa
+from app.crud.agent_leaderboards import BOARDS, agent_leaderboards  # noqa
+from app.db.session import AsyncSessionLocal, async_engine  # noqa
+from app.models.agent import AgentCategory  # noqa
+
+RUNS = 200
+
+async def measure(call) -> dict:
+    await call()  # warm up
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {"p50": statistics.median(timings), "p95": timings[int(RUNS * 0.95) - 1]}
+
+async def run(rebuild: bool, limit: int) -> None:
+    if rebuild:
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            sizes = await agent_leaderboards.rebuild(db)
+        print(f"✅ Rebuilt {len(sizes)} leaderboards in {time.perf_counter() - start:.2f}s")
+        for board in BOARDS:
+            print(f"   - {board:<10} {sizes[f'{board}:all']:,} agents")
+
+    print(f"\n⏱  Leaderboard reads, top {limit}, {RUNS} runs each\n")
+    for board in BOARDS:
+        for category in (None, *AgentCategory):
+            redis_only = await measure(lambda: agent_leaderboards.top(board, category, limit))
+            async with AsyncSessionLocal() as db:
+                hydrated = await measure(
+                    lambda: crud.agent.get_leaderboard(db, board=board, category=category, limit=limit)
+                )
+            scope = category.value if category else "all"
+            print(
+                f"   - {board:<10} {scope:<16} ids p50 {redis_only['p50']:6.3f} ms  p95 {redis_only['p95']:6.3f} ms   "
+                f"agents p50 {hydrated['p50']:6.3f} ms  p95 {hydrated['p95']:6.3f} ms"
+            )
+
+    await redis_client.close()
+    await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the agent leaderboards from the database and time reads")
+    parser.add_argument("--skip-rebuild", action="store_true", help="only time reads")
+    parser.add_argument("--limit", type=int, default=10, help="agents per board read")
+    args = parser.parse_args()
+
+    if not args.skip_rebuild:
+        print(f"\n🔄 Reconciling trending, top-rated and most-used leaderboards...")
+    asyncio.run(run(not args.skip_rebuild, args.limit))
+
+if __name__ == "__main__":
+    main()